@@ -0,0 +1,68 @@
+"""Add recurrence to events and chores
+
+Revision ID: 3f1d9c2b7e4a
+Revises: 6c68d8c07124
+Create Date: 2026-10-18 12:05:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1d9c2b7e4a'
+down_revision: Union[str, None] = '6c68d8c07124'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chores', sa.Column('due_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('chores', sa.Column('rrule', sa.String(), nullable=True))
+    op.add_column('chores', sa.Column('recurrence_end', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('events', sa.Column('rrule', sa.String(), nullable=True))
+    op.add_column('events', sa.Column('recurrence_end', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('chore_occurrences',
+    sa.Column('chore_id', sa.Integer(), nullable=False),
+    sa.Column('recurrence_id', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('cancelled', sa.Boolean(), nullable=False),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('assigned_to_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Boolean(), nullable=True),
+    sa.Column('due_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['chore_id'], ['chores.id'], ),
+    sa.PrimaryKeyConstraint('chore_id', 'recurrence_id')
+    )
+    op.create_table('event_occurrences',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('recurrence_id', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('cancelled', sa.Boolean(), nullable=False),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.PrimaryKeyConstraint('event_id', 'recurrence_id')
+    )
+    # Built concurrently for the same reason as the other family-scoped indexes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_chores_family_id_due_at', 'chores', ['family_id', 'due_at', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_chores_family_id_due_at', table_name='chores', postgresql_concurrently=True, if_exists=True)
+    op.drop_table('event_occurrences')
+    op.drop_table('chore_occurrences')
+    op.drop_column('events', 'recurrence_end')
+    op.drop_column('events', 'rrule')
+    op.drop_column('chores', 'recurrence_end')
+    op.drop_column('chores', 'rrule')
+    op.drop_column('chores', 'due_at')
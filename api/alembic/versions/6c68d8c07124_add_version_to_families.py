@@ -0,0 +1,28 @@
+"""Add version to families
+
+Revision ID: 6c68d8c07124
+Revises: a4a6d6b1acb6
+Create Date: 2026-10-18 11:42:17.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c68d8c07124'
+down_revision: Union[str, None] = 'a4a6d6b1acb6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('families', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('families', 'version')
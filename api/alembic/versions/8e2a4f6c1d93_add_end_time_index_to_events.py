@@ -0,0 +1,31 @@
+"""Add end_time index to events
+
+Revision ID: 8e2a4f6c1d93
+Revises: 3f1d9c2b7e4a
+Create Date: 2026-10-18 12:48:09.552731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2a4f6c1d93'
+down_revision: Union[str, None] = '3f1d9c2b7e4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_events_family_id_end_time', 'events', ['family_id', 'end_time'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_events_family_id_end_time', table_name='events', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,42 @@
+"""Add indexes for family-scoped queries
+
+Revision ID: a4a6d6b1acb6
+Revises: aed02c6b9e89
+Create Date: 2026-10-18 11:20:04.512337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4a6d6b1acb6'
+down_revision: Union[str, None] = 'aed02c6b9e89'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns)
+INDEXES = [
+    ('ix_chores_family_id_id', 'chores', ['family_id', 'id']),
+    ('ix_events_family_id_start_time', 'events', ['family_id', 'start_time', 'id']),
+    ('ix_users_family_id', 'users', ['family_id']),
+    ('ix_event_assignees_user_id', 'event_assignees', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block; building
+    # concurrently avoids holding a write lock on the tables meanwhile.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,42 @@
+"""Add search indexes to chores and events
+
+Revision ID: d41c7a9e3b58
+Revises: b5e8d2a17c40
+Create Date: 2026-10-18 15:20:44.902318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c7a9e3b58'
+down_revision: Union[str, None] = 'b5e8d2a17c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app.search.SearchDocument as compiled for PostgreSQL; /search must use the
+# same expression for the planner to pick the index
+SEARCH_DOCUMENT = (
+    "(setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B'))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Expression indexes built concurrently: no column to add, so the tables
+    # are neither rewritten nor locked against writes
+    with op.get_context().autocommit_block():
+        for table in ('chores', 'events'):
+            op.create_index(f'ix_{table}_search', table, [sa.text(SEARCH_DOCUMENT)], postgresql_using='gin',
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in ('chores', 'events'):
+            op.drop_index(f'ix_{table}_search', table_name=table, postgresql_concurrently=True, if_exists=True)
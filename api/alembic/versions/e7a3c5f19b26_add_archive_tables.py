@@ -0,0 +1,79 @@
+"""Add archive tables for chores and events
+
+Revision ID: e7a3c5f19b26
+Revises: d41c7a9e3b58
+Create Date: 2026-10-18 16:05:12.417730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c5f19b26'
+down_revision: Union[str, None] = 'd41c7a9e3b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'archived_chores',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('family_id', sa.Integer(), nullable=True),
+        sa.Column('assigned_to_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('due_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('rrule', sa.String(), nullable=True),
+        sa.Column('recurrence_end', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['assigned_to_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['family_id'], ['families.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_chores_family_id_id', 'archived_chores', ['family_id', 'id'], unique=False)
+    op.create_index('ix_archived_chores_family_id_due_at', 'archived_chores', ['family_id', 'due_at', 'id'], unique=False)
+    op.create_table(
+        'archived_events',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('family_id', sa.Integer(), nullable=True),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('rrule', sa.String(), nullable=True),
+        sa.Column('recurrence_end', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['family_id'], ['families.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_events_family_id_start_time', 'archived_events', ['family_id', 'start_time', 'id'], unique=False)
+    op.create_index('ix_archived_events_family_id_end_time', 'archived_events', ['family_id', 'end_time'], unique=False)
+    op.create_table(
+        'archived_event_assignees',
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['archived_events.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('event_id', 'user_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived rows are lost; run ``python -m app.export`` first to keep them
+    op.drop_table('archived_event_assignees')
+    op.drop_index('ix_archived_events_family_id_end_time', table_name='archived_events')
+    op.drop_index('ix_archived_events_family_id_start_time', table_name='archived_events')
+    op.drop_table('archived_events')
+    op.drop_index('ix_archived_chores_family_id_due_at', table_name='archived_chores')
+    op.drop_index('ix_archived_chores_family_id_id', table_name='archived_chores')
+    op.drop_table('archived_chores')
@@ -0,0 +1,39 @@
+"""Add chore_stats
+
+Revision ID: f2b8d4e6a1c7
+Revises: e7a3c5f19b26
+Create Date: 2026-10-18 17:12:40.305518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4e6a1c7'
+down_revision: Union[str, None] = 'e7a3c5f19b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Empty until backfilled with ``python -m app.stats rebuild``
+    op.create_table(
+        'chore_stats',
+        sa.Column('family_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('week', sa.Date(), nullable=False),
+        sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('completed', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['family_id'], ['families.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('family_id', 'user_id', 'week'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('chore_stats')
@@ -0,0 +1,125 @@
+"""Move old history out of the hot tables.
+
+    python -m app.archive [--older-than-days 90] [--batch-size 1000]
+
+Completed one-off chores last changed, and one-off events that ended, more
+than ``archive_after_days`` ago are copied to ``archived_chores`` /
+``archived_events`` and deleted from ``chores`` / ``events``. Recurring series
+stay where they are: they never stop producing occurrences until their rule
+ends, and their overrides live next to them.
+
+Each batch of at most ``archive_batch_size`` rows is its own transaction, so
+locks stay short and an interrupted run loses nothing. Rows locked by a
+concurrent write are skipped and picked up by the next run. Lists only show
+archived rows when asked with ``include_archived=true``.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .etags import bump_family_version
+from .models import ArchivedChore, ArchivedEvent, Chore, Event, archived_event_assignees, event_assignees
+
+logger = logging.getLogger(__name__)
+
+def _archivable(entity, cutoff: datetime):
+    if entity is Chore:
+        return [Chore.status.is_(True), Chore.rrule.is_(None), func.coalesce(Chore.updated_at, Chore.created_at) < cutoff]
+    return [Event.rrule.is_(None), Event.end_time < cutoff]
+
+async def archive_batch(session: AsyncSession, entity, cutoff: datetime, batch_size: int,
+                        after_id: int = 0) -> list[tuple[int, int]]:
+    """Archive up to ``batch_size`` rows of ``entity`` with ids above ``after_id``. Does not commit.
+
+    Returns the (family_id, id) of the archived rows, by id.
+    """
+    archive = ArchivedChore if entity is Chore else ArchivedEvent
+    result = await session.execute(
+        select(entity.family_id, entity.id)
+        .filter(entity.id > after_id, *_archivable(entity, cutoff))
+        .order_by(entity.id).limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = [tuple(row) for row in result]
+    if not rows:
+        return []
+    ids = [id_ for _, id_ in rows]
+    # Every column the archive shares with the hot table
+    names = [column.name for column in archive.__table__.c if column.name in entity.__table__.c]
+    columns = [entity.__table__.c[name] for name in names]
+    await session.execute(
+        insert(archive.__table__).from_select(names, select(*columns).filter(entity.id.in_(ids)))
+    )
+    if entity is Event:
+        await session.execute(
+            insert(archived_event_assignees).from_select(
+                ["event_id", "user_id"],
+                select(event_assignees.c.event_id, event_assignees.c.user_id).filter(event_assignees.c.event_id.in_(ids)),
+            )
+        )
+        await session.execute(delete(event_assignees).where(event_assignees.c.event_id.in_(ids)))
+    await session.execute(delete(entity).where(entity.id.in_(ids)))
+    return rows
+
+async def archive(resources, older_than: timedelta | None = None, batch_size: int | None = None,
+                  now: datetime | None = None) -> dict[str, int]:
+    """Archive everything older than ``older_than``, one committed batch at a time. Returns row counts."""
+    settings = resources.settings
+    older_than = older_than if older_than is not None else timedelta(days=settings.archive_after_days)
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = (now or datetime.now(timezone.utc)) - older_than
+    counts = {}
+    for entity, kind in ((Chore, "chore"), (Event, "event")):
+        route = f"{kind}s"
+        counts[route] = 0
+        after_id = 0
+        while True:
+            async with resources.database.async_session() as session:
+                rows = await archive_batch(session, entity, cutoff, batch_size, after_id)
+                families: dict[int, list[int]] = {}
+                for family_id, id_ in rows:
+                    families.setdefault(family_id, []).append(id_)
+                versions = {family_id: await bump_family_version(session, family_id) for family_id in families}
+                await session.commit()
+            for family_id, ids in families.items():
+                await resources.response_cache.invalidate(family_id, route)
+                await resources.broker.publish(family_id, f"{kind}.archived", ids=ids, version=versions[family_id])
+            counts[route] += len(rows)
+            if len(rows) < batch_size:
+                break
+            after_id = rows[-1][1]
+    return counts
+
+async def run_periodically(resources, interval: float) -> None:
+    """Archive every ``interval`` seconds until cancelled (started by ``Resources.start``)."""
+    while True:
+        try:
+            counts = await archive(resources)
+            if any(counts.values()):
+                logger.info("Archived %d chores and %d events", counts["chores"], counts["events"])
+        except Exception:
+            logger.exception("Archive run failed")
+        await asyncio.sleep(interval)
+
+async def _run(args) -> None:
+    from .resources import Resources
+    from .settings import Settings
+
+    resources = Resources(Settings.from_env())
+    try:
+        older_than = timedelta(days=args.older_than_days) if args.older_than_days is not None else None
+        counts = await archive(resources, older_than, args.batch_size)
+    finally:
+        await resources.close()
+    print(f"Archived {counts['chores']} chores and {counts['events']} events")
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=float, help="default: ARCHIVE_AFTER_DAYS (90)")
+    parser.add_argument("--batch-size", type=int, help="rows per transaction (default: ARCHIVE_BATCH_SIZE)")
+    asyncio.run(_run(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Load benchmark: drive every API route in-process and report latency and SQL.
+
+    python -m app.bench --seed --families 20 --requests 200 --concurrency 10 --output bench.json
+    python -m app.bench --routes chores --compare bench.json
+
+Requests go through the ASGI app with httpx (no network or server), from
+``--concurrency`` concurrent clients spread over the seeded families. For each
+route it reports throughput, p50/p95/p99 latency and SQL statements per
+request, and writes the results to ``--output`` as JSON so runs can be
+compared. The database is the one ``DATABASE_URL`` points at. Needs the
+packages in requirements-dev.txt (httpx).
+
+GET /stream/ is left out: it holds a connection open rather than answering.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from uuid import uuid4
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from .hashing import pwd_context
+from .models import Chore, Event, Family, RefreshSession, User
+from .query_budget import count_queries
+from .recurrence import naive_utc
+from .seed import SEED_PASSWORD
+from .sessions import encode_refresh_token
+
+# Recurring series created per family for the occurrence routes
+SERIES_START = datetime(2025, 1, 1, 18, tzinfo=timezone.utc)
+TOKEN_LIFETIME = timedelta(hours=6)
+
+@dataclass
+class FamilyContext:
+    family_id: int
+    admin_id: int
+    admin_username: str
+    token: str
+    member_ids: list[int]
+    chore_ids: list[int]
+    chore_series_id: int
+    event_series_id: int
+    # New events are booked from here on, after every existing one, so conflict checks pass
+    booking_start: datetime
+    # Rows made beforehand for routes that use one up per request
+    spare: dict[str, list] = field(default_factory=dict)
+
+@dataclass
+class Route:
+    name: str
+    method: str
+    path: Callable[[FamilyContext, int], str]
+    body: Callable[[FamilyContext, int], Any] | None = None
+    expect: tuple[int, ...] = (200,)
+    # Spare rows this route consumes, see ``prepare``
+    consumes: str | None = None
+    token: Callable[[FamilyContext, int], str | None] | None = None
+
+def _iso(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+def _booking(family: FamilyContext, n: int, hours: int = 1) -> dict:
+    start = family.booking_start + timedelta(hours=2 * n)
+    return {"start_time": _iso(start), "end_time": _iso(start + timedelta(hours=hours))}
+
+def routes(run: str) -> list[Route]:
+    """One entry per route in ``app/routes`` (plus /health). ``run`` keeps created names unique."""
+    window = "from=2025-03-01T00:00:00Z&to=2025-04-01T00:00:00Z"
+    return [
+        Route("POST /auth/register", "POST", lambda f, n: "/auth/register",
+              lambda f, n: {"username": f"bench{run}_{f.family_id}_{n}", "email": f"bench{run}_{f.family_id}_{n}@example.com",
+                            "password": SEED_PASSWORD}, expect=(201,), token=lambda f, n: None),
+        Route("POST /auth/login", "POST", lambda f, n: "/auth/login",
+              lambda f, n: {"username": f.admin_username, "password": SEED_PASSWORD}, token=lambda f, n: None),
+        Route("POST /auth/refresh", "POST", lambda f, n: "/auth/refresh",
+              lambda f, n: {"refresh_token": f.spare["refresh_tokens"][n]}, consumes="refresh_tokens", token=lambda f, n: None),
+        Route("POST /auth/logout", "POST", lambda f, n: "/auth/logout",
+              lambda f, n: {"refresh_token": f.spare["logout_tokens"][n]}, consumes="logout_tokens", token=lambda f, n: None),
+        Route("GET /auth/me", "GET", lambda f, n: "/auth/me"),
+        Route("POST /families/", "POST", lambda f, n: "/families/", lambda f, n: {"name": f"Bench family {n}"},
+              expect=(201,), consumes="loners", token=lambda f, n: f.spare["loners"][n]),
+        Route("GET /families/my-family", "GET", lambda f, n: "/families/my-family"),
+        Route("GET /families/{id}/members", "GET", lambda f, n: f"/families/{f.family_id}/members"),
+        Route("POST /families/{id}/members", "POST", lambda f, n: f"/families/{f.family_id}/members",
+              lambda f, n: {"username": f"benchm{run}_{f.family_id}_{n}", "email": f"benchm{run}_{f.family_id}_{n}@example.com",
+                            "temporary_password": SEED_PASSWORD}),
+        Route("DELETE /families/{id}/members/{user_id}", "DELETE",
+              lambda f, n: f"/families/{f.family_id}/members/{f.spare['members'][n]}", consumes="members"),
+        Route("POST /chores/", "POST", lambda f, n: "/chores/",
+              lambda f, n: {"title": f"Bench chore {n}", "family_id": f.family_id, "assigned_to_id": f.member_ids[n % len(f.member_ids)]},
+              expect=(201,)),
+        Route("POST /chores/batch", "POST", lambda f, n: "/chores/batch",
+              lambda f, n: {"create": [{"title": f"Bench batch chore {n}.{k}", "family_id": f.family_id,
+                                        "assigned_to_id": f.member_ids[k % len(f.member_ids)]} for k in range(20)]}),
+        Route("GET /chores/", "GET", lambda f, n: "/chores/"),
+        Route("GET /chores/?from=&to=", "GET", lambda f, n: f"/chores/?{window}"),
+        Route("PUT /chores/{id}", "PUT", lambda f, n: f"/chores/{f.chore_ids[n % len(f.chore_ids)]}",
+              lambda f, n: {"title": f"Updated chore {n}", "family_id": f.family_id, "assigned_to_id": f.admin_id}),
+        Route("DELETE /chores/{id}", "DELETE", lambda f, n: f"/chores/{f.spare['chores'][n]}", consumes="chores"),
+        Route("PUT /chores/{id}/occurrences/{recurrence_id}", "PUT",
+              lambda f, n: f"/chores/{f.chore_series_id}/occurrences/{_iso(SERIES_START + timedelta(days=2 * n))}",
+              lambda f, n: {"status": True}),
+        Route("DELETE /chores/{id}/occurrences/{recurrence_id}", "DELETE",
+              lambda f, n: f"/chores/{f.chore_series_id}/occurrences/{_iso(SERIES_START + timedelta(days=2 * n + 1))}"),
+        Route("POST /events/", "POST", lambda f, n: "/events/",
+              lambda f, n: {"title": f"Bench event {n}", "family_id": f.family_id, "assignee_ids": [f.admin_id],
+                            **_booking(f, n)}, expect=(201,)),
+        Route("POST /events/batch", "POST", lambda f, n: "/events/batch",
+              lambda f, n: {"create": [{"title": f"Bench batch event {n}.{k}", "family_id": f.family_id,
+                                        "assignee_ids": [f.member_ids[-1]], **_booking(f, 20 * n + k)} for k in range(20)]}),
+        Route("GET /events/", "GET", lambda f, n: "/events/"),
+        Route("GET /events/?from=&to=", "GET", lambda f, n: f"/events/?{window}"),
+        Route("GET /events/free-busy", "GET", lambda f, n: f"/events/free-busy?{window}"),
+        Route("DELETE /events/{id}", "DELETE", lambda f, n: f"/events/{f.spare['events'][n]}", consumes="events"),
+        Route("PUT /events/{id}/occurrences/{recurrence_id}", "PUT",
+              lambda f, n: f"/events/{f.event_series_id}/occurrences/{_iso(SERIES_START + timedelta(days=2 * n))}",
+              lambda f, n: {"title": "Moved"}),
+        Route("DELETE /events/{id}/occurrences/{recurrence_id}", "DELETE",
+              lambda f, n: f"/events/{f.event_series_id}/occurrences/{_iso(SERIES_START + timedelta(days=2 * n + 1))}"),
+        Route("GET /dashboard/", "GET", lambda f, n: "/dashboard/"),
+        Route("GET /search/", "GET", lambda f, n: "/search/?q=series"),
+        Route("GET /export/", "GET", lambda f, n: "/export/"),
+        Route("GET /stats/", "GET", lambda f, n: "/stats/"),
+        Route("GET /health", "GET", lambda f, n: "/health", token=lambda f, n: None),
+    ]
+
+def _token(user) -> str:
+    from .utils import create_access_token, principal_claims
+    return create_access_token(principal_claims(user), TOKEN_LIFETIME)
+
+def load_families(session: Session, count: int) -> list[FamilyContext]:
+    """Contexts for up to ``count`` seeded families, each with a daily chore and event series."""
+    families = session.execute(
+        select(Family).filter(Family.name.like("Seed family %"), Family.admin_id.is_not(None)).order_by(Family.id).limit(count)
+    ).scalars().all()
+    contexts = []
+    for family in families:
+        members = session.execute(select(User).filter(User.family_id == family.id).order_by(User.id)).scalars().all()
+        admin = next(member for member in members if member.id == family.admin_id)
+        chore_ids = session.execute(select(Chore.id).filter(Chore.family_id == family.id, Chore.rrule.is_(None))
+                                    .order_by(Chore.id).limit(100)).scalars().all()
+        chore_series_id = session.execute(insert(Chore).returning(Chore.id), {
+            "title": "Bench series", "family_id": family.id, "assigned_to_id": admin.id,
+            "due_at": SERIES_START, "rrule": "FREQ=DAILY",
+        }).scalar_one()
+        event_series_id = session.execute(insert(Event).returning(Event.id), {
+            "title": "Bench series", "family_id": family.id, "start_time": SERIES_START,
+            "end_time": SERIES_START + timedelta(minutes=30), "rrule": "FREQ=DAILY",
+        }).scalar_one()
+        last_end = session.execute(select(func.max(Event.end_time)).filter(Event.family_id == family.id)).scalar()
+        booking_start = max(SERIES_START, naive_utc(last_end).replace(tzinfo=timezone.utc) if last_end else SERIES_START)
+        contexts.append(FamilyContext(
+            family_id=family.id, admin_id=admin.id, admin_username=admin.username, token=_token(admin),
+            member_ids=[member.id for member in members], chore_ids=list(chore_ids),
+            chore_series_id=chore_series_id, event_series_id=event_series_id,
+            booking_start=booking_start.replace(minute=0, second=0, microsecond=0) + timedelta(days=1),
+        ))
+    session.commit()
+    return contexts
+
+def prepare(session: Session, families: list[FamilyContext], kind: str, count: int, run: str) -> None:
+    """Create ``count`` spare rows of ``kind`` per family, outside the timed section."""
+    password_hash = pwd_context.hash(SEED_PASSWORD)
+    for family in families:
+        if kind == "chores":
+            rows = [{"title": f"Spare chore {n}", "family_id": family.family_id, "assigned_to_id": family.admin_id}
+                    for n in range(count)]
+            family.spare[kind] = session.execute(insert(Chore).returning(Chore.id), rows).scalars().all()
+        elif kind == "events":
+            rows = [{"title": f"Spare event {n}", "family_id": family.family_id, "start_time": SERIES_START,
+                     "end_time": SERIES_START + timedelta(hours=1)} for n in range(count)]
+            family.spare[kind] = session.execute(insert(Event).returning(Event.id), rows).scalars().all()
+        elif kind in ("members", "loners"):
+            rows = [{"username": f"bench{kind}{run}_{family.family_id}_{n}", "email": f"bench{kind}{run}_{family.family_id}_{n}@example.com",
+                     "password_hash": password_hash, "family_id": family.family_id if kind == "members" else None}
+                    for n in range(count)]
+            users = session.execute(insert(User).returning(User), rows).scalars().all()
+            family.spare[kind] = [user.id for user in users] if kind == "members" else [_token(user) for user in users]
+        elif kind in ("refresh_tokens", "logout_tokens"):
+            expires_at = datetime.now(timezone.utc) + TOKEN_LIFETIME
+            session_ids = session.execute(insert(RefreshSession).returning(RefreshSession.id),
+                                          [{"user_id": family.admin_id, "expires_at": expires_at}] * count).scalars().all()
+            family.spare[kind] = [encode_refresh_token(family.admin_username, session_id, 0, expires_at)
+                                  for session_id in session_ids]
+    session.commit()
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values) + 0.5) - 1))]
+
+async def run_route(client, route: Route, families: list[FamilyContext], requests: int, warmup: int,
+                    concurrency: int) -> dict:
+    latencies: list[float] = []
+    statements: list[int] = []
+    statuses: Counter = Counter()
+    errors: list[str] = []
+    pending = iter(range(warmup + requests))
+
+    async def client_loop():
+        for i in pending:
+            family, n = families[i % len(families)], i // len(families)
+            token = route.token(family, n) if route.token else family.token
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            body = route.body(family, n) if route.body else None
+            with count_queries() as queries:
+                started = time.perf_counter()
+                response = await client.request(route.method, route.path(family, n), json=body, headers=headers)
+                elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            statements.append(queries.count)
+            statuses[response.status_code] += 1
+            if response.status_code not in route.expect and len(errors) < 3:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+
+    # Warm-up requests run before the clock starts
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "route": route.name,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": sum(count for status, count in statuses.items() if status not in route.expect),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "error_samples": errors,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "sql_per_request": {
+            "mean": round(sum(statements) / len(statements), 2) if statements else 0.0,
+            "max": max(statements, default=0),
+        },
+    }
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results: list[dict], previous: dict | None = None) -> None:
+    baseline = {result["route"]: result for result in previous["results"]} if previous else {}
+    header = f"{'route':<50} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql':>5} {'err':>4}"
+    print(header + ("  Δp50    Δreq/s" if baseline else ""))
+    for result in results:
+        latency = result["latency_ms"]
+        line = (f"{result['route']:<50} {result['throughput_rps']:>9.1f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+                f"{latency['p99']:>8.2f} {result['sql_per_request']['mean']:>5.1f} {result['errors']:>4}")
+        before = baseline.get(result["route"])
+        if before and before["latency_ms"]["p50"] and before["throughput_rps"]:
+            line += (f"  {(latency['p50'] / before['latency_ms']['p50'] - 1) * 100:+5.0f}%"
+                     f"  {(result['throughput_rps'] / before['throughput_rps'] - 1) * 100:+6.0f}%")
+        print(line)
+        for sample in result["error_samples"]:
+            print(f"    {sample}")
+
+async def run(args) -> dict:
+    try:
+        import httpx
+    except ImportError as exc:
+        raise SystemExit("The benchmark needs the 'httpx' package") from exc
+    from .database import Base
+    from .main import create_app
+    from .runtime import activate
+    from .seed import seed
+    from .settings import Settings
+
+    app = create_app(Settings.from_env(**({"response_cache_backend": "none"} if args.no_cache else {})))
+    resources = app.state.resources
+    database = resources.database
+    if args.seed:
+        Base.metadata.create_all(bind=database.engine)
+        with database.session() as session:
+            seed(session, args.families, args.members, args.chores, args.events, args.rng_seed)
+
+    run_id = uuid4().hex[:8]
+    selected = [route for route in routes(run_id) if not args.routes or any(part in route.name for part in args.routes)]
+    results = []
+    # Requests run inside the app; tokens minted here need its settings too
+    with activate(resources), database.session() as session:
+        families = load_families(session, args.families)
+        if not families:
+            raise SystemExit("No seeded families found, run with --seed first")
+        per_family = (args.requests + args.warmup) // len(families) + 1
+        for kind in {route.consumes for route in selected if route.consumes}:
+            prepare(session, families, kind, per_family, run_id)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for route in selected:
+                results.append(await run_route(client, route, families, args.requests, args.warmup, args.concurrency))
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "database": database.engine.dialect.name,
+            "families": len(families),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "response_cache": not args.no_cache,
+        },
+        "results": results,
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="create tables and seed data first")
+    parser.add_argument("--families", type=int, default=10, help="families to seed and to spread requests over")
+    parser.add_argument("--members", type=int, default=4, help="members per seeded family")
+    parser.add_argument("--chores", type=int, default=200, help="chores per seeded family")
+    parser.add_argument("--events", type=int, default=200, help="events per seeded family")
+    parser.add_argument("--rng-seed", type=int, default=0, help="random seed for the seeded data")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per route before measuring")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent clients")
+    parser.add_argument("--routes", nargs="*", help="only run routes whose name contains one of these")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--output", default="bench-results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="an earlier results file to show the change against")
+    args = parser.parse_args(argv)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_results(report["results"], previous)
+    print(f"Results written to {args.output}")
+    return 1 if any(result["errors"] for result in report["results"]) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,220 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-import os
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+import asyncio
+import itertools
+import uuid
+from .cache import TTLCache
+from .query_budget import install_query_counter
+from .pool_metrics import PoolMetrics, TimedAsyncAdaptedQueuePool, TimedNullPool, TimedQueuePool
+from .runtime import current
+from .settings import Settings
 
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
+# DATABASE_URL may name either a sync or an async driver; each engine gets the
+# matching driver for the same backend.
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+SYNC_DRIVERS = {"postgresql": "psycopg2", "sqlite": "pysqlite"}
+
+def is_async_url(url: str) -> bool:
+    return make_url(url).get_driver_name() in ASYNC_DRIVERS.values()
+
+def async_url(url: str):
+    url = make_url(url)
+    if is_async_url(url):
+        return url
+    return url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}")
+
+def sync_url(url: str):
+    url = make_url(url)
+    if not is_async_url(url):
+        return url
+    return url.set(drivername=f"{url.get_backend_name()}+{SYNC_DRIVERS[url.get_backend_name()]}")
+
+def engine_options(url, settings: Settings) -> dict:
+    url = make_url(url)
+    is_async = is_async_url(url)
+    if settings.db_pgbouncer:
+        options = {"poolclass": TimedNullPool}
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return options
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+class RoutingSession(Session):
+    """Runs reads on ``info["replica"]`` when one is set; writes always go to the primary.
+
+    The first write clears the replica, so the rest of the session reads its
+    own changes from the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None:
+            if not self._flushing and not isinstance(clause, UpdateBase):
+                return replica.sync_engine
+            self.info["replica"] = None
+        return super().get_bind(mapper, clause=clause, **kw)
+
+def record_write(session, family_id: int | None) -> None:
+    """Note that ``session``'s transaction writes the family's data.
+
+    Once it commits, the family's reads stay on the primary (see
+    ``Database.replica_for``) before the writer gets its response.
+    """
+    if family_id is not None:
+        session.info.setdefault("written_families", set()).add(family_id)
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_to_primary(session):
+    database = session.info.get("database")
+    for family_id in session.info.pop("written_families", ()):
+        if database is not None:
+            database.note_write(family_id)
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("written_families", None)
+
+class Database:
+    """Engines and session factories for one database, created on first use.
+
+    The API only uses the async engines; the sync one serves migrations and
+    maintenance scripts. With ``database_replica_urls`` set, read-only sessions
+    (see ``utils.get_read_db``) take turns over the replicas.
+    """
+
+    def __init__(self, settings: Settings):
+        if not settings.database_url:
+            raise RuntimeError("DATABASE_URL is not set")
+        self.settings = settings
+        self.pool_metrics = PoolMetrics()
+        self.replica_pool_metrics: list[PoolMetrics] = []
+        self._engine = None
+        self._session = None
+        self._async_engine = None
+        self._async_session = None
+        self.replica_urls = [url.strip() for url in (settings.database_replica_urls or "").split(",") if url.strip()]
+        self._replicas = None
+        self._next_replica = None
+        # Families written within the staleness window, whose reads stay on the primary
+        self.recent_writes = TTLCache(maxsize=100000, ttl=settings.replica_max_staleness)
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            url = sync_url(self.settings.database_url)
+            self._engine = create_engine(url, **engine_options(url, self.settings))
+            self._session = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+        return self._engine
+
+    def _create_async_engine(self, url):
+        url = async_url(url)
+        engine = create_async_engine(url, **engine_options(url, self.settings))
+        install_query_counter(engine)
+        return engine
+
+    @property
+    def async_engine(self):
+        if self._async_engine is None:
+            self._async_engine = self._create_async_engine(self.settings.database_url)
+            self.pool_metrics.attach(self._async_engine)
+            self._async_session = async_sessionmaker(
+                self._async_engine, class_=AsyncSession, sync_session_class=RoutingSession,
+                autoflush=False, expire_on_commit=False, info={"database": self},
+            )
+        return self._async_engine
+
+    @property
+    def replicas(self) -> list:
+        if self._replicas is None:
+            self._replicas = [self._create_async_engine(url) for url in self.replica_urls]
+            self.replica_pool_metrics = [PoolMetrics().attach(engine) for engine in self._replicas]
+            self._next_replica = itertools.cycle(self._replicas)
+        return self._replicas
+
+    def note_write(self, family_id: int | None) -> None:
+        """Keep the family's reads on the primary for ``replica_max_staleness`` seconds."""
+        if family_id is not None and self.replica_urls:
+            self.recent_writes.set(family_id, True)
+
+    def replica_for(self, family_id: int | None):
+        """The replica to read from next, or None for the primary.
+
+        Families written within ``replica_max_staleness`` seconds read from the
+        primary, so their members see their own changes.
+        """
+        if not self.replica_urls or (family_id is not None and self.recent_writes.get(family_id)):
+            self.primary_reads += 1
+            return None
+        self.replicas
+        self.replica_reads += 1
+        return next(self._next_replica)
+
+    def session(self) -> Session:
+        self.engine
+        return self._session()
+
+    def async_session(self) -> AsyncSession:
+        self.async_engine
+        return self._async_session()
+
+    async def warm_up(self) -> int:
+        """Open pooled connections to the primary and each replica ahead of the first requests.
+
+        Returns how many.
+        """
+        pool_size = engine_options(async_url(self.settings.database_url), self.settings).get("pool_size")
+        count = self.settings.db_warm_connections if self.settings.db_warm_connections is not None else pool_size
+        if not count:
+            return 0
+
+        connections = await asyncio.gather(
+            *(engine.connect() for engine in [self.async_engine, *self.replicas] for _ in range(count)),
+            return_exceptions=True,
+        )
+        try:
+            for conn in connections:
+                if isinstance(conn, BaseException):
+                    raise conn
+                await conn.execute(text("SELECT 1"))
+        finally:
+            for conn in connections:
+                if not isinstance(conn, BaseException):
+                    await conn.close()
+        return len(connections)
+
+    def replica_stats(self) -> dict:
+        return {"replicas": len(self.replica_urls), "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads}
+
+    async def dispose(self) -> None:
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+        for replica in self._replicas or ():
+            await replica.dispose()
+        if self._engine is not None:
+            self._engine.dispose()
+
+async def get_db():
+    """The request's session; FastAPI shares it between all dependencies of a request."""
+    async with current().database.async_session() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
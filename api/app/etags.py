@@ -0,0 +1,66 @@
+import hashlib
+from typing import Any, Callable
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import record_write
+from .models import Family
+from .principals import Principal
+from .utils import get_current_user, get_read_db
+
+async def bump_family_version(db: AsyncSession, family_id: int) -> int | None:
+    """Record a change to the family's chores, events or members.
+
+    Call inside the writing transaction, before it commits. Returns the new version.
+    """
+    record_write(db, family_id)
+    result = await db.execute(
+        update(Family).where(Family.id == family_id).values(version=Family.version + 1).returning(Family.version)
+    )
+    return result.scalar()
+
+def family_etag(request: Request, family_id: int, version: int, vary: Any = None) -> str:
+    # Different paths and query strings of the same family get distinct tags,
+    # and so do the values of whatever else the response depends on (``vary``)
+    params = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    suffix = "" if vary is None else f"#{vary}"
+    digest = hashlib.blake2b(f"{request.url.path}?{params}{suffix}".encode(), digest_size=6).hexdigest()
+    return f'W/"{family_id}-{version}-{digest}"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: the W/ prefix is ignored on both sides
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def no_vary() -> None:
+    return None
+
+def family_etag_check(vary: Callable[..., Any] = no_vary):
+    """Route dependency answering 304 when the caller's family has not changed.
+
+    Runs before the handler, so a match costs one primary-key lookup and no
+    rows are loaded or serialized. Returns the family's current version.
+    ``vary`` is a dependency for anything besides the family's data that the
+    response depends on, such as the current date; its value goes into the tag.
+    """
+    async def check(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_read_db),
+        current_user: Principal = Depends(get_current_user),
+        varies: Any = Depends(vary),
+    ) -> int | None:
+        if not current_user.family_id:
+            return None
+        version = (await db.execute(select(Family.version).where(Family.id == current_user.family_id))).scalar()
+        if version is None:
+            return None
+        etag = family_etag(request, current_user.family_id, version, varies)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return version
+    return check
+
+check_family_etag = family_etag_check()
@@ -0,0 +1,115 @@
+"""EXPLAIN the main query behind each route and flag sequential scans.
+
+    python -m app.explain [--seed] [--allow-seqscan]
+
+On PostgreSQL sequential scans are disabled for the session by default, so a
+``Seq Scan`` that is still chosen means no usable index exists. Exits with
+status 1 when any query is flagged.
+"""
+import argparse
+import json
+import sys
+from datetime import timedelta
+from sqlalchemy import Select, func, select
+from sqlalchemy.engine import Connection
+from .models import ArchivedChore, ArchivedEvent, Event, User, event_assignees
+from .pagination import DEFAULT_PAGE_SIZE
+from .queries import (
+    busy_event_series, busy_events, family_chore_series, family_chore_stats, family_chores, family_chores_due,
+    family_event_series, family_events, family_members, family_search, user_by_username,
+)
+
+def route_queries(conn: Connection) -> list[tuple[str, Select]]:
+    # Use the busiest family so the planner sees realistic row counts
+    family_id = conn.execute(
+        select(Event.family_id).group_by(Event.family_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    if family_id is None:
+        raise SystemExit("No events found, seed the database first (--seed)")
+    user = conn.execute(select(User.id, User.username).filter(User.family_id == family_id).limit(1)).one()
+    window_start = conn.execute(select(func.min(Event.start_time)).filter(Event.family_id == family_id)).scalar()
+    window = (window_start, window_start + timedelta(days=35))
+    event_ids = conn.execute(family_events(family_id).with_only_columns(Event.id).limit(DEFAULT_PAGE_SIZE)).scalars().all()
+    page = DEFAULT_PAGE_SIZE + 1
+    return [
+        ("principal lookup (get_current_user)", user_by_username(user.username)),
+        ("GET /chores/", family_chores(family_id).limit(page)),
+        ("GET /chores/?assigned_to_id=", family_chores(family_id, assigned_to_id=user.id).limit(page)),
+        ("GET /chores/?from=&to=", family_chores_due(family_id, *window).limit(page)),
+        ("GET /chores/?from=&to= series", family_chore_series(family_id, *window)),
+        ("GET /events/", family_events(family_id).limit(page)),
+        ("GET /events/?from=&to=", family_events(family_id, *window).limit(page)),
+        ("GET /events/?from=&to= series", family_event_series(family_id, *window)),
+        ("GET /chores/?include_archived=", family_chores(family_id, entity=ArchivedChore).limit(page)),
+        ("GET /events/?include_archived=", family_events(family_id, *window, entity=ArchivedEvent).limit(page)),
+        ("GET /events/free-busy", busy_events(family_id, [user.id], *window)),
+        ("GET /events/free-busy series", busy_event_series(family_id, [user.id], *window)),
+        ("GET /events/ assignees", select(event_assignees.c.event_id, User)
+            .join(event_assignees, User.id == event_assignees.c.user_id)
+            .filter(event_assignees.c.event_id.in_(event_ids))),
+        ("GET /families/{id}/members", family_members(family_id)),
+        ("GET /search/", family_search(family_id, "event", conn.dialect.name).limit(page)),
+        ("GET /stats/", family_chore_stats(family_id)),
+    ]
+
+def _compile(conn: Connection, statement: Select) -> str:
+    return str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+def explain(conn: Connection, statement: Select) -> tuple[list[str], list[str]]:
+    """Return the plan as text lines and the tables read by a full scan."""
+    sql = _compile(conn, statement)
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        lines, scans = [], []
+
+        def walk(node, depth=0):
+            relation = node.get("Relation Name")
+            lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else ""))
+            if node["Node Type"] == "Seq Scan":
+                scans.append(relation)
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"])
+        return lines, scans
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    lines = [row[-1] for row in rows]
+    # SQLite reports full table (or full index) scans as "SCAN <table> ..."
+    scans = [line.split()[1] for line in lines if line.startswith("SCAN ")]
+    return lines, scans
+
+def main(argv=None) -> int:
+    from .database import Base, Database
+    from .seed import seed
+    from .settings import Settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="create tables and seed sample data first")
+    parser.add_argument("--allow-seqscan", action="store_true", help="leave enable_seqscan on (PostgreSQL)")
+    args = parser.parse_args(argv)
+
+    database = Database(Settings.from_env())
+    if args.seed:
+        Base.metadata.create_all(bind=database.engine)
+        with database.session() as session:
+            seed(session, families=20, members=5, chores=500, events=500)
+
+    flagged = 0
+    with database.engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE")
+            if not args.allow_seqscan:
+                conn.exec_driver_sql("SET enable_seqscan = off")
+        for label, statement in route_queries(conn):
+            lines, scans = explain(conn, statement)
+            status = f"SEQ SCAN on {', '.join(scans)}" if scans else "ok"
+            flagged += bool(scans)
+            print(f"{label}: {status}")
+            for line in lines:
+                print(f"    {line}")
+        conn.rollback()
+    return 1 if flagged else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
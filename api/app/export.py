@@ -0,0 +1,277 @@
+"""Export a family's data, and import an export into a family.
+
+    python -m app.export export --family-id 3 [--format csv --table chore] [-o FILE]
+    python -m app.export import FILE --family-id 3
+
+An NDJSON export has one ``{"type": table, ...columns}`` object per row, tables
+in dependency order; a CSV export holds a single table. Chores and events
+include their archived rows. Rows are read through server-side cursors and
+written a partition at a time, so memory use does not grow with the family.
+``GET /export/`` streams the same bytes.
+
+An import adds the chores and events of an NDJSON export to an existing
+family in one transaction, in batches of multi-row INSERTs. They get new
+ids, and users are matched by username since exports carry no credentials;
+a reference to someone who is not a member of the family aborts the import.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterable
+from sqlalchemy import DateTime, Select, insert, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from .etags import bump_family_version
+from .models import (
+    ArchivedChore, ArchivedEvent, Chore, ChoreOccurrence, Event, EventOccurrence, Family, User, archived_event_assignees,
+    event_assignees,
+)
+from .serialization import dumps
+from .stats import rebuild_family
+
+BATCH_SIZE = 1000
+
+def _columns(table) -> list:
+    # Generated columns are the database's to fill
+    return [column for column in table.c if column.computed is None]
+
+def _with_archive(entity, archive, family_id: int) -> Select:
+    # Archived rows kept their ids, so both tables export as one
+    names = [column.name for column in _columns(entity.__table__)]
+    rows = union_all(*(
+        select(*(table.__table__.c[name] for name in names)).filter(table.family_id == family_id)
+        for table in (entity, archive)
+    )).subquery()
+    return select(rows).order_by(rows.c.id)
+
+def _assignees(family_id: int) -> Select:
+    rows = union_all(*(
+        select(assignees.c.event_id, assignees.c.user_id)
+        .join(table, table.id == assignees.c.event_id).filter(table.family_id == family_id)
+        for table, assignees in ((Event, event_assignees), (ArchivedEvent, archived_event_assignees))
+    )).subquery()
+    return select(rows).order_by(rows.c.event_id, rows.c.user_id)
+
+EXPORTS: dict[str, Callable[[int], Select]] = {
+    "family": lambda family_id: select(Family.id, Family.name, Family.admin_id).filter(Family.id == family_id),
+    "user": lambda family_id: (
+        select(User.id, User.username, User.email).filter(User.family_id == family_id).order_by(User.id)
+    ),
+    "chore": lambda family_id: _with_archive(Chore, ArchivedChore, family_id),
+    "chore_occurrence": lambda family_id: (
+        select(*_columns(ChoreOccurrence.__table__)).join(Chore, Chore.id == ChoreOccurrence.chore_id)
+        .filter(Chore.family_id == family_id).order_by(ChoreOccurrence.chore_id, ChoreOccurrence.recurrence_id)
+    ),
+    "event": lambda family_id: _with_archive(Event, ArchivedEvent, family_id),
+    "event_occurrence": lambda family_id: (
+        select(*_columns(EventOccurrence.__table__)).join(Event, Event.id == EventOccurrence.event_id)
+        .filter(Event.family_id == family_id).order_by(EventOccurrence.event_id, EventOccurrence.recurrence_id)
+    ),
+    "event_assignee": _assignees,
+}
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+async def _partitions(session: AsyncSession, family_id: int,
+                      tables: Iterable[str]) -> AsyncIterator[tuple[str, list[str], list]]:
+    if session.bind.dialect.name == "postgresql":
+        # One snapshot across all tables
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    for table in tables:
+        result = await session.stream(EXPORTS[table](family_id).execution_options(yield_per=BATCH_SIZE))
+        # Plain str names; orjson refuses str subclasses as keys
+        keys = [str(key) for key in result.keys()]
+        async for rows in result.partitions():
+            yield table, keys, rows
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+async def export_family(session: AsyncSession, family_id: int, tables: list[str],
+                        format: str = "ndjson") -> AsyncIterator[bytes]:
+    """The family's rows of ``tables`` encoded as ``format``, one chunk per partition."""
+    if format == "csv":
+        if len(tables) != 1:
+            raise ValueError("A CSV export holds exactly one table")
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORTS[tables[0]](family_id).selected_columns.keys())
+        async for _, _, rows in _partitions(session, family_id, tables):
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+    async for table, keys, rows in _partitions(session, family_id, tables):
+        yield b"".join(dumps({"type": table, **dict(zip(keys, row))}) + b"\n" for row in rows)
+
+class _Importer:
+    def __init__(self, session: AsyncSession, family_id: int, members: dict[str, int]):
+        self.session = session
+        self.family_id = family_id
+        self.members = members
+        # Exported id -> id in this database
+        self.users: dict[int, int] = {}
+        self.usernames: dict[int, str] = {}
+        self.chores: dict[int, int] = {}
+        self.events: dict[int, int] = {}
+        self.counts = {"chore": 0, "chore_occurrence": 0, "event": 0, "event_occurrence": 0, "event_assignee": 0}
+
+    def user(self, user_id: int | None) -> int | None:
+        if user_id is None:
+            return None
+        if user_id not in self.users:
+            raise ValueError(f"User {self.usernames.get(user_id, user_id)!r} is not a member of family {self.family_id}")
+        return self.users[user_id]
+
+    def add_user(self, record: dict) -> None:
+        self.usernames[record["id"]] = record["username"]
+        if record["username"] in self.members:
+            self.users[record["id"]] = self.members[record["username"]]
+
+    async def flush(self, table: str, records: list[dict]) -> None:
+        if not records:
+            return
+        try:
+            await self.insert(table, records)
+        except KeyError as exc:
+            raise ValueError(f"A {table} row refers to {exc.args[0]}, which is not in the export")
+        self.counts[table] += len(records)
+
+    async def insert(self, table: str, records: list[dict]) -> None:
+        if table in ("chore", "event"):
+            entity, ids = (Chore, self.chores) if table == "chore" else (Event, self.events)
+            rows = [self.row(entity.__table__, record, family_id=self.family_id) for record in records]
+            for row in rows:
+                del row["id"]
+                if table == "chore":
+                    row["assigned_to_id"] = self.user(row["assigned_to_id"])
+            # Core rather than ORM bulk inserts: the ORM splits rows by which columns are None.
+            # One multi-row INSERT assigns ids in row order (see batch_chores)
+            result = await self.session.execute(insert(entity.__table__).returning(entity.id), rows)
+            ids.update(zip((record["id"] for record in records), sorted(result.scalars().all())))
+        elif table == "chore_occurrence":
+            rows = [self.row(ChoreOccurrence.__table__, record, chore_id=self.chores[record["chore_id"]],
+                             assigned_to_id=self.user(record.get("assigned_to_id"))) for record in records]
+            await self.session.execute(insert(ChoreOccurrence.__table__), rows)
+        elif table == "event_occurrence":
+            rows = [self.row(EventOccurrence.__table__, record, event_id=self.events[record["event_id"]])
+                    for record in records]
+            await self.session.execute(insert(EventOccurrence.__table__), rows)
+        else:
+            rows = [{"event_id": self.events[record["event_id"]], "user_id": self.user(record["user_id"])}
+                    for record in records]
+            await self.session.execute(insert(event_assignees), rows)
+
+    @staticmethod
+    def row(table, record: dict, **values) -> dict:
+        row = {}
+        for column in _columns(table):
+            value = values[column.name] if column.name in values else record.get(column.name)
+            if isinstance(column.type, DateTime) and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            row[column.name] = value
+        return row
+
+async def import_family(session: AsyncSession, family_id: int, lines: Iterable[str]) -> dict[str, int]:
+    """Add the chores and events of an NDJSON export to ``family_id``. Returns row counts; does not commit.
+
+    Raises ValueError for malformed input or references that cannot be resolved.
+    """
+    if (await session.execute(select(Family.id).filter(Family.id == family_id))).scalar() is None:
+        raise ValueError(f"Family {family_id} not found")
+    result = await session.execute(select(User.username, User.id).filter(User.family_id == family_id))
+    importer = _Importer(session, family_id, dict(result.all()))
+    table, pending = None, []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        kind = record.pop("type", None)
+        if kind == "family":
+            continue
+        if kind == "user":
+            importer.add_user(record)
+            continue
+        if kind not in importer.counts:
+            raise ValueError(f"Line {number}: unknown record type {kind!r}")
+        # Exports list each table's rows together, parents first
+        if kind != table or len(pending) >= BATCH_SIZE:
+            await importer.flush(table, pending)
+            table, pending = kind, []
+        pending.append(record)
+    await importer.flush(table, pending)
+    if importer.counts["chore"]:
+        await rebuild_family(session, family_id)
+    if any(importer.counts.values()):
+        await bump_family_version(session, family_id)
+    return importer.counts
+
+async def _export(args, database) -> None:
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async with database.async_session() as session:
+            async for chunk in export_family(session, args.family_id, args.table or list(EXPORTS), args.format):
+                output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+async def _import(args, database, settings) -> None:
+    from .response_cache import ResponseCache, backend_from_settings
+
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    try:
+        async with database.async_session() as session:
+            counts = await import_family(session, args.family_id, source)
+            await session.commit()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    # Shared response caches would otherwise serve the family's old lists until they expire
+    cache = ResponseCache(backend_from_settings(settings), ttl=settings.response_cache_ttl)
+    if cache.backend is not None:
+        await cache.invalidate(args.family_id)
+        await cache.backend.close()
+    print(", ".join(f"{count} {table} rows" for table, count in counts.items()), "imported", file=sys.stderr)
+
+async def _run(args) -> None:
+    from .database import Database
+    from .settings import Settings
+
+    settings = Settings.from_env()
+    database = Database(settings)
+    try:
+        if args.command == "export":
+            await _export(args, database)
+        else:
+            await _import(args, database, settings)
+    finally:
+        await database.dispose()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write a family's data to a file or stdout")
+    export.add_argument("--family-id", type=int, required=True)
+    export.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    export.add_argument("--table", action="append", choices=list(EXPORTS), help="only these tables (repeatable)")
+    export.add_argument("-o", "--output", help="output file (default: stdout)")
+    load = commands.add_parser("import", help="add the chores and events of an NDJSON export to a family")
+    load.add_argument("file", help="NDJSON export, or - for stdin")
+    load.add_argument("--family-id", type=int, required=True, help="family to import into")
+    args = parser.parse_args(argv)
+    if args.command == "export" and args.format == "csv" and len(args.table or EXPORTS) != 1:
+        parser.error("a CSV export holds one table, pick it with --table")
+    try:
+        asyncio.run(_run(args))
+    except ValueError as exc:
+        raise SystemExit(f"{args.command.capitalize()} failed: {exc}")
+
+if __name__ == "__main__":
+    main()
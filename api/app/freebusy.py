@@ -0,0 +1,95 @@
+"""Assignee busy time for conflict checks and the free/busy endpoint."""
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from .intervals import Booking, BusyIndex
+from .models import Event, User
+from .queries import busy_event_series, busy_events
+from .recurrence import naive_utc, occurrences
+from .runtime import current
+
+def max_window() -> timedelta:
+    """Longest free/busy window, and how far ahead a recurring event is checked for conflicts."""
+    return timedelta(days=current().settings.free_busy_max_days)
+
+Span = tuple[datetime, datetime]
+
+def as_output(value: datetime, reference: datetime) -> datetime:
+    # Busy time is computed in naive UTC; answer in the caller's convention
+    return value.replace(tzinfo=timezone.utc) if reference.tzinfo is not None else value
+
+def event_spans(rrule: str | None, start: datetime, end: datetime) -> list[Span]:
+    """The spans an event would occupy: its own, or its occurrences within ``max_window()``."""
+    if not rrule:
+        return [(start, end)]
+    return [
+        (occurrence.start, occurrence.end)
+        for occurrence in occurrences(rrule, start, end - start, (), lambda _: (None, None), start, start + max_window())
+    ]
+
+async def load_busy(db: AsyncSession, family_id: int, user_ids: Iterable[int], from_: datetime, to: datetime,
+                    exclude: Iterable[int] = ()) -> dict[int, BusyIndex]:
+    """Busy time of each user in [from, to), ignoring the events in ``exclude``.
+
+    Recurring events are expanded over the window only.
+    """
+    user_ids, exclude = list(user_ids), set(exclude)
+    bookings: dict[int, list[Booking]] = {user_id: [] for user_id in user_ids}
+    if user_ids:
+        result = await db.execute(busy_events(family_id, user_ids, from_, to))
+        for user_id, event_id, start, end in result:
+            if event_id not in exclude:
+                bookings[user_id].append(Booking(naive_utc(start), naive_utc(end), event_id))
+        result = await db.execute(
+            busy_event_series(family_id, user_ids, from_, to).options(selectinload(Event.occurrences))
+        )
+        for event, user_id in result:
+            if event.id in exclude:
+                continue
+            for occurrence in occurrences(
+                event.rrule, event.start_time, event.end_time - event.start_time, event.occurrences,
+                lambda override: (override.start_time, override.end_time), from_, to,
+            ):
+                bookings[user_id].append(Booking(naive_utc(occurrence.start), naive_utc(occurrence.end), event.id))
+    return {user_id: BusyIndex(items) for user_id, items in bookings.items()}
+
+def window(spans: Iterable[Span]) -> Span | None:
+    """From the earliest start to the latest end of ``spans``; None if there are none."""
+    spans = list(spans)
+    if not spans:
+        return None
+    return min((start for start, _ in spans), key=naive_utc), max((end for _, end in spans), key=naive_utc)
+
+def booked(busy: dict[int, BusyIndex], user_ids: Iterable[int], spans: Iterable[Span]) -> dict[int, list[int]]:
+    """Ids of the events each user is already booked for during any of ``spans``."""
+    spans = [(naive_utc(start), naive_utc(end)) for start, end in spans]
+    conflicts = {}
+    for user_id in dict.fromkeys(user_ids):
+        event_ids = {booking.event_id for start, end in spans for booking in busy[user_id].conflicts(start, end)}
+        if event_ids:
+            conflicts[user_id] = sorted(event_ids)
+    return conflicts
+
+def locking_assignees(query: Select) -> Select:
+    """``query`` of users, locking their rows in id order until the transaction ends.
+
+    A conflict check reads the assignees' events before the write inserts its
+    own; with the assignees locked first, two writers cannot both find the
+    same time free.
+    """
+    return query.order_by(User.id).with_for_update()
+
+async def find_conflicts(db: AsyncSession, family_id: int, user_ids: Iterable[int], spans: Iterable[Span],
+                         exclude: Iterable[int] = ()) -> dict[int, list[int]]:
+    user_ids, spans = list(dict.fromkeys(user_ids)), list(spans)
+    if not user_ids or not spans:
+        return {}
+    busy = await load_busy(db, family_id, user_ids, *window(spans), exclude)
+    return booked(busy, user_ids, spans)
+
+def conflict_detail(conflicts: dict[int, list[int]]) -> str:
+    return "Assignees are already booked: " + "; ".join(
+        f"user {user_id} in event(s) {', '.join(map(str, event_ids))}" for user_id, event_ids in conflicts.items()
+    )
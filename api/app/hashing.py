@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+# Password hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Executed inside the worker processes
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _warm() -> int:
+    # Loads the bcrypt backend so the first real hash does not pay for it
+    pwd_context.handler("bcrypt").get_backend()
+    return os.getpid()
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated process pool behind a bounded admission queue.
+
+    At most ``workers`` hashes run at once and ``queue_size`` more may wait;
+    anything beyond that is shed with a 503 and a ``Retry-After`` hint instead
+    of piling up behind the CPU.
+    """
+
+    def __init__(self, workers: int | None = None, queue_size: int = 64, retry_after: int = 1):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def warm_up(self) -> int:
+        """Spawn every worker process now rather than on the first logins. Returns how many are up."""
+        loop = asyncio.get_running_loop()
+        executor = self.start()
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, _warm) for _ in range(self.workers)))
+        return len(set(pids))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    async def _run(self, fn, *args):
+        if self._in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations, please retry",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.start(), fn, *args)
+        finally:
+            self._in_flight -= 1
+            elapsed = time.perf_counter() - started
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "queue_size": self.queue_size,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            "max_latency_seconds": self.max_seconds,
+        }
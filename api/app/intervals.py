@@ -0,0 +1,67 @@
+"""Busy-time index over half-open [start, end) intervals.
+
+Intervals are sorted and merged once into disjoint blocks; a lookup is then a
+binary search over the block ends. Checking m intervals against n booked ones
+costs O((n + m) log n) instead of comparing every pair.
+"""
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, NamedTuple
+
+class Booking(NamedTuple):
+    start: datetime
+    end: datetime
+    event_id: int
+
+class Block(NamedTuple):
+    start: datetime
+    end: datetime
+    bookings: tuple[Booking, ...]
+
+def merge(bookings: Iterable[Booking]) -> list[Block]:
+    """Union of the bookings as sorted, disjoint blocks. Touching bookings are joined."""
+    blocks: list[Block] = []
+    for booking in sorted(bookings):
+        if booking.end <= booking.start:
+            continue
+        if blocks and booking.start <= blocks[-1].end:
+            last = blocks[-1]
+            blocks[-1] = Block(last.start, max(last.end, booking.end), last.bookings + (booking,))
+        else:
+            blocks.append(Block(booking.start, booking.end, (booking,)))
+    return blocks
+
+class BusyIndex:
+    def __init__(self, bookings: Iterable[Booking] = ()):
+        self.blocks = merge(bookings)
+        self._ends = [block.end for block in self.blocks]
+
+    def conflicts(self, start: datetime, end: datetime) -> list[Booking]:
+        """Bookings overlapping [start, end)."""
+        found = []
+        for block in self.blocks[bisect_right(self._ends, start):]:
+            if block.start >= end:
+                break
+            found += [booking for booking in block.bookings if booking.start < end and booking.end > start]
+        return found
+
+    def busy(self, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+        """Busy blocks clipped to [start, end)."""
+        spans = []
+        for block in self.blocks[bisect_right(self._ends, start):]:
+            if block.start >= end:
+                break
+            spans.append((max(block.start, start), min(block.end, end)))
+        return spans
+
+def free(indexes: Iterable[BusyIndex], start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """Gaps in [start, end) where none of the indexes is busy."""
+    combined = merge(Booking(s, e, 0) for index in indexes for s, e in index.busy(start, end))
+    gaps, cursor = [], start
+    for block in combined:
+        if block.start > cursor:
+            gaps.append((cursor, block.start))
+        cursor = max(cursor, block.end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
@@ -1,24 +1,71 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import auth, chores, families, events
-from .database import Base, engine
-
-app = FastAPI(title="FamLink")
-
-# Enable CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Create database tables
-# Base.metadata.create_all(bind=engine)
-
-# Include routes
-app.include_router(auth.router)
-app.include_router(chores.router)
-app.include_router(families.router)
-app.include_router(events.router)
\ No newline at end of file
+from .routes import auth, chores, dashboard, families, events, export, search, stats, stream
+from .pagination import NEXT_CURSOR_HEADER
+from .database import Base
+from .metrics import CONTENT_TYPE, MetricsMiddleware
+from .resources import Resources, default_resources
+from .runtime import ResourcesMiddleware, activate
+from .settings import Settings
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """An app owning its own database engine, caches and workers.
+
+    Without ``settings`` it uses the default resources configured from the
+    environment. Connections and hash workers are opened in the lifespan, so
+    the server only reports ready once they are warm.
+    """
+    resources = default_resources() if settings is None else Resources(settings)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        with activate(resources):
+            await resources.start()
+            try:
+                yield
+            finally:
+                await resources.close()
+
+    app = FastAPI(title="FamLink", lifespan=lifespan)
+    app.state.resources = resources
+
+    # Enable CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
+    )
+    app.add_middleware(MetricsMiddleware, metrics=resources.metrics)
+    app.add_middleware(ResourcesMiddleware, resources=resources)
+
+    # Create database tables
+    # Base.metadata.create_all(bind=resources.database.engine)
+
+    # Include routes
+    app.include_router(auth.router)
+    app.include_router(chores.router)
+    app.include_router(families.router)
+    app.include_router(events.router)
+    app.include_router(dashboard.router)
+    app.include_router(search.router)
+    app.include_router(export.router)
+    app.include_router(stats.router)
+    app.include_router(stream.router)
+
+    @app.get("/health", tags=["ops"])
+    async def health(response: Response):
+        if not resources.ready:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "ok" if resources.ready else "starting", **resources.stats()}
+
+    @app.get("/metrics", tags=["ops"], include_in_schema=False)
+    async def metrics():
+        return Response(resources.metrics.render(resources.stats()), media_type=CONTENT_TYPE)
+
+    return app
+
+app = create_app()
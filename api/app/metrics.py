@@ -0,0 +1,146 @@
+"""Request and SQL metrics, exposed in the Prometheus text format on ``/metrics``.
+
+``MetricsMiddleware`` times every request and attributes the SQL it issued
+(statement count and database time, see ``query_budget.count_queries``) to
+the matched route template, so ``/chores/12`` and ``/chores/13`` share a
+series. Metrics are per process; with several workers, scrape each one.
+
+With ``slow_request_ms`` set, slower requests are logged with their SQL.
+"""
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+from .query_budget import count_queries
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+
+def _labels(labels: Labels, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Iterable[float]):
+        self.name, self.help, self.buckets = name, help, tuple(buckets)
+        self.series: dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.items())
+        if key not in self.series:
+            # Per-bucket counts (last one is +Inf), then the sum
+            self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        counts, _ = series = self.series[key]
+        counts[bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {cumulative}")
+        return lines
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self.series: dict[Labels, float] = defaultdict(int)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.series[tuple(labels.items())] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{_labels(labels)} {_number(value)}" for labels, value in sorted(self.series.items())]
+        return lines
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class RequestMetrics:
+    def __init__(self, slow_request_ms: float = 0):
+        self.slow_request_ms = slow_request_ms
+        self.in_flight = Gauge("famlink_http_requests_in_flight", "Requests being served.")
+        self.requests = Counter("famlink_http_requests_total", "Requests served, by route and status code.")
+        self.latency = Histogram("famlink_http_request_duration_seconds", "Request latency.", LATENCY_BUCKETS)
+        self.queries = Histogram("famlink_http_request_sql_statements", "SQL statements issued per request.",
+                                 QUERY_BUCKETS)
+        self.db_seconds = Counter("famlink_http_request_db_seconds_total", "Time spent in the database by requests.")
+        self.slow = Counter("famlink_http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS.")
+
+    def record(self, method: str, route: str, status: int, seconds: float, counter) -> None:
+        self.requests.inc(method=method, route=route, status=str(status))
+        self.latency.observe(seconds, method=method, route=route)
+        self.queries.observe(counter.count, method=method, route=route)
+        self.db_seconds.inc(counter.seconds, method=method, route=route)
+        if self.slow_request_ms and seconds * 1000 >= self.slow_request_ms:
+            self.slow.inc(method=method, route=route)
+            logger.warning(
+                "Slow request: %s %s -> %s in %.1f ms, %d SQL statements in %.1f ms:\n%s",
+                method, route, status, seconds * 1000, counter.count, counter.seconds * 1000,
+                "\n".join(f"[{duration * 1000:.1f} ms] {statement}"
+                          for statement, duration in zip(counter.statements, counter.durations)),
+            )
+
+    def render(self, sections: dict[str, dict] | None = None) -> str:
+        """All metrics as exposition text. ``sections`` adds the numeric stats of other components as gauges."""
+        lines = []
+        for metric in (self.in_flight, self.requests, self.latency, self.queries, self.db_seconds, self.slow):
+            lines += metric.render()
+        for section, stats in (sections or {}).items():
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"famlink_{section}_{key}"
+                    lines += [f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """ASGI middleware feeding ``metrics``; pure ASGI so streamed responses pass through untouched."""
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        self.metrics.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            with count_queries() as counter:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.in_flight.dec()
+            # Routing fills in the matched route; unmatched paths share one series
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            self.metrics.record(method, route, status, time.perf_counter() - started, counter)
@@ -1,13 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Table
+from sqlalchemy import Column, Date, Integer, String, ForeignKey, DateTime, Boolean, Table, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
+from .search import SearchDocument
 
 event_assignees = Table(
     'event_assignees',
     Base.metadata,
     Column('event_id', Integer, ForeignKey('events.id'), primary_key=True),
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    # The primary key only serves lookups by event_id
+    Index('ix_event_assignees_user_id', 'user_id'),
 )
 
 class Family(Base):
@@ -15,6 +18,8 @@ class Family(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     admin_id = Column(Integer, nullable=True)
+    # Bumped by every chore, event and member write; drives list ETags
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     members = relationship("User", back_populates="family", foreign_keys="User.family_id")
 
 class User(Base):
@@ -23,12 +28,29 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     password_hash = Column(String)
-    family_id = Column(Integer, ForeignKey("families.id"), nullable=True)
+    family_id = Column(Integer, ForeignKey("families.id"), nullable=True, index=True)
     family = relationship("Family", back_populates="members", foreign_keys=[family_id])
     events = relationship("Event", secondary=event_assignees, back_populates="assignees")
 
+class RefreshSession(Base):
+    """One login's chain of refresh tokens. Deleting the row revokes the whole chain."""
+    __tablename__ = "refresh_sessions"
+    # Ids are never reused, or a revoked session's tokens could match a later session
+    __table_args__ = {"sqlite_autoincrement": True}
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Generation of the one refresh token of the chain that is still valid
+    generation = Column(Integer, nullable=False, default=0, server_default="0")
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
 class Chore(Base):
     __tablename__ = "chores"
+    __table_args__ = (
+        Index("ix_chores_family_id_id", "family_id", "id"),
+        Index("ix_chores_family_id_due_at", "family_id", "due_at", "id"),
+        # Archived chores keep their ids, so SQLite must not hand them out again
+        {"sqlite_autoincrement": True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String, nullable=True)
@@ -37,9 +59,39 @@ class Chore(Base):
     status = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    due_at = Column(DateTime(timezone=True), nullable=True)
+    # RRULE of a recurring chore; due_at is its first occurrence
+    rrule = Column(String, nullable=True)
+    # Last occurrence of the series, None while it is open-ended
+    recurrence_end = Column(DateTime(timezone=True), nullable=True)
+    occurrences = relationship("ChoreOccurrence", order_by="ChoreOccurrence.recurrence_id")
+
+# /search matches the document expression itself, so the index needs no column
+# of its own and can be built without rewriting the table
+Index("ix_chores_search", SearchDocument(Chore.title, Chore.description), postgresql_using="gin").ddl_if(dialect="postgresql")
+
+class ChoreOccurrence(Base):
+    """Changes to one occurrence of a recurring chore; null columns keep the series value."""
+    __tablename__ = "chore_occurrences"
+    chore_id = Column(Integer, ForeignKey("chores.id"), primary_key=True)
+    # Original due date of the occurrence
+    recurrence_id = Column(DateTime(timezone=True), primary_key=True)
+    cancelled = Column(Boolean, nullable=False, default=False)
+    title = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(Boolean, nullable=True)
+    due_at = Column(DateTime(timezone=True), nullable=True)
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_family_id_start_time", "family_id", "start_time", "id"),
+        # Overlap queries (end_time > from) stay bounded however much history there is
+        Index("ix_events_family_id_end_time", "family_id", "end_time"),
+        # Archived events keep their ids, so SQLite must not hand them out again
+        {"sqlite_autoincrement": True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String, nullable=True)
@@ -47,4 +99,80 @@ class Event(Base):
     start_time = Column(DateTime(timezone=True))
     end_time = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    assignees = relationship("User", secondary=event_assignees, back_populates="events")
\ No newline at end of file
+    # RRULE of a recurring event; start_time/end_time are its first occurrence
+    rrule = Column(String, nullable=True)
+    # End of the last occurrence, None while the series is open-ended
+    recurrence_end = Column(DateTime(timezone=True), nullable=True)
+    assignees = relationship("User", secondary=event_assignees, back_populates="events")
+    occurrences = relationship("EventOccurrence", order_by="EventOccurrence.recurrence_id")
+
+Index("ix_events_search", SearchDocument(Event.title, Event.description), postgresql_using="gin").ddl_if(dialect="postgresql")
+
+class EventOccurrence(Base):
+    """Changes to one occurrence of a recurring event; null columns keep the series value."""
+    __tablename__ = "event_occurrences"
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    # Original start of the occurrence
+    recurrence_id = Column(DateTime(timezone=True), primary_key=True)
+    cancelled = Column(Boolean, nullable=False, default=False)
+    title = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    start_time = Column(DateTime(timezone=True), nullable=True)
+    end_time = Column(DateTime(timezone=True), nullable=True)
+
+class ChoreStat(Base):
+    """Chore counts of one member for one week, maintained by the chore writes (see ``stats``)."""
+    __tablename__ = "chore_stats"
+    family_id = Column(Integer, ForeignKey("families.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # Monday of the week, UTC
+    week = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+
+# Cold storage for history the app rarely reads (see ``archive``). Rows keep the
+# id they had in the hot table and only come back with ``include_archived``.
+archived_event_assignees = Table(
+    'archived_event_assignees',
+    Base.metadata,
+    Column('event_id', Integer, ForeignKey('archived_events.id'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+)
+
+class ArchivedChore(Base):
+    """A completed one-off chore moved out of ``chores``."""
+    __tablename__ = "archived_chores"
+    __table_args__ = (
+        Index("ix_archived_chores_family_id_id", "family_id", "id"),
+        Index("ix_archived_chores_family_id_due_at", "family_id", "due_at", "id"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String)
+    description = Column(String, nullable=True)
+    family_id = Column(Integer, ForeignKey("families.id"))
+    assigned_to_id = Column(Integer, ForeignKey("users.id"))
+    status = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    due_at = Column(DateTime(timezone=True), nullable=True)
+    rrule = Column(String, nullable=True)
+    recurrence_end = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ArchivedEvent(Base):
+    """A past one-off event moved out of ``events``."""
+    __tablename__ = "archived_events"
+    __table_args__ = (
+        Index("ix_archived_events_family_id_start_time", "family_id", "start_time", "id"),
+        Index("ix_archived_events_family_id_end_time", "family_id", "end_time"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String)
+    description = Column(String, nullable=True)
+    family_id = Column(Integer, ForeignKey("families.id"))
+    start_time = Column(DateTime(timezone=True))
+    end_time = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True))
+    rrule = Column(String, nullable=True)
+    recurrence_end = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,79 @@
+"""Recurring chores and events as the occurrences list responses show.
+
+Occurrences are built as dicts shaped like ``ChoreOut`` / ``EventOut`` (see
+``serialization``) so they can be merged with projected one-off rows.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator
+from fastapi import Query
+from .models import Chore, Event
+from .recurrence import Occurrence, naive_utc, occurrences
+from .serialization import chore_rows, event_rows, user_rows
+
+# Without ``to``, series are expanded this far past ``from`` (or today, if
+# later): paging through an open-ended series would never end
+EXPANSION_HORIZON = timedelta(days=365)
+
+def expansion_end(from_: datetime | None = Query(None, alias="from"), to: datetime | None = None) -> datetime | None:
+    """Route dependency: ``to`` for the series when the request has none, else None.
+
+    The default moves with the date, so list routes also pass it as their cache ``vary``.
+    """
+    if to is not None:
+        return None
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today if from_ is None else max(naive_utc(from_).replace(tzinfo=timezone.utc), today)
+    return start + EXPANSION_HORIZON
+
+def event_key(event: dict) -> tuple:
+    return (naive_utc(event["start_time"]), event["id"])
+
+def chore_key(chore: dict) -> tuple:
+    return (naive_utc(chore["due_at"]), chore["id"])
+
+def _pick(override, name: str, default):
+    value = getattr(override, name) if override is not None else None
+    return default if value is None else value
+
+def event_out(event: Event, assignees: list[dict], occurrence: Occurrence | None = None) -> dict:
+    override = occurrence.override if occurrence else None
+    return event_rows.from_object(
+        event,
+        title=_pick(override, "title", event.title),
+        description=_pick(override, "description", event.description),
+        start_time=occurrence.start if occurrence else event.start_time,
+        end_time=occurrence.end if occurrence else event.end_time,
+        assignees=assignees,
+        recurrence_id=occurrence.recurrence_id if occurrence else None,
+    )
+
+def chore_out(chore: Chore, occurrence: Occurrence | None = None) -> dict:
+    override = occurrence.override if occurrence else None
+    return chore_rows.from_object(
+        chore,
+        title=_pick(override, "title", chore.title),
+        description=_pick(override, "description", chore.description),
+        assigned_to_id=_pick(override, "assigned_to_id", chore.assigned_to_id),
+        status=_pick(override, "status", chore.status),
+        due_at=occurrence.start if occurrence else chore.due_at,
+        recurrence_id=occurrence.recurrence_id if occurrence else None,
+    )
+
+def event_occurrences(event: Event, from_: datetime | None, to: datetime | None,
+                      not_before: datetime | None = None, assignees: Iterable | None = None) -> Iterator[dict]:
+    """Lazily expand a recurring event (with its ``occurrences`` loaded) over the window."""
+    assignees = [user_rows.from_object(user) for user in (event.assignees if assignees is None else assignees)]
+    for occurrence in occurrences(
+        event.rrule, event.start_time, event.end_time - event.start_time, event.occurrences,
+        lambda override: (override.start_time, override.end_time), from_, to, not_before,
+    ):
+        yield event_out(event, assignees, occurrence)
+
+def chore_occurrences(chore: Chore, from_: datetime | None, to: datetime | None,
+                      not_before: datetime | None = None) -> Iterator[dict]:
+    """Lazily expand a recurring chore (with its ``occurrences`` loaded) over the window."""
+    for occurrence in occurrences(
+        chore.rrule, chore.due_at, timedelta(0), chore.occurrences,
+        lambda override: (override.due_at, None), from_, to, not_before,
+    ):
+        yield chore_out(chore, occurrence)
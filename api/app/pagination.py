@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+from fastapi import HTTPException, Query, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def page_limit(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)) -> int:
+    return limit
+
+def encode_cursor(*values: Any) -> str:
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError(cursor)
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in payload]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def next_page(rows: Sequence, limit: int, key: Callable[[Any], tuple]) -> tuple[list, str | None]:
+    """Trim a ``limit + 1`` fetch to one page and return it with the next cursor."""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(*key(rows[-1]))
+    return rows, None
+
+def paginate(rows: Sequence, limit: int, key: Callable[[Any], tuple], response: Response) -> list:
+    """Like ``next_page`` but advertises the cursor in the response headers."""
+    rows, cursor = next_page(rows, limit, key)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return rows
@@ -0,0 +1,87 @@
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+_checkout_started: ContextVar[float | None] = ContextVar("_checkout_started", default=None)
+
+class _TimedCheckout:
+    """Records when a checkout begins so the ``checkout`` event can measure the wait."""
+
+    def connect(self):
+        token = _checkout_started.set(time.perf_counter())
+        try:
+            return super().connect()
+        finally:
+            _checkout_started.reset(token)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+class PoolMetrics:
+    """Connection pool counters maintained from SQLAlchemy pool events."""
+
+    def __init__(self):
+        self.engine = None
+        self.connects = 0
+        self.overflow_connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def attach(self, engine) -> "PoolMetrics":
+        # Pool events registered on an Engine follow its pool across dispose()
+        self.engine = getattr(engine, "sync_engine", engine)
+        event.listen(self.engine, "connect", self._on_connect)
+        event.listen(self.engine, "checkout", self._on_checkout)
+        event.listen(self.engine, "checkin", self._on_checkin)
+        event.listen(self.engine, "invalidate", self._on_invalidate)
+        return self
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+        pool = self.engine.pool
+        if isinstance(pool, QueuePool) and pool.overflow() > 0:
+            self.overflow_connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        started = _checkout_started.get()
+        if started is not None:
+            waited = time.perf_counter() - started
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    @property
+    def checked_out(self) -> int:
+        return self.checkouts - self.checkins
+
+    def stats(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        queue_pool = isinstance(pool, QueuePool)
+        return {
+            "pool": type(pool).__name__ if pool is not None else None,
+            "size": pool.size() if queue_pool else None,
+            "checked_out": self.checked_out,
+            "overflow": max(0, pool.overflow()) if queue_pool else None,
+            "connects": self.connects,
+            "overflow_connects": self.overflow_connects,
+            "checkouts": self.checkouts,
+            "invalidations": self.invalidations,
+            "avg_checkout_wait_seconds": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+            "max_checkout_wait_seconds": self.wait_seconds_max,
+        }
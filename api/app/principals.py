@@ -0,0 +1,43 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+from .cache import TTLCache
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, detached from any database session."""
+    id: int
+    username: str
+    family_id: Optional[int]
+    email: Optional[str] = None
+
+class PrincipalCache:
+    """Principals keyed by token subject.
+
+    ``invalidate`` also remembers when a subject changed so that tokens issued
+    before that moment can no longer be trusted for their embedded claims.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, claims_ttl: float = 3600.0):
+        self._principals = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._changed_at = TTLCache(maxsize=maxsize, ttl=claims_ttl)
+
+    def get(self, subject: str) -> Optional[Principal]:
+        return self._principals.get(subject)
+
+    def put(self, subject: str, principal: Principal) -> None:
+        self._principals.set(subject, principal)
+
+    def invalidate(self, subject: str) -> None:
+        self._principals.pop(subject)
+        self._changed_at.set(subject, time.time())
+
+    def claims_stale(self, subject: str, issued_at: Optional[float]) -> bool:
+        if issued_at is None:
+            return True
+        changed_at = self._changed_at.get(subject)
+        return changed_at is not None and issued_at <= changed_at
+
+    def clear(self) -> None:
+        self._principals.clear()
+        self._changed_at.clear()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+from .settings import Settings
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """One connected client. Idle subscriptions cost a queue and a waiting task."""
+
+    def __init__(self, family_id: int, user_id: int, maxsize: int):
+        self.family_id = family_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+        # Set when the client fell too far behind and events were dropped
+        self.overflowed = False
+
+    def put(self, message: dict) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+class PubSubBackend(ABC):
+    """Carries change events between workers; every worker delivers what it receives."""
+
+    @abstractmethod
+    async def start(self, deliver: Callable[[dict], None]) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, message: dict) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+class RedisPubSubBackend(PubSubBackend):
+    def __init__(self, client, channel: str = "famlink:family-changes"):
+        self.client = client
+        self.channel = channel
+        self._listener: asyncio.Task | None = None
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisPubSubBackend":
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("PUBSUB_BACKEND=redis requires the 'redis' package") from exc
+        return cls(redis.from_url(url), **kwargs)
+
+    async def start(self, deliver: Callable[[dict], None]) -> None:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+
+        async def listen():
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    try:
+                        deliver(json.loads(item["data"]))
+                    except Exception:
+                        logger.exception("Dropping malformed change event")
+
+        self._listener = asyncio.create_task(listen())
+
+    async def publish(self, message: dict) -> None:
+        await self.client.publish(self.channel, json.dumps(message, separators=(",", ":")))
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        await self.client.aclose()
+
+class Broker:
+    """Fans family change events out to the subscriptions of that family.
+
+    Without a backend, events only reach clients connected to this worker.
+    """
+
+    def __init__(self, backend: PubSubBackend | None = None, queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        # Called with every change event, from this worker or (with a backend) any other
+        self.listeners: list[Callable[[dict], None]] = []
+
+    async def start(self) -> None:
+        if self.backend is not None:
+            await self.backend.start(self.deliver)
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    def deliver(self, message: dict) -> None:
+        for listener in self.listeners:
+            listener(message)
+        for subscription in self._subscriptions.get(message["family_id"], ()):
+            subscription.put(message)
+            self.delivered += 1
+
+    async def publish(self, family_id: int, type: str, **data) -> None:
+        """Announce a committed change, e.g. ``publish(1, "chore.updated", id=5, version=8)``."""
+        message = {"family_id": family_id, "type": type, **data}
+        self.published += 1
+        if self.backend is not None:
+            await self.backend.publish(message)
+        else:
+            self.deliver(message)
+
+    @asynccontextmanager
+    async def subscribe(self, family_id: int, user_id: int) -> AsyncIterator[Subscription]:
+        subscription = Subscription(family_id, user_id, self.queue_size)
+        self._subscriptions.setdefault(family_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscriptions.get(family_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[family_id]
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "subscriptions": sum(len(s) for s in self._subscriptions.values()),
+            "families": len(self._subscriptions),
+            "published": self.published,
+            "delivered": self.delivered,
+        }
+
+def backend_from_settings(settings: Settings) -> PubSubBackend | None:
+    if settings.pubsub_backend.lower() == "redis":
+        return RedisPubSubBackend.from_url(settings.pubsub_url)
+    return None
@@ -0,0 +1,153 @@
+"""Statements behind the hot read paths.
+
+Routes and the EXPLAIN tool build their queries here so the plans that get
+checked are the ones that actually run.
+"""
+from datetime import datetime
+from sqlalchemy import Select, and_, literal, or_, select, tuple_, union_all
+from .models import Chore, ChoreStat, Event, Family, User, event_assignees
+from .search import SearchDocument, match_and_rank
+
+def user_by_username(username: str) -> Select:
+    return select(User).filter(User.username == username)
+
+def family_members(family_id: int) -> Select:
+    return select(User).filter(User.family_id == family_id)
+
+def family_with_members(family_id: int) -> Select:
+    """One row per member (or a single row with no user) for the family."""
+    return (
+        select(Family, User)
+        .outerjoin(User, User.family_id == Family.id)
+        .filter(Family.id == family_id)
+        .order_by(User.id)
+    )
+
+def family_chores(family_id: int, status: bool | None = None, assigned_to_id: int | None = None,
+                  after_id: int | None = None, entity=Chore) -> Select:
+    """``entity`` is Chore, or ArchivedChore for the same query over the archive."""
+    query = select(entity).filter(entity.family_id == family_id)
+    if status is not None:
+        query = query.filter(entity.status == status)
+    if assigned_to_id is not None:
+        query = query.filter(entity.assigned_to_id == assigned_to_id)
+    if after_id is not None:
+        query = query.filter(entity.id > after_id)
+    return query.order_by(entity.id)
+
+def family_chores_due(family_id: int, from_: datetime | None = None, to: datetime | None = None,
+                      status: bool | None = None, assigned_to_id: int | None = None,
+                      after: tuple[datetime, int] | None = None, entity=Chore) -> Select:
+    """One-off chores with a due date in [from, to), by due date."""
+    query = select(entity).filter(entity.family_id == family_id, entity.rrule.is_(None), entity.due_at.is_not(None))
+    if from_ is not None:
+        query = query.filter(entity.due_at >= from_)
+    if to is not None:
+        query = query.filter(entity.due_at < to)
+    if status is not None:
+        query = query.filter(entity.status == status)
+    if assigned_to_id is not None:
+        query = query.filter(entity.assigned_to_id == assigned_to_id)
+    if after is not None:
+        query = query.filter(tuple_(entity.due_at, entity.id) > after)
+    return query.order_by(entity.due_at, entity.id)
+
+def family_chore_series(family_id: int, from_: datetime | None = None, to: datetime | None = None) -> Select:
+    """Recurring chores that may have occurrences in [from, to)."""
+    query = select(Chore).filter(Chore.family_id == family_id, Chore.rrule.is_not(None))
+    if from_ is not None:
+        query = query.filter(or_(Chore.recurrence_end.is_(None), Chore.recurrence_end >= from_))
+    if to is not None:
+        query = query.filter(Chore.due_at < to)
+    return query.order_by(Chore.id)
+
+def family_events(family_id: int, from_: datetime | None = None, to: datetime | None = None,
+                  after: tuple[datetime, int] | None = None, entity=Event) -> Select:
+    """One-off events; recurring ones come from ``family_event_series``.
+
+    ``entity`` is Event, or ArchivedEvent for the same query over the archive.
+    """
+    query = select(entity).filter(entity.family_id == family_id, entity.rrule.is_(None))
+    # Window filters keep every event that overlaps [from, to)
+    if from_ is not None:
+        query = query.filter(entity.end_time > from_)
+    if to is not None:
+        query = query.filter(entity.start_time < to)
+    if after is not None:
+        query = query.filter(tuple_(entity.start_time, entity.id) > after)
+    return query.order_by(entity.start_time, entity.id)
+
+def family_event_series(family_id: int, from_: datetime | None = None, to: datetime | None = None) -> Select:
+    """Recurring events that may have occurrences overlapping [from, to)."""
+    query = select(Event).filter(Event.family_id == family_id, Event.rrule.is_not(None))
+    if from_ is not None:
+        query = query.filter(or_(Event.recurrence_end.is_(None), Event.recurrence_end > from_))
+    if to is not None:
+        query = query.filter(Event.start_time < to)
+    return query.order_by(Event.id)
+
+def family_chore_stats(family_id: int) -> Select:
+    """(user_id, username, week, total, completed) of the family's ``chore_stats``, by member and week."""
+    return (
+        select(ChoreStat.user_id, User.username, ChoreStat.week, ChoreStat.total, ChoreStat.completed)
+        .join(User, User.id == ChoreStat.user_id)
+        .filter(ChoreStat.family_id == family_id)
+        .order_by(ChoreStat.user_id, ChoreStat.week)
+    )
+
+def busy_events(family_id: int, user_ids: list[int], from_: datetime, to: datetime) -> Select:
+    """(user_id, event_id, start_time, end_time) of the users' one-off events overlapping [from, to)."""
+    return (
+        select(event_assignees.c.user_id, Event.id, Event.start_time, Event.end_time)
+        .join(event_assignees, event_assignees.c.event_id == Event.id)
+        .filter(
+            Event.family_id == family_id, Event.rrule.is_(None),
+            Event.end_time > from_, Event.start_time < to,
+            event_assignees.c.user_id.in_(user_ids),
+        )
+    )
+
+def busy_event_series(family_id: int, user_ids: list[int], from_: datetime, to: datetime) -> Select:
+    """(Event, user_id) for the users' recurring events that may overlap [from, to)."""
+    return (
+        family_event_series(family_id, from_, to)
+        .join(event_assignees, event_assignees.c.event_id == Event.id)
+        .filter(event_assignees.c.user_id.in_(user_ids))
+        .add_columns(event_assignees.c.user_id)
+    )
+
+def assignee_rows(event_ids: list[int], assignees=event_assignees) -> Select:
+    """(event_id, id, username, email, family_id) for the assignees of the events.
+
+    Pass ``archived_event_assignees`` for archived events.
+    """
+    return (
+        select(assignees.c.event_id, User.id, User.username, User.email, User.family_id)
+        .join(User, User.id == assignees.c.user_id)
+        .filter(assignees.c.event_id.in_(event_ids))
+        .order_by(assignees.c.event_id, User.id)
+    )
+
+def assignee_pairs(event_ids: list[int]) -> Select:
+    return select(event_assignees.c.event_id, event_assignees.c.user_id).filter(
+        event_assignees.c.event_id.in_(event_ids)
+    )
+
+def family_search(family_id: int, q: str, dialect: str, after: tuple[float, str, int] | None = None) -> Select:
+    """Chores and events matching ``q``, best match first, as (kind, id, title, description, rank) rows."""
+    branches = []
+    for kind, entity in (("chore", Chore), ("event", Event)):
+        match, rank = match_and_rank(dialect, q, SearchDocument(entity.title, entity.description), entity.title)
+        branches.append(
+            select(literal(kind).label("kind"), entity.id, entity.title, entity.description, rank.label("rank"))
+            .filter(entity.family_id == family_id, match)
+        )
+    results = union_all(*branches).subquery()
+    query = select(results)
+    if after is not None:
+        rank, kind, id_ = after
+        query = query.filter(or_(
+            results.c.rank < rank,
+            and_(results.c.rank == rank, tuple_(results.c.kind, results.c.id) > (kind, id_)),
+        ))
+    return query.order_by(results.c.rank.desc(), results.c.kind, results.c.id)
@@ -0,0 +1,87 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from fastapi import Request
+from sqlalchemy import event
+from .runtime import current
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryCounter:
+    def __init__(self, parent: "QueryCounter | None" = None):
+        self.parent = parent
+        self.statements: list[str] = []
+        self.durations: list[float] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.durations)
+
+_current_counter: ContextVar[QueryCounter | None] = ContextVar("_current_counter", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    while counter is not None:
+        counter.statements.append(statement)
+        counter = counter.parent
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    counter = _current_counter.get()
+    while counter is not None:
+        counter.durations.append(elapsed)
+        counter = counter.parent
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+def install_query_counter(engine) -> None:
+    """Count each statement, and its time spent in the database, towards the active counters."""
+    engine = getattr(engine, "sync_engine", engine)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count the SQL statements issued in the current context.
+
+    Counters nest: statements are also added to any enclosing counter.
+    """
+    counter = QueryCounter(_current_counter.get())
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+def query_budget(limit: int):
+    """Route dependency declaring the most SQL statements the route may issue.
+
+    Declare it first in the route's ``dependencies`` so the principal lookup
+    and response serialization are counted too.
+    """
+    async def check_query_budget(request: Request):
+        with count_queries() as counter:
+            yield counter
+        if counter.count > limit:
+            message = (
+                f"{request.method} {request.url.path} issued {counter.count} SQL statements, "
+                f"budget is {limit}:\n" + "\n".join(counter.statements)
+            )
+            if current().settings.query_budget_enforce:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+    return check_query_budget
@@ -0,0 +1,144 @@
+"""RRULE recurrence for events and chores.
+
+A series is stored once: the rule plus the first occurrence (``start_time``
+for events, ``due_at`` for chores). Occurrences are generated lazily, only
+for the window a request asks for. Changes to single occurrences are rows in
+``event_occurrences`` / ``chore_occurrences``, keyed by the occurrence's
+original start (its ``recurrence_id``).
+"""
+import heapq
+import re
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+from dateutil.rrule import rrule, rrulestr
+
+# Expansion walks every occurrence from the series start, so rules that
+# produce thousands of occurrences a day are refused.
+UNSUPPORTED_FREQUENCIES = {"SECONDLY", "MINUTELY"}
+# A COUNT rule longer than this is treated as open-ended when storing its end
+MAX_COUNTED_OCCURRENCES = 10000
+
+_UNTIL_UTC = re.compile(r"(UNTIL=\d{8}(?:T\d{6})?)Z", re.IGNORECASE)
+
+def naive_utc(value: datetime) -> datetime:
+    """Expansion runs on naive UTC; naive values (as SQLite returns them) already are."""
+    return value if value.tzinfo is None else value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _like(value: datetime, reference: datetime) -> datetime:
+    # Results match the awareness of the stored series so they compare and
+    # serialize like plain rows
+    return value.replace(tzinfo=timezone.utc) if reference.tzinfo is not None else value
+
+def parse_rule(rule: str, dtstart: datetime) -> rrule:
+    """Parse an RRULE such as ``FREQ=WEEKLY;BYDAY=TU`` (``RRULE:`` prefix optional)."""
+    rule = rule.strip()
+    body = rule.split(":", 1)[1] if rule.upper().startswith("RRULE:") else rule
+    if "\n" in body or ":" in body:
+        raise ValueError("Only a single RRULE is supported")
+    params = dict(part.split("=", 1) for part in body.upper().split(";") if "=" in part)
+    if params.get("FREQ") in UNSUPPORTED_FREQUENCIES:
+        raise ValueError(f"FREQ={params['FREQ']} is not supported")
+    return rrulestr(_UNTIL_UTC.sub(r"\1", body), dtstart=naive_utc(dtstart))
+
+def validate_rule(rule: str) -> str:
+    try:
+        parse_rule(rule, datetime(2000, 1, 1))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Invalid recurrence rule: {exc}") from exc
+    return rule.strip()
+
+def validate_series(rule: str, dtstart: datetime) -> None:
+    """Reject a rule with no occurrence from ``dtstart`` on (UNTIL before it, COUNT=0): nothing would list it."""
+    if parse_rule(rule, dtstart).after(naive_utc(dtstart), inc=True) is None:
+        raise ValueError("The recurrence rule has no occurrences")
+
+def series_end(rule: str | None, start: datetime | None, duration: timedelta = timedelta(0)) -> datetime | None:
+    """End of the last occurrence, or None if the series is open-ended."""
+    if not rule or start is None:
+        return None
+    parsed = parse_rule(rule, start)
+    if parsed._until is not None:
+        last = parsed.before(parsed._until, inc=True)
+    elif parsed._count is not None and parsed._count <= MAX_COUNTED_OCCURRENCES:
+        last = None
+        for last in parsed:
+            pass
+    else:
+        return None
+    return _like((last or naive_utc(start)) + duration, start)
+
+def occurrence_at(rule: str, dtstart: datetime, value: datetime) -> datetime | None:
+    """The occurrence starting exactly at ``value``, as the series stores it, if any."""
+    found = parse_rule(rule, dtstart).after(naive_utc(value), inc=True)
+    return _like(found, dtstart) if found == naive_utc(value) else None
+
+class Occurrence(NamedTuple):
+    start: datetime
+    end: datetime
+    recurrence_id: datetime
+    override: Any
+
+def _overlaps(start: datetime, end: datetime, from_: datetime | None, to: datetime | None) -> bool:
+    # Same window semantics as the SQL filters: overlap with [from, to);
+    # zero-length occurrences (chores) count when they fall inside it
+    if from_ is not None and not (end > from_ or (end == start and start >= from_)):
+        return False
+    return to is None or start < to
+
+def occurrences(rule: str, dtstart: datetime, duration: timedelta, overrides: Iterable,
+                span: Callable[[Any], tuple[datetime | None, datetime | None]],
+                from_: datetime | None = None, to: datetime | None = None,
+                not_before: datetime | None = None) -> Iterator[Occurrence]:
+    """Yield the series' occurrences overlapping [from_, to) in start order.
+
+    ``overrides`` are the series' occurrence rows: each has ``recurrence_id``
+    and ``cancelled``, and ``span(override)`` returns its moved (start, end),
+    either of which may be None. ``not_before`` skips occurrences starting
+    earlier, for keyset pagination. Nothing beyond the window is generated.
+    """
+    from_ = naive_utc(from_) if from_ is not None else None
+    to = naive_utc(to) if to is not None else None
+    not_before = naive_utc(not_before) if not_before is not None else None
+    by_id = {naive_utc(override.recurrence_id): override for override in overrides}
+
+    moved, skipped = [], set()
+    for recurrence_id, override in by_id.items():
+        start, end = span(override)
+        if override.cancelled or (start is None and end is None):
+            if override.cancelled:
+                skipped.add(recurrence_id)
+            continue
+        skipped.add(recurrence_id)
+        start = naive_utc(start) if start is not None else recurrence_id
+        end = naive_utc(end) if end is not None else start + duration
+        if _overlaps(start, end, from_, to) and (not_before is None or start >= not_before):
+            moved.append(Occurrence(start, end, recurrence_id, override))
+    moved.sort()
+
+    def regular() -> Iterator[Occurrence]:
+        lower = [bound for bound in (from_ - duration if from_ is not None else None, not_before) if bound is not None]
+        parsed = parse_rule(rule, dtstart)
+        starts = parsed.xafter(max(lower), inc=True) if lower else iter(parsed)
+        for start in starts:
+            if to is not None and start >= to:
+                return
+            end = start + duration
+            if start in skipped or not _overlaps(start, end, from_, to):
+                continue
+            yield Occurrence(start, end, start, by_id.get(start))
+
+    for occurrence in heapq.merge(regular(), moved, key=lambda occurrence: occurrence.start):
+        yield Occurrence(*(_like(value, dtstart) for value in occurrence[:3]), occurrence.override)
+
+def merge_page(streams: Iterable[Iterable], key: Callable[[Any], tuple], limit: int,
+               after: tuple | None = None) -> list:
+    """Merge sorted streams and take ``limit + 1`` items after the ``after`` key.
+
+    Streams are consumed lazily, so only as many occurrences are generated
+    as the page needs.
+    """
+    merged = heapq.merge(*streams, key=key)
+    if after is not None:
+        merged = (item for item in merged if key(item) > after)
+    return list(islice(merged, limit + 1))
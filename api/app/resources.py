@@ -0,0 +1,90 @@
+"""Everything an app instance owns beyond its routes, built from its ``Settings``.
+
+Nothing here connects or spawns on construction: ``start`` (run by the app's
+lifespan) opens database connections and password-hash workers up front, and
+``close`` releases them.
+"""
+import asyncio
+import logging
+import time
+from .archive import run_periodically
+from .database import Database
+from .hashing import PasswordHasher
+from .metrics import RequestMetrics
+from .principals import PrincipalCache
+from .pubsub import Broker, backend_from_settings as pubsub_backend
+from .response_cache import ResponseCache, backend_from_settings as cache_backend
+from .settings import Settings
+from .utils import ACCESS_TOKEN_EXPIRE_MINUTES
+
+logger = logging.getLogger(__name__)
+
+class Resources:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.database = Database(settings)
+        self.password_hasher = PasswordHasher(
+            workers=settings.password_hash_workers,
+            queue_size=settings.password_hash_queue_size,
+            retry_after=settings.password_hash_retry_after,
+        )
+        self.principal_cache = PrincipalCache(
+            maxsize=settings.principal_cache_size,
+            ttl=settings.principal_cache_ttl,
+            claims_ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+        self.response_cache = ResponseCache(cache_backend(settings), ttl=settings.response_cache_ttl)
+        self.broker = Broker(pubsub_backend(settings), queue_size=settings.stream_queue_size)
+        # The writing worker has already noted its own writes at commit; this covers the others
+        self.broker.listeners.append(lambda message: self.database.note_write(message["family_id"]))
+        self.broker.listeners.append(self._forget_member)
+        self.metrics = RequestMetrics(settings.slow_request_ms)
+        self.ready = False
+        self._archiver: asyncio.Task | None = None
+
+    def _forget_member(self, message: dict) -> None:
+        # The routes drop their own worker's entry; this reaches every other worker
+        if message["type"] in ("member.added", "member.removed"):
+            self.principal_cache.invalidate(message["username"])
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        connections = await self.database.warm_up()
+        workers = await self.password_hasher.warm_up()
+        await self.broker.start()
+        if self.settings.archive_interval:
+            # Every worker runs one; concurrent runs skip each other's locked rows
+            self._archiver = asyncio.create_task(run_periodically(self, self.settings.archive_interval))
+        self.ready = True
+        logger.info("Ready in %.2fs: %d database connections, %d password hash workers",
+                    time.perf_counter() - started, connections, workers)
+
+    async def close(self) -> None:
+        self.ready = False
+        if self._archiver is not None:
+            self._archiver.cancel()
+            self._archiver = None
+        await self.broker.close()
+        self.password_hasher.shutdown()
+        if self.response_cache.backend is not None:
+            await self.response_cache.backend.close()
+        await self.database.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "db_pool": self.database.pool_metrics.stats(),
+            "db_replicas": self.database.replica_stats(),
+            **{f"db_replica_{n}_pool": metrics.stats() for n, metrics in enumerate(self.database.replica_pool_metrics)},
+            "password_hashing": self.password_hasher.stats(),
+            "response_cache": self.response_cache.stats(),
+            "change_stream": self.broker.stats(),
+        }
+
+_default: Resources | None = None
+
+def default_resources() -> Resources:
+    """Resources configured from the environment, shared by the module-level app and scripts."""
+    global _default
+    if _default is None:
+        _default = Resources(Settings.from_env())
+    return _default
@@ -0,0 +1,219 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+from fastapi import Depends, Request, Response
+from pydantic import TypeAdapter
+from .cache import TTLCache
+from .etags import check_family_etag, family_etag_check, no_vary
+from .principals import Principal
+from .runtime import current
+from .serialization import dumps
+from .settings import Settings
+from .utils import get_current_user
+
+class CacheBackend(ABC):
+    """Storage for cached response bodies, indexed by family for invalidation."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, family_id: int, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidate(self, family_id: int, route: str | None = None) -> int:
+        """Drop the family's entries for ``route`` (all routes if None); returns how many."""
+
+    async def close(self) -> None:
+        pass
+
+def _route_of(key: str) -> str:
+    return key.split(":", 1)[0]
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU with TTL. Entries are only visible to the worker that stored them."""
+
+    def __init__(self, maxsize: int = 10000):
+        self._entries = TTLCache(maxsize=maxsize, on_evict=self._forget)
+        self._keys_by_family: dict[int, set[str]] = {}
+        self._family_of: dict[str, int] = {}
+
+    def _forget(self, key: str) -> None:
+        family_id = self._family_of.pop(key, None)
+        keys = self._keys_by_family.get(family_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_family[family_id]
+
+    async def get(self, key: str) -> bytes | None:
+        value = self._entries.get(key)
+        if value is None:
+            self._forget(key)
+        return value
+
+    async def set(self, key: str, value: bytes, family_id: int, ttl: float) -> None:
+        self._entries.set(key, value, ttl=ttl)
+        self._family_of[key] = family_id
+        self._keys_by_family.setdefault(family_id, set()).add(key)
+
+    async def invalidate(self, family_id: int, route: str | None = None) -> int:
+        keys = [key for key in self._keys_by_family.get(family_id, ()) if route is None or _route_of(key) == route]
+        for key in keys:
+            self._entries.pop(key)
+            self._forget(key)
+        return len(keys)
+
+class RedisBackend(CacheBackend):
+    """Shared backend for all workers, on any client with the ``redis.asyncio`` API."""
+
+    def __init__(self, client, prefix: str = "famlink:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBackend":
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package") from exc
+        return cls(redis.from_url(url), **kwargs)
+
+    def _index(self, family_id: int) -> str:
+        return f"{self.prefix}family:{family_id}"
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, family_id: int, ttl: float) -> None:
+        milliseconds = max(1, int(ttl * 1000))
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self.prefix + key, value, px=milliseconds)
+            pipe.sadd(self._index(family_id), key)
+            pipe.pexpire(self._index(family_id), milliseconds)
+            await pipe.execute()
+
+    async def invalidate(self, family_id: int, route: str | None = None) -> int:
+        keys = [key.decode() if isinstance(key, bytes) else key
+                for key in await self.client.smembers(self._index(family_id))]
+        keys = [key for key in keys if route is None or _route_of(key) == route]
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+            await self.client.srem(self._index(family_id), *keys)
+        return len(keys)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+class ResponseCache:
+    """Serialized responses keyed by (route, family_id, query params).
+
+    Every entry records the family version it was built from, and lookups
+    compare it with the current version. So a write made by another worker
+    can never serve a stale body, even when that worker could not reach this
+    worker's backend to invalidate it.
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(route: str, family_id: int, request: Request, vary: Any = None) -> str:
+        params = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        return f"{route}:{family_id}:{request.url.path}?{params}" + ("" if vary is None else f"#{vary}")
+
+    async def invalidate(self, family_id: int, *routes: str) -> None:
+        """Drop cached responses for the family; with no routes given, drop all of them."""
+        if self.backend is None:
+            return
+        for route in routes or (None,):
+            await self.backend.invalidate(family_id, route)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+_adapters: dict[Any, TypeAdapter] = {}
+
+def _adapter(model) -> TypeAdapter:
+    if model not in _adapters:
+        _adapters[model] = TypeAdapter(model)
+    return _adapters[model]
+
+class CachedRoute:
+    """Per-request handle that the route handler uses to read and fill the cache."""
+
+    def __init__(self, cache: ResponseCache, route: str, request: Request, response: Response,
+                 family_id: int | None, version: int | None, vary: Any = None):
+        self.cache = cache
+        self.response = response
+        self.version = version
+        self.family_id = family_id
+        self.key = ResponseCache.key(route, family_id, request, vary) if family_id and version is not None else None
+
+    def _respond(self, body: bytes, headers: dict) -> Response:
+        # Headers set on the injected Response (ETag) are not merged into a
+        # returned Response, so copy them over.
+        current = {k: v for k, v in self.response.headers.items() if k.lower() != "content-length"}
+        return Response(content=body, media_type="application/json", headers={**headers, **current})
+
+    async def get(self) -> Response | None:
+        if self.key is None or self.cache.backend is None:
+            return None
+        raw = await self.cache.backend.get(self.key)
+        if raw is not None:
+            meta, body = raw.split(b"\n", 1)
+            meta = json.loads(meta)
+            if meta["version"] == self.version:
+                self.cache.hits += 1
+                return self._respond(body, meta["headers"])
+        self.cache.misses += 1
+        return None
+
+    async def store(self, model, content) -> Response:
+        """Serialize ``content`` as ``model``, cache it and return the response."""
+        return await self._store(_adapter(model).dump_json(_adapter(model).validate_python(content, from_attributes=True)))
+
+    async def store_rows(self, content) -> Response:
+        """Like ``store`` for content already shaped as the response schema (see ``serialization``)."""
+        return await self._store(dumps(content))
+
+    async def _store(self, body: bytes) -> Response:
+        headers = {k: v for k, v in self.response.headers.items() if k.lower() not in ("etag", "content-length")}
+        if self.key is not None and self.cache.backend is not None:
+            meta = json.dumps({"version": self.version, "headers": headers}).encode()
+            await self.cache.backend.set(self.key, meta + b"\n" + body, self.family_id, self.cache.ttl)
+        return self._respond(body, headers)
+
+def backend_from_settings(settings: Settings) -> CacheBackend | None:
+    backend = settings.response_cache_backend.lower()
+    if backend == "redis":
+        return RedisBackend.from_url(settings.response_cache_url)
+    if backend == "memory":
+        return MemoryBackend(maxsize=settings.response_cache_size)
+    return None
+
+def cached_route(route: str, vary: Callable[..., Any] = no_vary):
+    """Route dependency providing a ``CachedRoute``; also applies the family ETag check.
+
+    ``vary`` is as for ``family_etag_check``: its value keys the entry as well as the tag.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        version: int | None = Depends(check_family_etag if vary is no_vary else family_etag_check(vary)),
+        current_user: Principal = Depends(get_current_user),
+        varies: Any = Depends(vary),
+    ) -> CachedRoute:
+        return CachedRoute(current().response_cache, route, request, response, current_user.family_id, version, varies)
+    return dependency
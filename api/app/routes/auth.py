@@ -1,19 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..models import User
-from ..schemas import UserCreate, UserOut, Token, Login
-from ..utils import hash_password, verify_password, create_access_token, get_current_user
+from ..schemas import UserCreate, UserOut, Token, Login, RefreshRequest
+from ..principals import Principal
+from ..query_budget import query_budget
+from ..sessions import open_session, revoke, rotate
+from ..utils import hash_password, verify_password, create_access_token, get_current_user, get_read_db, principal_claims, ACCESS_TOKEN_EXPIRE_MINUTES
 from datetime import timedelta
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(query_budget(3))])
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if username or email already exists
-    existing_user = db.query(User).filter(
+    result = await db.execute(select(User).filter(
         (User.username == user.username) | (User.email == user.email)
-    ).first()
+    ))
+    existing_user = result.scalars().first()
     if existing_user:
         if existing_user.username == user.username:
             raise HTTPException(
@@ -27,7 +32,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
             )
 
     # Hash the password
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password(user.password)
 
     # Create new user
     new_user = User(
@@ -36,15 +41,16 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         password_hash=hashed_password
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
-@router.post("/login", response_model=Token)
-def login(user: Login, db: Session = Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(query_budget(3))])
+async def login(user: Login, db: AsyncSession = Depends(get_db)):
     # Find the user by username
-    user_db = db.query(User).filter(User.username == user.username).first()
+    result = await db.execute(select(User).filter(User.username == user.username))
+    user_db = result.scalars().first()
     if not user_db:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,7 +59,7 @@ def login(user: Login, db: Session = Depends(get_db)):
         )
 
     # Verify the password
-    if not verify_password(user.password, user_db.password_hash):
+    if not await verify_password(user.password, user_db.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
@@ -61,13 +67,45 @@ def login(user: Login, db: Session = Depends(get_db)):
         )
 
     # Generate a JWT token
-    access_token_expires = timedelta(minutes=30)
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=principal_claims(user_db), expires_delta=access_token_expires
     )
+    refresh_token = await open_session(db, user_db)
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
-@router.get("/me", response_model=UserOut)
-def get_current_user_details(current_user: User = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+@router.post("/refresh", response_model=Token, dependencies=[Depends(query_budget(2))])
+async def refresh(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    # Rotates the refresh token; no password check, so no bcrypt
+    user_id, refresh_token = await rotate(db, body.refresh_token)
+    user_db = await db.get(User, user_id)
+    if user_db is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = create_access_token(
+        data=principal_claims(user_db), expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/logout", dependencies=[Depends(query_budget(1))])
+async def logout(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    await revoke(db, body.refresh_token)
+    return {"message": "Logged out successfully"}
+
+@router.get("/me", response_model=UserOut, dependencies=[Depends(query_budget(2))])
+async def get_current_user_details(db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user)):
+    if current_user.email is None:
+        # Principal was built from token claims alone, and the user may have been deleted since
+        user = await db.get(User, current_user.id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return user
+    return current_user
@@ -1,59 +1,359 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from ..database import get_db
-from ..models import Chore, User
-from ..schemas import ChoreCreate, ChoreOut
-from ..utils import get_current_user
+from ..models import ArchivedChore, Chore, ChoreOccurrence, User
+from ..queries import family_chore_series, family_chores, family_chores_due
+from ..pagination import decode_cursor, page_limit, paginate
+from ..schemas import BatchItemResult, ChoreBatch, ChoreBatchOut, ChoreCreate, ChoreOccurrenceUpdate, ChoreOut
+from ..principals import Principal
+from ..query_budget import query_budget
+from ..etags import bump_family_version
+from ..response_cache import CachedRoute, cached_route
+from ..serialization import archived_chore_rows, chore_rows
+from ..stats import OCCURRENCE_STAT_COLUMNS, STAT_COLUMNS, StatDeltas, occurrence_stat
+from ..occurrences import chore_key, chore_occurrences, chore_out, expansion_end
+from ..recurrence import Occurrence, merge_page, naive_utc, occurrence_at, series_end
+from ..utils import get_current_user, get_read_db
+from ..runtime import current
 
 router = APIRouter(prefix="/chores", tags=["chores"])
 
-@router.post("/", response_model=ChoreOut, status_code=status.HTTP_201_CREATED)
-def create_chore(chore: ChoreCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/", response_model=ChoreOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(query_budget(5))])
+async def create_chore(chore: ChoreCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if not current_user.family_id:
         raise HTTPException(status_code=400, detail="You must be part of a family to create a chore")
     if chore.family_id != current_user.family_id:
         raise HTTPException(status_code=403, detail="You can only create chores for your family")
-    assigned_user = db.query(User).filter(User.id == chore.assigned_to_id, User.family_id == current_user.family_id).first()
-    if not assigned_user:
+    result = await db.execute(select(User.id).filter(User.id == chore.assigned_to_id, User.family_id == current_user.family_id))
+    if result.scalar() is None:
         raise HTTPException(status_code=403, detail="Assigned user must be a member of your family")
-    db_chore = Chore(**chore.dict())
-    db.add(db_chore)
-    db.commit()
-    db.refresh(db_chore)
+    result = await db.execute(insert(Chore).values(**_chore_row(chore)).returning(*chore_rows.columns))
+    db_chore = chore_rows.row(result.one())
+    stats = StatDeltas()
+    stats.add(db_chore)
+    await stats.apply(db)
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "chores", "stats")
+    await current().broker.publish(current_user.family_id, "chore.created", id=db_chore["id"], version=version)
     return db_chore
 
-@router.get("/", response_model=list[ChoreOut])
-def get_chores(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def _chore_row(chore) -> dict:
+    row = chore.model_dump()
+    if row.get("status") is None:
+        row.pop("status", None)
+    row["recurrence_end"] = series_end(chore.rrule, chore.due_at)
+    return row
+
+# What StatDeltas needs of a chore's previous state, and of its occurrences
+_stat_columns = [Chore.__table__.c[name] for name in STAT_COLUMNS]
+_occurrence_stat_columns = [ChoreOccurrence.__table__.c[name] for name in OCCURRENCE_STAT_COLUMNS]
+
+def _series_changed(current, chore) -> bool:
+    # Occurrence overrides only apply to the rule and first due date they were made for
+    due_at = naive_utc(current.due_at) if current.due_at else None
+    return (current.rrule, due_at) != (chore.rrule, naive_utc(chore.due_at) if chore.due_at else None)
+
+@router.post("/batch", response_model=ChoreBatchOut, dependencies=[Depends(query_budget(10))])
+async def batch_chores(batch: ChoreBatch, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    """Create, update and delete many chores in one transaction.
+
+    Items failing validation get an error result and are skipped; the rest are
+    written with one statement per operation, whatever the batch size.
+    """
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to modify chores")
+    family_id = current_user.family_id
+    assignee_ids = {chore.assigned_to_id for chore in (*batch.create, *batch.update)}
+    members = set()
+    if assignee_ids:
+        result = await db.execute(select(User.id).filter(User.family_id == family_id, User.id.in_(assignee_ids)))
+        members = set(result.scalars().all())
+    target_ids = {chore.id for chore in batch.update} | set(batch.delete)
+    existing = {}
+    if target_ids:
+        result = await db.execute(
+            select(Chore.id, *_stat_columns).filter(Chore.family_id == family_id, Chore.id.in_(target_ids))
+        )
+        existing = {row.id: row for row in result}
+
+    results: list[BatchItemResult] = []
+    seen: set[int] = set()
+
+    def error(op: str, index: int, status_code: int, detail: str, chore_id: int | None = None) -> None:
+        results.append(BatchItemResult(op=op, index=index, id=chore_id, status_code=status_code, detail=detail))
+
+    def check_target(op: str, index: int, chore_id: int) -> bool:
+        if chore_id not in existing:
+            error(op, index, 404, "Chore not found or not authorized", chore_id)
+        elif chore_id in seen:
+            error(op, index, 409, "Chore appears more than once in the batch", chore_id)
+        else:
+            seen.add(chore_id)
+            return True
+        return False
+
+    def check_fields(op: str, index: int, chore, chore_id: int | None = None) -> bool:
+        if chore.family_id != family_id:
+            error(op, index, 403, "You can only modify chores for your family", chore_id)
+        elif chore.assigned_to_id not in members:
+            error(op, index, 403, "Assigned user must be a member of your family", chore_id)
+        else:
+            return True
+        return False
+
+    creates = [(index, chore) for index, chore in enumerate(batch.create) if check_fields("create", index, chore)]
+    updates = [(index, chore) for index, chore in enumerate(batch.update)
+               if check_fields("update", index, chore, chore.id) and check_target("update", index, chore.id)]
+    deletes = [(index, chore_id) for index, chore_id in enumerate(batch.delete) if check_target("delete", index, chore_id)]
+
+    if not (creates or updates or deletes):
+        return ChoreBatchOut(results=results, chores=[])
+
+    created_ids = []
+    if creates:
+        result = await db.execute(
+            insert(Chore).returning(Chore.id),
+            [_chore_row(chore) for _, chore in creates],
+        )
+        # One multi-row INSERT assigns ids in row order. sort_by_parameter_order
+        # would make SQLite fall back to one INSERT per row.
+        created_ids = sorted(result.scalars().all())
+    if updates:
+        # ORM bulk UPDATE by primary key: one executemany, onupdate columns included
+        await db.execute(update(Chore), [_chore_row(chore) for _, chore in updates])
+    reset_ids = [chore.id for _, chore in updates if _series_changed(existing[chore.id], chore)]
+    reset_ids += [chore_id for _, chore_id in deletes]
+    stats = StatDeltas()
+    if reset_ids:
+        result = await db.execute(
+            delete(ChoreOccurrence).where(ChoreOccurrence.chore_id.in_(reset_ids)).returning(*_occurrence_stat_columns)
+        )
+        for override in result:
+            stats.remove(occurrence_stat(family_id, override))
+    if deletes:
+        await db.execute(delete(Chore).where(Chore.id.in_([chore_id for _, chore_id in deletes])))
+    version = await bump_family_version(db, family_id)
+    changed_ids = created_ids + [chore.id for _, chore in updates]
+    chores = []
+    if changed_ids:
+        result = await db.execute(
+            select(Chore).filter(Chore.id.in_(changed_ids)).order_by(Chore.id).execution_options(populate_existing=True)
+        )
+        chores = result.scalars().all()
+    for chore_id in [chore.id for _, chore in updates] + [chore_id for _, chore_id in deletes]:
+        stats.remove(existing[chore_id]._mapping)
+    for chore in chores:
+        stats.add(chore_rows.from_object(chore))
+    await stats.apply(db)
+    await db.commit()
+    await current().response_cache.invalidate(family_id, "chores", "stats")
+    await current().broker.publish(
+        family_id, "chore.batch", version=version, created=created_ids,
+        updated=[chore.id for _, chore in updates], deleted=[chore_id for _, chore_id in deletes],
+    )
+
+    results += [BatchItemResult(op="create", index=index, id=chore_id, status_code=201)
+                for (index, _), chore_id in zip(creates, created_ids)]
+    results += [BatchItemResult(op="update", index=index, id=chore.id, status_code=200) for index, chore in updates]
+    results += [BatchItemResult(op="delete", index=index, id=chore_id, status_code=200) for index, chore_id in deletes]
+    order = {"create": 0, "update": 1, "delete": 2}
+    results.sort(key=lambda item: (order[item.op], item.index))
+    return ChoreBatchOut(results=results, chores=chores)
+
+@router.get("/", response_model=list[ChoreOut], dependencies=[Depends(query_budget(6))])
+async def get_chores(
+    response: Response,
+    status_filter: bool | None = Query(None, alias="status"),
+    assigned_to_id: int | None = None,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    include_archived: bool = False,
+    cursor: str | None = None,
+    limit: int = Depends(page_limit),
+    until: datetime | None = Depends(expansion_end),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    cache: CachedRoute = Depends(cached_route("chores", vary=expansion_end)),
+):
+    """All chores by id, or with ``from``/``to`` the chores due in that window by due date.
+
+    In window mode recurring chores are expanded into their occurrences (with
+    only ``from``, up to ``EXPANSION_HORIZON`` past it or today), and chores
+    without a due date are left out. Archived chores are only included with
+    ``include_archived``.
+    """
     if not current_user.family_id:
         raise HTTPException(status_code=400, detail="You must be part of a family to view chores")
-    chores = db.query(Chore).filter(Chore.family_id == current_user.family_id).all()
-    return chores
+    if (cached := await cache.get()) is not None:
+        return cached
+    if from_ is None and to is None:
+        after_id = decode_cursor(cursor, 1)[0] if cursor else None
+        query = family_chores(current_user.family_id, status_filter, assigned_to_id, after_id)
+        result = await db.execute(chore_rows.select(query.limit(limit + 1)))
+        chores = chore_rows.rows(result)
+        if include_archived:
+            query = family_chores(current_user.family_id, status_filter, assigned_to_id, after_id, ArchivedChore)
+            result = await db.execute(archived_chore_rows.select(query.limit(limit + 1)))
+            chores = merge_page([chores, archived_chore_rows.rows(result)], lambda chore: (chore["id"],), limit)
+        return await cache.store_rows(paginate(chores, limit, lambda chore: (chore["id"],), response))
 
-@router.put("/{chore_id}", response_model=ChoreOut)
-def update_chore(chore_id: int, chore: ChoreCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    after = tuple(decode_cursor(cursor, 2)) if cursor else None
+    query = family_chores_due(current_user.family_id, from_, to, status_filter, assigned_to_id, after)
+    result = await db.execute(chore_rows.select(query.limit(limit + 1)))
+    streams = [chore_rows.rows(result)]
+    if include_archived:
+        query = family_chores_due(current_user.family_id, from_, to, status_filter, assigned_to_id, after, ArchivedChore)
+        result = await db.execute(archived_chore_rows.select(query.limit(limit + 1)))
+        streams.append(archived_chore_rows.rows(result))
+    result = await db.execute(
+        family_chore_series(current_user.family_id, from_, to or until).options(selectinload(Chore.occurrences))
+    )
+    not_before = after[0] if after else None
+    # Occurrences can override status and assignee, so those filters apply after expansion
+    streams += [
+        (chore for chore in chore_occurrences(series, from_, to or until, not_before)
+         if (status_filter is None or chore["status"] == status_filter)
+         and (assigned_to_id is None or chore["assigned_to_id"] == assigned_to_id))
+        for series in result.scalars().all()
+    ]
+    page = merge_page(streams, chore_key, limit, (naive_utc(after[0]), after[1]) if after else None)
+    return await cache.store_rows(paginate(page, limit, lambda chore: (chore["due_at"], chore["id"]), response))
+
+@router.put("/{chore_id}", response_model=ChoreOut, dependencies=[Depends(query_budget(6))])
+async def update_chore(chore_id: int, chore: ChoreCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if not current_user.family_id:
         raise HTTPException(status_code=400, detail="You must be part of a family to update chores")
     if chore.family_id != current_user.family_id:
         raise HTTPException(status_code=403, detail="You can only update chores for your family")
-    assigned_user = db.query(User).filter(User.id == chore.assigned_to_id, User.family_id == current_user.family_id).first()
-    if not assigned_user:
-        raise HTTPException(status_code=403, detail="Assigned user must be a member of your family")
-    db_chore = db.query(Chore).filter(Chore.id == chore_id, Chore.family_id == current_user.family_id).first()
-    if not db_chore:
+    # The chore's current series and stats and the assignee check in one round trip
+    assignable = select(User.id).filter(User.id == chore.assigned_to_id, User.family_id == current_user.family_id).exists()
+    result = await db.execute(
+        select(*_stat_columns, assignable.label("assignable"))
+        .filter(Chore.id == chore_id, Chore.family_id == current_user.family_id)
+    )
+    existing = result.first()
+    if not existing:
         raise HTTPException(status_code=404, detail="Chore not found or not authorized")
-    for key, value in chore.dict().items():
-        setattr(db_chore, key, value)
-    db.commit()
-    db.refresh(db_chore)
+    if not existing.assignable:
+        raise HTTPException(status_code=403, detail="Assigned user must be a member of your family")
+    stats = StatDeltas()
+    if _series_changed(existing, chore):
+        result = await db.execute(
+            delete(ChoreOccurrence).where(ChoreOccurrence.chore_id == chore_id).returning(*_occurrence_stat_columns)
+        )
+        for override in result:
+            stats.remove(occurrence_stat(current_user.family_id, override))
+    result = await db.execute(
+        update(Chore).where(Chore.id == chore_id).values(**_chore_row(chore)).returning(*chore_rows.columns)
+    )
+    db_chore = chore_rows.row(result.one())
+    stats.remove(existing._mapping)
+    stats.add(db_chore)
+    await stats.apply(db)
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "chores", "stats")
+    await current().broker.publish(current_user.family_id, "chore.updated", id=chore_id, version=version)
     return db_chore
 
-@router.delete("/{chore_id}")
-def delete_chore(chore_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.delete("/{chore_id}", dependencies=[Depends(query_budget(5))])
+async def delete_chore(chore_id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if not current_user.family_id:
         raise HTTPException(status_code=400, detail="You must be part of a family to delete chores")
-    db_chore = db.query(Chore).filter(Chore.id == chore_id, Chore.family_id == current_user.family_id).first()
-    if not db_chore:
+    owned = select(Chore.id).filter(Chore.id == chore_id, Chore.family_id == current_user.family_id)
+    result = await db.execute(
+        delete(ChoreOccurrence).where(ChoreOccurrence.chore_id.in_(owned)).returning(*_occurrence_stat_columns)
+    )
+    stats = StatDeltas()
+    for override in result:
+        stats.remove(occurrence_stat(current_user.family_id, override))
+    result = await db.execute(
+        delete(Chore).where(Chore.id == chore_id, Chore.family_id == current_user.family_id).returning(*_stat_columns)
+    )
+    deleted = result.first()
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Chore not found or not authorized")
-    db.delete(db_chore)
-    db.commit()
-    return {"message": "Chore deleted successfully"}
\ No newline at end of file
+    stats.remove(deleted._mapping)
+    await stats.apply(db)
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "chores", "stats")
+    await current().broker.publish(current_user.family_id, "chore.deleted", id=chore_id, version=version)
+    return {"message": "Chore deleted successfully"}
+
+@router.put("/{chore_id}/occurrences/{recurrence_id}", response_model=ChoreOut, dependencies=[Depends(query_budget(7))])
+async def update_chore_occurrence(
+    chore_id: int,
+    recurrence_id: datetime,
+    changes: ChoreOccurrenceUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Change, complete or cancel one occurrence of a recurring chore, leaving the series as is.
+
+    Setting the status counts the occurrence in ``GET /stats/``, for its
+    assignee at that point.
+    """
+    chore, override = await _occurrence_override(db, current_user, chore_id, recurrence_id)
+    if changes.assigned_to_id is not None:
+        result = await db.execute(select(User.id).filter(User.id == changes.assigned_to_id, User.family_id == current_user.family_id))
+        if result.scalar() is None:
+            raise HTTPException(status_code=403, detail="Assigned user must be a member of your family")
+    stats = StatDeltas()
+    stats.remove(occurrence_stat(current_user.family_id, override))
+    for key, value in changes.model_dump().items():
+        setattr(override, key, value)
+    if override.status is not None and override.assigned_to_id is None:
+        # A later change of the series assignee must not move the stats
+        override.assigned_to_id = chore.assigned_to_id
+    stats.add(occurrence_stat(current_user.family_id, override))
+    await stats.apply(db)
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "chores", "stats")
+    await current().broker.publish(current_user.family_id, "chore.occurrence.updated", id=chore_id,
+                         recurrence_id=override.recurrence_id.isoformat(), version=version)
+    due_at = override.due_at or override.recurrence_id
+    return chore_out(chore, Occurrence(due_at, due_at, override.recurrence_id, override))
+
+@router.delete("/{chore_id}/occurrences/{recurrence_id}", dependencies=[Depends(query_budget(6))])
+async def cancel_chore_occurrence(
+    chore_id: int,
+    recurrence_id: datetime,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    _, override = await _occurrence_override(db, current_user, chore_id, recurrence_id)
+    stats = StatDeltas()
+    stats.remove(occurrence_stat(current_user.family_id, override))
+    override.cancelled = True
+    await stats.apply(db)
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "chores", "stats")
+    await current().broker.publish(current_user.family_id, "chore.occurrence.updated", id=chore_id,
+                         recurrence_id=override.recurrence_id.isoformat(), version=version)
+    return {"message": "Chore occurrence cancelled successfully"}
+
+async def _occurrence_override(db: AsyncSession, current_user: Principal, chore_id: int,
+                               recurrence_id: datetime) -> tuple[Chore, ChoreOccurrence]:
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to update chores")
+    result = await db.execute(
+        select(Chore).filter(Chore.id == chore_id, Chore.family_id == current_user.family_id, Chore.rrule.is_not(None))
+    )
+    chore = result.scalars().first()
+    if not chore:
+        raise HTTPException(status_code=404, detail="Recurring chore not found or not authorized")
+    recurrence_id = occurrence_at(chore.rrule, chore.due_at, recurrence_id)
+    if recurrence_id is None:
+        raise HTTPException(status_code=404, detail="The chore has no occurrence at that time")
+    override = await db.get(ChoreOccurrence, (chore_id, recurrence_id))
+    if override is None:
+        override = ChoreOccurrence(chore_id=chore_id, recurrence_id=recurrence_id, cancelled=False)
+        db.add(override)
+    return chore, override
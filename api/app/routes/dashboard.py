@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..models import Event, User
+from ..occurrences import event_key, event_occurrences
+from ..pagination import page_limit, next_page
+from ..queries import assignee_pairs, family_chores, family_event_series, family_events, family_with_members
+from ..recurrence import merge_page
+from ..schemas import DashboardOut, UserOut
+from ..serialization import chore_rows, dumps, event_rows, family_rows, user_rows
+from ..principals import Principal
+from ..query_budget import query_budget
+from ..utils import get_current_user, get_read_db
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+DEFAULT_WINDOW_BEFORE = timedelta(days=7)
+DEFAULT_WINDOW_AFTER = timedelta(days=35)
+
+def _existing(user: User | None) -> User:
+    # A principal built from token claims alone outlives a deleted user, as on /auth/me
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+@router.get("/", response_model=DashboardOut, dependencies=[Depends(query_budget(8))])
+async def get_dashboard(
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Everything the dashboard needs on load: user, family, members, chores and an event window."""
+    if not current_user.family_id:
+        user = await db.get(User, current_user.id) if current_user.email is None else current_user
+        return DashboardOut(user=UserOut.model_validate(_existing(user)))
+
+    # Family and members in one statement; the caller is one of the members
+    rows = (await db.execute(family_with_members(current_user.family_id))).all()
+    family = rows[0][0] if rows else None
+    members = {user.id: user for _, user in rows if user is not None}
+    user = _existing(members.get(current_user.id) or await db.get(User, current_user.id))
+
+    result = await db.execute(chore_rows.select(family_chores(current_user.family_id).limit(limit + 1)))
+    chores, chores_cursor = next_page(chore_rows.rows(result), limit, lambda chore: (chore["id"],))
+
+    now = datetime.now(timezone.utc)
+    from_ = from_ or now - DEFAULT_WINDOW_BEFORE
+    to = to or now + DEFAULT_WINDOW_AFTER
+    result = await db.execute(event_rows.select(family_events(current_user.family_id, from_, to).limit(limit + 1)))
+    streams = [event_rows.rows(result)]
+    result = await db.execute(
+        family_event_series(current_user.family_id, from_, to).options(selectinload(Event.occurrences))
+    )
+    streams += [event_occurrences(series, from_, to, assignees=()) for series in result.scalars().all()]
+    events, events_cursor = next_page(merge_page(streams, event_key, limit), limit, lambda event: (event["start_time"], event["id"]))
+
+    # Assignees come from the member list; only former members need another query
+    assignees: dict[int, list] = {event["id"]: [] for event in events}
+    if events:
+        pairs = (await db.execute(assignee_pairs(list(assignees)))).all()
+        missing = {user_id for _, user_id in pairs if user_id not in members}
+        if missing:
+            result = await db.execute(select(User).filter(User.id.in_(missing)))
+            members.update({former.id: former for former in result.scalars()})
+        for event_id, user_id in pairs:
+            assignees[event_id].append(user_rows.from_object(members[user_id]))
+    for event in events:
+        event["assignees"] = assignees[event["id"]]
+
+    # Shaped like DashboardOut and rendered without another validation pass
+    return Response(content=dumps({
+        "user": user_rows.from_object(user),
+        "family": family_rows.from_object(family) if family else None,
+        "members": [user_rows.from_object(member) for member in members.values() if member.family_id == current_user.family_id],
+        "chores": chores,
+        "chores_next_cursor": chores_cursor,
+        "events": events,
+        "events_next_cursor": events_cursor,
+    }), media_type="application/json")
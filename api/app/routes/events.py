@@ -1,56 +1,388 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from ..database import get_db
-from ..models import Event, User
-from ..schemas import EventCreate, EventOut
-from ..utils import get_current_user
+from ..models import ArchivedEvent, Event, EventOccurrence, User, archived_event_assignees, event_assignees
+from ..queries import assignee_rows, family_event_series, family_events
+from ..pagination import decode_cursor, page_limit, paginate
+from ..schemas import (
+    BatchItemResult, EventBatch, EventBatchOut, EventCreate, EventOccurrenceUpdate, EventOut, FreeBusyOut, Interval,
+    UserBusy,
+)
+from ..principals import Principal
+from ..query_budget import query_budget
+from ..etags import bump_family_version
+from ..response_cache import CachedRoute, cached_route
+from ..serialization import archived_event_rows, event_rows, user_rows
+from ..freebusy import (
+    as_output, booked, conflict_detail, event_spans, find_conflicts, load_busy, locking_assignees, max_window, window,
+)
+from ..intervals import free
+from ..occurrences import event_key, event_occurrences, event_out, expansion_end
+from ..recurrence import Occurrence, merge_page, naive_utc, occurrence_at, series_end
+from ..utils import get_current_user, get_read_db
+from ..runtime import current
 
 router = APIRouter(prefix="/events", tags=["events"])
 
-@router.post("/", response_model=EventOut, status_code=status.HTTP_201_CREATED)
-def create_event(event: EventCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/", response_model=EventOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(query_budget(7))])
+async def create_event(
+    event: EventCreate,
+    allow_conflicts: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
     if not current_user.family_id:
         raise HTTPException(status_code=400, detail="You must be part of a family to create an event")
     if event.family_id != current_user.family_id:
         raise HTTPException(status_code=403, detail="You can only create events for your family")
-    
-    family_members = db.query(User).filter(User.family_id == current_user.family_id).all()
-    family_member_ids = {member.id for member in family_members}
-    invalid_assignees = [assignee_id for assignee_id in event.assignee_ids if assignee_id not in family_member_ids]
+
+    assignee_ids = list(dict.fromkeys(event.assignee_ids))
+    members = {}
+    if assignee_ids:
+        # Loaded once: validates the assignees, fills the response and, for the
+        # conflict check, locks them against concurrent bookings
+        query = select(User).filter(User.family_id == current_user.family_id, User.id.in_(assignee_ids))
+        result = await db.execute(user_rows.select(query if allow_conflicts else locking_assignees(query)))
+        members = {row["id"]: row for row in user_rows.rows(result)}
+    invalid_assignees = [assignee_id for assignee_id in event.assignee_ids if assignee_id not in members]
     if invalid_assignees:
         raise HTTPException(status_code=400, detail=f"Invalid assignee IDs: {invalid_assignees}. They must be family members.")
+    if not allow_conflicts:
+        spans = event_spans(event.rrule, event.start_time, event.end_time)
+        conflicts = await find_conflicts(db, current_user.family_id, assignee_ids, spans)
+        if conflicts:
+            raise HTTPException(status_code=409, detail=conflict_detail(conflicts))
 
-    db_event = Event(
-        title=event.title,
-        description=event.description,
-        family_id=event.family_id,
-        start_time=event.start_time,
-        end_time=event.end_time
-    )
-    db_event.assignees = db.query(User).filter(User.id.in_(event.assignee_ids)).all()
-    db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    result = await db.execute(insert(Event).values(**_event_row(event)).returning(*event_rows.columns))
+    db_event = event_rows.row(result.one(), assignees=[members[user_id] for user_id in assignee_ids])
+    if assignee_ids:
+        await db.execute(insert(event_assignees), [{"event_id": db_event["id"], "user_id": user_id} for user_id in assignee_ids])
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "events")
+    await current().broker.publish(current_user.family_id, "event.created", id=db_event["id"], version=version)
     return db_event
 
-@router.get("/", response_model=list[EventOut])
-def get_events(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/batch", response_model=EventBatchOut, dependencies=[Depends(query_budget(15))])
+async def batch_events(
+    batch: EventBatch,
+    allow_conflicts: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Create, update and delete many events in one transaction.
+
+    Items failing validation get an error result and are skipped. Updates
+    replace the event's assignees. Items are checked for double-booking
+    against the events outside the batch.
+    """
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to modify events")
+    family_id = current_user.family_id
+    assignee_ids = {user_id for event in (*batch.create, *batch.update) for user_id in event.assignee_ids}
+    members = set()
+    if assignee_ids:
+        query = select(User.id).filter(User.family_id == family_id, User.id.in_(assignee_ids))
+        result = await db.execute(query if allow_conflicts else locking_assignees(query))
+        members = set(result.scalars().all())
+    target_ids = {event.id for event in batch.update} | set(batch.delete)
+    existing = {}
+    if target_ids:
+        result = await db.execute(
+            select(Event.id, Event.rrule, Event.start_time).filter(Event.family_id == family_id, Event.id.in_(target_ids))
+        )
+        existing = {row.id: row for row in result}
+
+    results: list[BatchItemResult] = []
+    seen: set[int] = set()
+
+    def error(op: str, index: int, status_code: int, detail: str, event_id: int | None = None) -> None:
+        results.append(BatchItemResult(op=op, index=index, id=event_id, status_code=status_code, detail=detail))
+
+    def check_target(op: str, index: int, event_id: int) -> bool:
+        if event_id not in existing:
+            error(op, index, 404, "Event not found or not authorized", event_id)
+        elif event_id in seen:
+            error(op, index, 409, "Event appears more than once in the batch", event_id)
+        else:
+            seen.add(event_id)
+            return True
+        return False
+
+    def check_fields(op: str, index: int, event, event_id: int | None = None) -> bool:
+        invalid_assignees = [user_id for user_id in event.assignee_ids if user_id not in members]
+        if event.family_id != family_id:
+            error(op, index, 403, "You can only modify events for your family", event_id)
+        elif invalid_assignees:
+            error(op, index, 400, f"Invalid assignee IDs: {invalid_assignees}. They must be family members.", event_id)
+        else:
+            return True
+        return False
+
+    creates = [(index, event) for index, event in enumerate(batch.create) if check_fields("create", index, event)]
+    updates = [(index, event) for index, event in enumerate(batch.update)
+               if check_fields("update", index, event, event.id) and check_target("update", index, event.id)]
+    deletes = [(index, event_id) for index, event_id in enumerate(batch.delete) if check_target("delete", index, event_id)]
+
+    if not allow_conflicts and (creates or updates):
+        # One busy-time load covers every item
+        spans = {("create", index): event_spans(event.rrule, event.start_time, event.end_time) for index, event in creates}
+        spans.update({("update", index): event_spans(event.rrule, event.start_time, event.end_time) for index, event in updates})
+        frame = window(span for item in spans.values() for span in item)
+        # Items without any occurrence cannot conflict with anything
+        busy = await load_busy(
+            db, family_id, {user_id for _, event in creates + updates for user_id in event.assignee_ids},
+            *frame, exclude=seen,
+        ) if frame else {}
+
+        def free_of_conflicts(op: str, index: int, event, event_id: int | None = None) -> bool:
+            conflicts = booked(busy, event.assignee_ids, spans[op, index])
+            if conflicts:
+                error(op, index, 409, conflict_detail(conflicts), event_id)
+            return not conflicts
+
+        creates = [(index, event) for index, event in creates if free_of_conflicts("create", index, event)]
+        updates = [(index, event) for index, event in updates if free_of_conflicts("update", index, event, event.id)]
+
+    if not (creates or updates or deletes):
+        return EventBatchOut(results=results, events=[])
+
+    created_ids = []
+    if creates:
+        result = await db.execute(
+            insert(Event).returning(Event.id),
+            [_event_row(event) for _, event in creates],
+        )
+        # One multi-row INSERT assigns ids in row order. sort_by_parameter_order
+        # would make SQLite fall back to one INSERT per row.
+        created_ids = sorted(result.scalars().all())
+    if updates:
+        await db.execute(update(Event), [_event_row(event) for _, event in updates])
+    # Occurrence overrides only apply to the rule and start they were made for
+    reset_ids = [
+        event.id for _, event in updates
+        if (event.rrule, naive_utc(event.start_time)) != (existing[event.id].rrule, naive_utc(existing[event.id].start_time))
+    ] + [event_id for _, event_id in deletes]
+    if reset_ids:
+        await db.execute(delete(EventOccurrence).where(EventOccurrence.event_id.in_(reset_ids)))
+    # Assignees of updated events are replaced, those of deleted events dropped
+    replaced_ids = [event.id for _, event in updates] + [event_id for _, event_id in deletes]
+    if replaced_ids:
+        await db.execute(delete(event_assignees).where(event_assignees.c.event_id.in_(replaced_ids)))
+    if deletes:
+        await db.execute(delete(Event).where(Event.id.in_([event_id for _, event_id in deletes])))
+    pairs = [
+        {"event_id": event_id, "user_id": user_id}
+        for event_id, event in zip(created_ids + [event.id for _, event in updates], [event for _, event in creates + updates])
+        for user_id in dict.fromkeys(event.assignee_ids)
+    ]
+    if pairs:
+        await db.execute(insert(event_assignees), pairs)
+    version = await bump_family_version(db, family_id)
+    changed_ids = created_ids + [event.id for _, event in updates]
+    events = []
+    if changed_ids:
+        result = await db.execute(
+            select(Event).filter(Event.id.in_(changed_ids)).order_by(Event.id)
+            .options(selectinload(Event.assignees)).execution_options(populate_existing=True)
+        )
+        events = result.scalars().all()
+    await db.commit()
+    await current().response_cache.invalidate(family_id, "events")
+    await current().broker.publish(
+        family_id, "event.batch", version=version, created=created_ids,
+        updated=[event.id for _, event in updates], deleted=[event_id for _, event_id in deletes],
+    )
+
+    results += [BatchItemResult(op="create", index=index, id=event_id, status_code=201)
+                for (index, _), event_id in zip(creates, created_ids)]
+    results += [BatchItemResult(op="update", index=index, id=event.id, status_code=200) for index, event in updates]
+    results += [BatchItemResult(op="delete", index=index, id=event_id, status_code=200) for index, event_id in deletes]
+    order = {"create": 0, "update": 1, "delete": 2}
+    results.sort(key=lambda item: (order[item.op], item.index))
+    return EventBatchOut(results=results, events=events)
+
+def _event_row(event) -> dict:
+    row = event.model_dump(exclude={"assignee_ids"})
+    row["recurrence_end"] = series_end(event.rrule, event.start_time, event.end_time - event.start_time)
+    return row
+
+@router.get("/free-busy", response_model=FreeBusyOut, dependencies=[Depends(query_budget(6))])
+async def get_free_busy(
+    from_: datetime = Query(..., alias="from"),
+    to: datetime = Query(...),
+    user_ids: list[int] | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    cache: CachedRoute = Depends(cached_route("events")),
+):
+    """Busy time of each member in [from, to) and the gaps when all of them are free.
+
+    ``user_ids`` defaults to the whole family.
+    """
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to view free/busy time")
+    start, end = naive_utc(from_), naive_utc(to)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - start > max_window():
+        raise HTTPException(status_code=400, detail=f"The window can span at most {max_window().days} days")
+    if (cached := await cache.get()) is not None:
+        return cached
+    result = await db.execute(select(User.id).filter(User.family_id == current_user.family_id).order_by(User.id))
+    members = result.scalars().all()
+    if user_ids:
+        invalid = [user_id for user_id in user_ids if user_id not in members]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid user IDs: {invalid}. They must be family members.")
+        members = list(dict.fromkeys(user_ids))
+    busy = await load_busy(db, current_user.family_id, members, from_, to)
+    return await cache.store(FreeBusyOut, FreeBusyOut(
+        start=from_,
+        end=to,
+        users=[
+            UserBusy(user_id=user_id, busy=[
+                Interval(start=as_output(s, from_), end=as_output(e, from_)) for s, e in busy[user_id].busy(start, end)
+            ])
+            for user_id in members
+        ],
+        free=[Interval(start=as_output(s, from_), end=as_output(e, from_)) for s, e in free(busy.values(), start, end)],
+    ))
+
+@router.get("/", response_model=list[EventOut], dependencies=[Depends(query_budget(9))])
+async def get_events(
+    response: Response,
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+    include_archived: bool = False,
+    cursor: str | None = None,
+    limit: int = Depends(page_limit),
+    until: datetime | None = Depends(expansion_end),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    cache: CachedRoute = Depends(cached_route("events", vary=expansion_end)),
+):
+    """Events overlapping [from, to), recurring ones expanded into their occurrences.
+
+    Without ``to``, series are expanded up to ``EXPANSION_HORIZON`` past
+    ``from`` or today, whichever is later. Archived events are only included
+    with ``include_archived``.
+    """
     if not current_user.family_id:
         raise HTTPException(status_code=400, detail="You must be part of a family to view events")
-    events = db.query(Event).filter(Event.family_id == current_user.family_id).all()
+    if (cached := await cache.get()) is not None:
+        return cached
+    after = tuple(decode_cursor(cursor, 2)) if cursor else None
+    streams = [await _one_off_events(db, family_events(current_user.family_id, from_, to, after), limit)]
+    if include_archived:
+        query = family_events(current_user.family_id, from_, to, after, ArchivedEvent)
+        streams.append(await _one_off_events(db, query, limit, archived_event_rows, archived_event_assignees))
+    result = await db.execute(
+        family_event_series(current_user.family_id, from_, to or until)
+        .options(selectinload(Event.assignees), selectinload(Event.occurrences))
+    )
+    not_before = after[0] if after else None
+    streams += [event_occurrences(series, from_, to or until, not_before) for series in result.scalars().all()]
+    page = merge_page(streams, event_key, limit, (naive_utc(after[0]), after[1]) if after else None)
+    return await cache.store_rows(paginate(page, limit, lambda event: (event["start_time"], event["id"]), response))
 
+async def _one_off_events(db: AsyncSession, query, limit: int, rows=event_rows, assignees_table=event_assignees) -> list[dict]:
+    result = await db.execute(rows.select(query.limit(limit + 1)))
+    events = rows.rows(result)
+    # One extra SELECT ... IN loads the assignees of every event on the page
+    assignees: dict[int, list[dict]] = {event["id"]: [] for event in events}
+    if events:
+        for row in await db.execute(assignee_rows(list(assignees), assignees_table)):
+            assignees[row.event_id].append(user_rows.row(row))
     for event in events:
-        if event.assignees is None:
-            event.assignees = []
+        event["assignees"] = assignees[event["id"]]
     return events
 
-@router.delete("/{event_id}")
-def delete_event(event_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.put("/{event_id}/occurrences/{recurrence_id}", response_model=EventOut, dependencies=[Depends(query_budget(10))])
+async def update_event_occurrence(
+    event_id: int,
+    recurrence_id: datetime,
+    changes: EventOccurrenceUpdate,
+    allow_conflicts: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Change or cancel one occurrence of a recurring event, leaving the series as is."""
+    event, override = await _occurrence_override(db, current_user, event_id, recurrence_id)
+    if not allow_conflicts and not changes.cancelled and (changes.start_time or changes.end_time):
+        start = changes.start_time or override.recurrence_id
+        end = changes.end_time or start + (event.end_time - event.start_time)
+        assignee_ids = [assignee.id for assignee in event.assignees]
+        if assignee_ids:
+            await db.execute(locking_assignees(select(User.id).filter(User.id.in_(assignee_ids))))
+        conflicts = await find_conflicts(db, current_user.family_id, assignee_ids, [(start, end)], exclude=[event_id])
+        if conflicts:
+            raise HTTPException(status_code=409, detail=conflict_detail(conflicts))
+    for key, value in changes.model_dump().items():
+        setattr(override, key, value)
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "events")
+    await current().broker.publish(current_user.family_id, "event.occurrence.updated", id=event_id,
+                         recurrence_id=override.recurrence_id.isoformat(), version=version)
+    duration = event.end_time - event.start_time
+    start = override.start_time or override.recurrence_id
+    occurrence = Occurrence(start, override.end_time or start + duration, override.recurrence_id, override)
+    return event_out(event, [user_rows.from_object(assignee) for assignee in event.assignees], occurrence)
+
+@router.delete("/{event_id}/occurrences/{recurrence_id}", dependencies=[Depends(query_budget(7))])
+async def cancel_event_occurrence(
+    event_id: int,
+    recurrence_id: datetime,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    _, override = await _occurrence_override(db, current_user, event_id, recurrence_id)
+    override.cancelled = True
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "events")
+    await current().broker.publish(current_user.family_id, "event.occurrence.updated", id=event_id,
+                         recurrence_id=override.recurrence_id.isoformat(), version=version)
+    return {"message": "Event occurrence cancelled successfully"}
+
+async def _occurrence_override(db: AsyncSession, current_user: Principal, event_id: int,
+                               recurrence_id: datetime) -> tuple[Event, EventOccurrence]:
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to update events")
+    result = await db.execute(
+        select(Event).options(selectinload(Event.assignees))
+        .filter(Event.id == event_id, Event.family_id == current_user.family_id, Event.rrule.is_not(None))
+    )
+    event = result.scalars().first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Recurring event not found or not authorized")
+    recurrence_id = occurrence_at(event.rrule, event.start_time, recurrence_id)
+    if recurrence_id is None:
+        raise HTTPException(status_code=404, detail="The event has no occurrence at that time")
+    override = await db.get(EventOccurrence, (event_id, recurrence_id))
+    if override is None:
+        override = EventOccurrence(event_id=event_id, recurrence_id=recurrence_id, cancelled=False)
+        db.add(override)
+    return event, override
+
+@router.delete("/{event_id}", dependencies=[Depends(query_budget(5))])
+async def delete_event(event_id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if not current_user.family_id:
         raise HTTPException(status_code=400, detail="You must be part of a family to delete events")
-    db_event = db.query(Event).filter(Event.id == event_id, Event.family_id == current_user.family_id).first()
-    if not db_event:
+    owned = select(Event.id).filter(Event.id == event_id, Event.family_id == current_user.family_id)
+    await db.execute(delete(EventOccurrence).where(EventOccurrence.event_id.in_(owned)))
+    await db.execute(delete(event_assignees).where(event_assignees.c.event_id.in_(owned)))
+    result = await db.execute(
+        delete(Event).where(Event.id == event_id, Event.family_id == current_user.family_id).returning(Event.id)
+    )
+    if result.scalar() is None:
         raise HTTPException(status_code=404, detail="Event not found or not authorized")
-    db.delete(db_event)
-    db.commit()
-    return {"message": "Event deleted successfully"}
\ No newline at end of file
+    version = await bump_family_version(db, current_user.family_id)
+    await db.commit()
+    await current().response_cache.invalidate(current_user.family_id, "events")
+    await current().broker.publish(current_user.family_id, "event.deleted", id=event_id, version=version)
+    return {"message": "Event deleted successfully"}
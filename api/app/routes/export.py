@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Literal
+from ..export import EXPORTS, FORMATS, export_family
+from ..principals import Principal
+from ..query_budget import query_budget
+from ..utils import get_current_user
+from ..runtime import current
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+@router.get("/", dependencies=[Depends(query_budget(1))])
+async def export_family_data(
+    format_: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    table: str | None = None,
+    current_user: Principal = Depends(get_current_user),
+):
+    """Stream the caller's family's data: NDJSON with every table, or CSV of a single ``table``.
+
+    The rows are read after the response has started, on a session of their own.
+    """
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to export its data")
+    if table is not None and table not in EXPORTS:
+        raise HTTPException(status_code=400, detail=f"Unknown table, expected one of: {', '.join(EXPORTS)}")
+    if format_ == "csv" and table is None:
+        raise HTTPException(status_code=400, detail="A CSV export holds one table, pick it with table=")
+    family_id = current_user.family_id
+    database = current().database
+    replica = database.replica_for(family_id)
+
+    async def body():
+        # The request's own session is closed before a streaming body is sent
+        async with database.async_session() as session:
+            session.info["replica"] = replica
+            async for chunk in export_family(session, family_id, [table] if table else list(EXPORTS), format_):
+                yield chunk
+
+    filename = f"family-{family_id}-{table or 'export'}.{format_}"
+    return StreamingResponse(body(), media_type=FORMATS[format_],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
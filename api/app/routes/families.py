@@ -1,84 +1,117 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, record_write
 from ..models import Family, User
 from ..schemas import FamilyCreate, FamilyOut, UserOut, AddFamilyMember
-from ..utils import get_current_user, hash_password  # Import hash_password
+from ..queries import family_members
+from ..principals import Principal
+from ..query_budget import query_budget
+from ..etags import bump_family_version
+from ..response_cache import CachedRoute, cached_route
+from ..serialization import family_rows, user_rows
+from ..utils import get_current_user, get_read_db, hash_password  # Import hash_password
+from ..runtime import current
 
 router = APIRouter(prefix="/families", tags=["families"])
 
-@router.post("/", response_model=FamilyOut, status_code=status.HTTP_201_CREATED)
-def create_family(family: FamilyCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):    
-    admin = db.query(User).filter(User.id == current_user.id).first()
-    if not admin:
+@router.post("/", response_model=FamilyOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(query_budget(3))])
+async def create_family(family: FamilyCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    result = await db.execute(insert(Family).values(name=family.name, admin_id=current_user.id).returning(*family_rows.columns))
+    db_family = family_rows.row(result.one())
+    record_write(db, db_family["id"])
+    result = await db.execute(
+        update(User).where(User.id == current_user.id).values(family_id=db_family["id"]).returning(User.username)
+    )
+    username = result.scalar()
+    if username is None:
         raise HTTPException(status_code=404, detail="Admin user not found")
-    
-    db_family = Family(name=family.name, admin_id=current_user.id)
-    db.add(db_family)
-    db.commit()
-    db.refresh(db_family)
-    current_user.family_id = db_family.id
-    db.commit()
+    await db.commit()
+    current().principal_cache.invalidate(username)
+    await current().broker.publish(db_family["id"], "member.added", user_id=current_user.id, username=username)
     return db_family
 
-@router.get("/my-family", response_model=FamilyOut)
-def get_my_family(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/my-family", response_model=FamilyOut, dependencies=[Depends(query_budget(3))])
+async def get_my_family(db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user), cache: CachedRoute = Depends(cached_route("family"))):
     if not current_user.family_id:
         raise HTTPException(status_code=404, detail="You are not part of a family")
-    family = db.query(Family).filter(Family.id == current_user.family_id).first()
+    if (cached := await cache.get()) is not None:
+        return cached
+    result = await db.execute(select(Family).filter(Family.id == current_user.family_id))
+    family = result.scalars().first()
     if not family:
         raise HTTPException(status_code=404, detail="Family not found")
-    return FamilyOut(id=family.id, name=family.name, admin_id=family.admin_id)
+    return await cache.store(FamilyOut, FamilyOut(id=family.id, name=family.name, admin_id=family.admin_id))
 
-@router.get("/{family_id}/members", response_model=list[UserOut])
-def get_family_members(family_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/{family_id}/members", response_model=list[UserOut], dependencies=[Depends(query_budget(3))])
+async def get_family_members(family_id: int, db: AsyncSession = Depends(get_read_db), current_user: Principal = Depends(get_current_user), cache: CachedRoute = Depends(cached_route("members"))):
     if not current_user.family_id or current_user.family_id != family_id:
         raise HTTPException(status_code=403, detail="You are not authorized to view this family's members")
-    members = db.query(User).filter(User.family_id == family_id).all()
-    return members
+    if (cached := await cache.get()) is not None:
+        return cached
+    result = await db.execute(user_rows.select(family_members(family_id)))
+    return await cache.store_rows(user_rows.rows(result))
 
-@router.post("/{family_id}/members", response_model=UserOut)
-def add_family_member(family_id: int, member: AddFamilyMember, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    family = db.query(Family).filter(Family.id == family_id).first()
-    if not family:
-        raise HTTPException(status_code=404, detail="Family not found")
-    if not family.admin_id or family.admin_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Only the family admin can add members")
-    
-    user_to_add = db.query(User).filter(User.username == member.username).first()
-    if user_to_add:
-        if user_to_add.family_id:
+@router.post("/{family_id}/members", response_model=UserOut, dependencies=[Depends(query_budget(5))])
+async def add_family_member(family_id: int, member: AddFamilyMember, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    await _require_admin(db, family_id, current_user, "Only the family admin can add members")
+
+    result = await db.execute(select(User.id, User.family_id).filter(User.username == member.username))
+    existing = result.first()
+    if existing:
+        if existing.family_id:
+            raise HTTPException(status_code=400, detail="User is already part of a family")
+        # Guarded so a concurrent add to another family cannot be overwritten
+        result = await db.execute(
+            update(User).where(User.id == existing.id, User.family_id.is_(None))
+            .values(family_id=family_id).returning(*user_rows.columns)
+        )
+        row = result.first()
+        if row is None:
             raise HTTPException(status_code=400, detail="User is already part of a family")
     else:
-        hashed_password = hash_password(member.temporary_password)
-        user_to_add = User(
-            username=member.username,
-            email=member.email,
-            password_hash=hashed_password
+        hashed_password = await hash_password(member.temporary_password)
+        result = await db.execute(
+            insert(User).values(
+                username=member.username,
+                email=member.email,
+                password_hash=hashed_password,
+                family_id=family_id,
+            ).returning(*user_rows.columns)
         )
-        db.add(user_to_add)
-        db.commit()
-        db.refresh(user_to_add)
-
-    user_to_add.family_id = family_id
-    db.commit()
-    db.refresh(user_to_add)
+        row = result.one()
+    user_to_add = user_rows.row(row)
+    version = await bump_family_version(db, family_id)
+    await db.commit()
+    await current().response_cache.invalidate(family_id)
+    await current().broker.publish(family_id, "member.added", user_id=user_to_add["id"],
+                                   username=user_to_add["username"], version=version)
+    current().principal_cache.invalidate(user_to_add["username"])
     return user_to_add
 
-@router.delete("/{family_id}/members/{user_id}")
-def remove_family_member(family_id: int, user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    family = db.query(Family).filter(Family.id == family_id).first()
+@router.delete("/{family_id}/members/{user_id}", dependencies=[Depends(query_budget(4))])
+async def remove_family_member(family_id: int, user_id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    await _require_admin(db, family_id, current_user, "Only the family admin can remove members")
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot remove yourself as the admin")
+
+    result = await db.execute(
+        update(User).where(User.id == user_id, User.family_id == family_id).values(family_id=None).returning(User.username)
+    )
+    username = result.scalar()
+    if username is None:
+        raise HTTPException(status_code=404, detail="User not found in this family")
+    version = await bump_family_version(db, family_id)
+    await db.commit()
+    await current().response_cache.invalidate(family_id)
+    await current().broker.publish(family_id, "member.removed", user_id=user_id, username=username, version=version)
+    current().principal_cache.invalidate(username)
+    return {"message": "User removed from family successfully"}
+
+async def _require_admin(db: AsyncSession, family_id: int, current_user: Principal, detail: str) -> None:
+    result = await db.execute(select(Family.id, Family.admin_id).filter(Family.id == family_id))
+    family = result.first()
     if not family:
         raise HTTPException(status_code=404, detail="Family not found")
     if not family.admin_id or family.admin_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Only the family admin can remove members")
-    
-    user_to_remove = db.query(User).filter(User.id == user_id, User.family_id == family_id).first()
-    if not user_to_remove:
-        raise HTTPException(status_code=404, detail="User not found in this family")
-    if user_to_remove.id == current_user.id:
-        raise HTTPException(status_code=400, detail="You cannot remove yourself as the admin")
-
-    user_to_remove.family_id = None
-    db.commit()
-    return {"message": "User removed from family successfully"}
\ No newline at end of file
+        raise HTTPException(status_code=403, detail=detail)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..pagination import decode_cursor, page_limit, paginate
+from ..principals import Principal
+from ..queries import family_search
+from ..query_budget import query_budget
+from ..schemas import SearchResult
+from ..search import terms
+from ..utils import get_current_user, get_read_db
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("/", response_model=list[SearchResult], dependencies=[Depends(query_budget(2))])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Chores and events of the caller's family whose title or description match ``q``, best match first.
+
+    ``q`` takes web-search syntax on PostgreSQL ("quoted phrases", -excluded, or).
+    """
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to search")
+    if not terms(q):
+        return []
+    after = tuple(decode_cursor(cursor, 3)) if cursor else None
+    query = family_search(current_user.family_id, q, db.bind.dialect.name, after)
+    result = await db.execute(query.limit(limit + 1))
+    return paginate([dict(row._mapping) for row in result], limit, lambda row: (row["rank"], row["kind"], row["id"]), response)
@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import User
+from ..principals import Principal
+from ..queries import family_chore_stats, family_members
+from ..query_budget import query_budget
+from ..response_cache import CachedRoute, cached_route
+from ..schemas import StatsOut
+from ..stats import streaks, week_of
+from ..utils import get_current_user, get_read_db
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+def _member(user_id: int, username: str) -> dict:
+    # "done" holds the weeks with a completed chore, for the streaks
+    return {"user_id": user_id, "username": username, "total": 0, "completed": 0, "weeks": [], "done": set()}
+
+def current_week() -> date:
+    # A dependency, so the cache entry, the ETag and the body all see the same week
+    return week_of(datetime.now(timezone.utc))
+
+@router.get("/", response_model=StatsOut, dependencies=[Depends(query_budget(3))])
+async def get_stats(
+    weeks: int = Query(12, ge=1, le=104),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    this_week: date = Depends(current_week),
+    cache: CachedRoute = Depends(cached_route("stats", vary=current_week)),
+):
+    """Chore counts and streaks per member, with a summary of the last ``weeks`` weeks.
+
+    Read from the ``chore_stats`` aggregates; one-off chores count in the week they
+    are due, and occurrences of recurring chores once their status is set.
+    """
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to view stats")
+    if (cached := await cache.get()) is not None:
+        return cached
+    since = this_week - timedelta(weeks=weeks - 1)
+    # Current members show up even before they have chores; former ones while they have stats
+    result = await db.execute(family_members(current_user.family_id).with_only_columns(User.id, User.username))
+    members = {user_id: _member(user_id, username) for user_id, username in result}
+    for row in await db.execute(family_chore_stats(current_user.family_id)):
+        if row.user_id not in members:
+            members[row.user_id] = _member(row.user_id, row.username)
+        member = members[row.user_id]
+        member["total"] += row.total
+        member["completed"] += row.completed
+        if row.completed:
+            member["done"].add(row.week)
+        if since <= row.week <= this_week and row.total:
+            member["weeks"].append({"week": row.week, "total": row.total, "completed": row.completed})
+    for member in members.values():
+        member["current_streak"], member["longest_streak"] = streaks(member.pop("done"), this_week)
+    leaderboard = sorted(members.values(), key=lambda member: (-member["completed"], member["user_id"]))
+    return await cache.store(StatsOut, {"members": leaderboard})
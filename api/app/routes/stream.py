@@ -0,0 +1,56 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from ..principals import Principal
+from ..pubsub import Subscription
+from ..utils import get_streaming_user
+from ..runtime import current
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+def _sse(message: dict) -> str:
+    lines = [f"event: {message['type']}"]
+    if message.get("version") is not None:
+        lines.append(f"id: {message['version']}")
+    lines.append("data: " + json.dumps(message, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+async def _family_events(family_id: int, user_id: int):
+    async with current().broker.subscribe(family_id, user_id) as subscription:
+        yield "retry: 5000\n\n"
+        while True:
+            message = await _next_message(subscription)
+            if message is None:
+                yield ": ping\n\n"
+                continue
+            if subscription.overflowed:
+                # Events were dropped for this slow client; it must refetch
+                subscription.overflowed = False
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                yield _sse({"family_id": family_id, "type": "resync"})
+                continue
+            yield _sse(message)
+            if message["type"] == "member.removed" and message.get("user_id") == user_id:
+                return
+
+async def _next_message(subscription: Subscription) -> dict | None:
+    try:
+        return await asyncio.wait_for(subscription.queue.get(), current().settings.stream_heartbeat_seconds)
+    except asyncio.TimeoutError:
+        return None
+
+@router.get("/")
+async def family_changes(current_user: Principal = Depends(get_streaming_user)):
+    """Server-Sent Events with a compact notice for every committed change in the caller's family.
+
+    Clients refetch what changed (conditionally, with ETags) instead of polling.
+    """
+    if not current_user.family_id:
+        raise HTTPException(status_code=400, detail="You must be part of a family to follow changes")
+    return StreamingResponse(
+        _family_events(current_user.family_id, current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
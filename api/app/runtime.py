@@ -0,0 +1,40 @@
+"""Which app's resources the current request (or script) is using.
+
+``create_app`` activates its resources around every request, so several
+configured apps can share a process. Code running outside any app gets the
+default resources, built from the environment on first use.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from .resources import Resources
+
+_current: ContextVar["Resources | None"] = ContextVar("_current_resources", default=None)
+
+def current() -> "Resources":
+    resources = _current.get()
+    if resources is None:
+        from .resources import default_resources
+        resources = default_resources()
+    return resources
+
+@contextmanager
+def activate(resources: "Resources") -> Iterator["Resources"]:
+    token = _current.set(resources)
+    try:
+        yield resources
+    finally:
+        _current.reset(token)
+
+class ResourcesMiddleware:
+    """ASGI middleware making ``resources`` current for everything the app runs."""
+
+    def __init__(self, app, resources: "Resources"):
+        self.app = app
+        self.resources = resources
+
+    async def __call__(self, scope, receive, send):
+        with activate(self.resources):
+            await self.app(scope, receive, send)
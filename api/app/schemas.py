@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from .recurrence import validate_rule, validate_series
 
 class FamilyBase(BaseModel):
     name: str
@@ -38,6 +39,10 @@ class AddFamilyMember(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class Login(BaseModel):
     username: str
@@ -48,13 +53,36 @@ class ChoreBase(BaseModel):
     description: str | None = None
     family_id: int
     assigned_to_id: int
+    due_at: Optional[datetime] = None
+    rrule: Optional[str] = None
+
+    @field_validator("rrule")
+    @classmethod
+    def check_rrule(cls, value):
+        return validate_rule(value) if value else None
+
+    @model_validator(mode="after")
+    def check_due_at(self):
+        if self.rrule and self.due_at is None:
+            raise ValueError("A recurring chore needs due_at, its first occurrence")
+        return self
 
 class ChoreCreate(ChoreBase):
-    pass
+    # None keeps the current status on update; new chores start open
+    status: Optional[bool] = None
+
+    # Only on input: a listed occurrence may have been moved past the rule's end
+    @model_validator(mode="after")
+    def check_occurrences(self):
+        if self.rrule:
+            validate_series(self.rrule, self.due_at)
+        return self
 
 class ChoreOut(ChoreBase):
     id: int
     status: bool
+    # Original due date when this is one occurrence of a recurring chore
+    recurrence_id: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -68,6 +96,18 @@ class EventBase(BaseModel):
     start_time: datetime
     end_time: datetime
     assignee_ids: List[int]
+    rrule: Optional[str] = None
+
+    @field_validator("rrule")
+    @classmethod
+    def check_rrule(cls, value):
+        return validate_rule(value) if value else None
+
+    @model_validator(mode="after")
+    def check_occurrences(self):
+        if self.rrule:
+            validate_series(self.rrule, self.start_time)
+        return self
 
 class EventCreate(EventBase):
     pass
@@ -81,6 +121,110 @@ class EventOut(BaseModel):
     end_time: datetime
     created_at: datetime
     assignees: Optional[List[UserOut]] = []
+    rrule: Optional[str] = None
+    # Original start when this is one occurrence of a recurring event
+    recurrence_id: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class Interval(BaseModel):
+    start: datetime
+    end: datetime
+
+class UserBusy(BaseModel):
+    user_id: int
+    busy: List[Interval]
+
+class FreeBusyOut(BaseModel):
+    start: datetime
+    end: datetime
+    users: List[UserBusy]
+    # Times in the window when none of the users is busy
+    free: List[Interval]
+
+class ChoreOccurrenceUpdate(BaseModel):
+    """Override one occurrence of a recurring chore; unset fields keep the series value."""
+    title: Optional[str] = None
+    description: Optional[str] = None
+    assigned_to_id: Optional[int] = None
+    status: Optional[bool] = None
+    due_at: Optional[datetime] = None
+    cancelled: bool = False
+
+class EventOccurrenceUpdate(BaseModel):
+    """Override one occurrence of a recurring event; unset fields keep the series value."""
+    title: Optional[str] = None
+    description: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    cancelled: bool = False
+
+MAX_BATCH_SIZE = 500
+
+class BatchItemResult(BaseModel):
+    op: str
+    index: int
+    id: Optional[int] = None
+    status_code: int
+    detail: Optional[str] = None
+
+class ChoreBatchUpdate(ChoreCreate):
+    id: int
+
+class ChoreBatch(BaseModel):
+    create: List[ChoreCreate] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    update: List[ChoreBatchUpdate] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+
+class ChoreBatchOut(BaseModel):
+    results: List[BatchItemResult]
+    chores: List[ChoreOut]
+
+class EventBatchUpdate(EventBase):
+    id: int
+
+class EventBatch(BaseModel):
+    create: List[EventCreate] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    update: List[EventBatchUpdate] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+
+class EventBatchOut(BaseModel):
+    results: List[BatchItemResult]
+    events: List[EventOut]
+
+class DashboardOut(BaseModel):
+    user: UserOut
+    family: Optional[FamilyOut] = None
+    members: List[UserOut] = []
+    chores: List[ChoreOut] = []
+    chores_next_cursor: Optional[str] = None
+    events: List[EventOut] = []
+    events_next_cursor: Optional[str] = None
+
+class SearchResult(BaseModel):
+    kind: Literal["chore", "event"]
+    id: int
+    title: str
+    description: Optional[str] = None
+    rank: float
+
+class WeekStats(BaseModel):
+    week: date
+    total: int
+    completed: int
+
+class MemberStats(BaseModel):
+    user_id: int
+    username: str
+    total: int
+    completed: int
+    # Consecutive weeks with a completed chore, up to this week or the last
+    current_streak: int
+    longest_streak: int
+    # The requested weeks that have chores, oldest first
+    weeks: List[WeekStats]
+
+class StatsOut(BaseModel):
+    # Most completed chores first
+    members: List[MemberStats]
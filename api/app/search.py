@@ -0,0 +1,69 @@
+"""Full-text search over chore and event titles and descriptions.
+
+Searches match ``SearchDocument``, an expression over each row's title and
+description. On PostgreSQL it is a ``tsvector`` (title weighted above
+description), the same expression the GIN indexes ``ix_chores_search`` and
+``ix_events_search`` are built on, and queries go through
+``websearch_to_tsquery``. Other databases get the lowercased text instead,
+matched term by term with LIKE, so tests on SQLite exercise the same routes
+and pagination.
+"""
+import re
+from sqlalchemy import String, and_, case, func, literal
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from sqlalchemy.types import TypeDecorator
+
+SEARCH_CONFIG = "english"
+
+class SearchVector(TypeDecorator):
+    impl = String
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        return dialect.type_descriptor(TSVECTOR() if dialect.name == "postgresql" else String())
+
+class SearchDocument(ColumnElement):
+    """The searchable text of a row, compiled per dialect; on PostgreSQL, the indexed expression."""
+    inherit_cache = True
+    # Part of the statement cache key, and how an Index finds its table
+    _traverse_internals = [("title", InternalTraversal.dp_clauseelement),
+                           ("description", InternalTraversal.dp_clauseelement)]
+
+    def __init__(self, title, description):
+        self.title = title
+        self.description = description
+        self.type = SearchVector()
+
+@compiles(SearchDocument)
+def _text_document(element, compiler, **kw):
+    return "lower(coalesce({}, '') || ' ' || coalesce({}, ''))".format(
+        compiler.process(element.title, **kw), compiler.process(element.description, **kw)
+    )
+
+@compiles(SearchDocument, "postgresql")
+def _tsvector_document(element, compiler, **kw):
+    # Parenthesized, as an index expression that is not a plain function call must be
+    return (
+        "(setweight(to_tsvector('{config}', coalesce({}, '')), 'A') || "
+        "setweight(to_tsvector('{config}', coalesce({}, '')), 'B'))"
+    ).format(compiler.process(element.title, **kw), compiler.process(element.description, **kw), config=SEARCH_CONFIG)
+
+def terms(q: str) -> list[str]:
+    """The words of ``q``, lowercased; the LIKE fallback requires all of them."""
+    return list(dict.fromkeys(re.findall(r"\w+", q.lower())))
+
+def match_and_rank(dialect: str, q: str, document, title) -> tuple[ColumnElement, ColumnElement]:
+    """WHERE clause and rank expression of a search for ``q`` over one table."""
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        return document.op("@@")(query), func.ts_rank_cd(document, query)
+    words = terms(q)
+    # Title hits count double, like the A weight on PostgreSQL
+    rank = sum(
+        (case((func.lower(title).contains(word, autoescape=True), 2.0), else_=1.0) for word in words),
+        literal(0.0),
+    )
+    return and_(*(document.contains(word, autoescape=True) for word in words)), rank
@@ -0,0 +1,99 @@
+"""Deterministic sample data for local development, EXPLAIN checks and benchmarks.
+
+    python -m app.seed --families 50 --members 4 --chores 200 --events 200
+
+Rows are inserted directly, so run ``python -m app.stats rebuild`` afterwards
+for ``GET /stats/``.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from .hashing import pwd_context
+from .models import Chore, Event, Family, User, event_assignees
+
+SEED_PASSWORD = "password"
+SEED_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def seed(session: Session, families: int = 10, members: int = 4, chores: int = 100, events: int = 100,
+         rng_seed: int = 0) -> dict:
+    """Insert ``families`` families, each with the given number of members, chores and events.
+
+    Every seeded user can log in with ``SEED_PASSWORD``. Returns the ids created.
+    """
+    rng = random.Random(rng_seed)
+    password_hash = pwd_context.hash(SEED_PASSWORD)
+    created = {"families": [], "users": [], "chores": 0, "events": 0}
+    for _ in range(families):
+        family_id = session.execute(insert(Family).returning(Family.id), {"name": "Seed family"}).scalar_one()
+        user_ids = session.execute(insert(User).returning(User.id), [
+            {
+                "username": f"seed{family_id}_{m}",
+                "email": f"seed{family_id}_{m}@example.com",
+                "password_hash": password_hash,
+                "family_id": family_id,
+            }
+            for m in range(members)
+        ]).scalars().all()
+        session.execute(update(Family).where(Family.id == family_id).values(
+            name=f"Seed family {family_id}", admin_id=user_ids[0]
+        ))
+        if chores:
+            session.execute(insert(Chore), [
+                {
+                    "title": f"Chore {c}",
+                    "description": rng.choice([None, "Before dinner", "Check the list on the fridge"]),
+                    "family_id": family_id,
+                    "assigned_to_id": rng.choice(user_ids),
+                    "status": rng.random() < 0.5,
+                }
+                for c in range(chores)
+            ])
+        if events:
+            rows = []
+            for e in range(events):
+                start = SEED_EPOCH + timedelta(minutes=30 * rng.randrange(2 * 365 * 48))
+                rows.append({
+                    "title": f"Event {e}",
+                    "description": rng.choice([None, "Bring snacks", "Car pool"]),
+                    "family_id": family_id,
+                    "start_time": start,
+                    "end_time": start + timedelta(minutes=30 * rng.randint(1, 6)),
+                })
+            event_ids = session.execute(insert(Event).returning(Event.id), rows).scalars().all()
+            session.execute(insert(event_assignees), [
+                {"event_id": event_id, "user_id": user_id}
+                for event_id in event_ids
+                for user_id in rng.sample(user_ids, rng.randint(1, len(user_ids)))
+            ])
+        created["families"].append(family_id)
+        created["users"].extend(user_ids)
+        created["chores"] += chores
+        created["events"] += events
+    session.commit()
+    return created
+
+def main(argv=None):
+    from .database import Base, Database
+    from .settings import Settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=10)
+    parser.add_argument("--members", type=int, default=4, help="members per family")
+    parser.add_argument("--chores", type=int, default=100, help="chores per family")
+    parser.add_argument("--events", type=int, default=100, help="events per family")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--create-tables", action="store_true", help="create missing tables first (SQLite/dev only)")
+    args = parser.parse_args(argv)
+
+    database = Database(Settings.from_env())
+    if args.create_tables:
+        Base.metadata.create_all(bind=database.engine)
+    with database.session() as session:
+        created = seed(session, args.families, args.members, args.chores, args.events, args.seed)
+    print(f"Seeded {len(created['families'])} families, {len(created['users'])} users, "
+          f"{created['chores']} chores and {created['events']} events")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Fast path for list responses: column projections rendered straight to JSON.
+
+Selecting only the response columns returns plain rows, which skips ORM
+hydration and the identity map. The rows are turned into dicts in the field
+order of the response schema and encoded without a validation pass, which
+yields the same bytes the pydantic model would produce.
+"""
+from typing import Any, Iterable
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy import Select
+from .models import ArchivedChore, ArchivedEvent, Chore, Event, Family, User
+from .schemas import ChoreOut, EventOut, FamilyOut, UserOut
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON, formatted like pydantic's ``dump_json`` (datetimes included)."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return to_json(content)
+
+class Projection:
+    """The columns of ``entity`` that back ``schema``'s fields.
+
+    Fields without a column (relationships, computed values) come out as None
+    unless ``row`` is given a value for them.
+    """
+
+    def __init__(self, schema: type[BaseModel], entity):
+        self.fields = list(schema.model_fields)
+        table = entity.__table__
+        self.columns = [table.c[name] for name in self.fields if name in table.c]
+
+    def select(self, query: Select) -> Select:
+        return query.with_only_columns(*self.columns, maintain_column_froms=True)
+
+    def row(self, row, **values) -> dict:
+        mapping = row._mapping
+        return {
+            name: values[name] if name in values else mapping[name] if name in mapping else None
+            for name in self.fields
+        }
+
+    def rows(self, rows: Iterable) -> list[dict]:
+        return [self.row(row) for row in rows]
+
+    def from_object(self, obj, **values) -> dict:
+        """Same shape from an already loaded ORM object."""
+        return {name: values[name] if name in values else getattr(obj, name, None) for name in self.fields}
+
+chore_rows = Projection(ChoreOut, Chore)
+event_rows = Projection(EventOut, Event)
+family_rows = Projection(FamilyOut, Family)
+user_rows = Projection(UserOut, User)
+archived_chore_rows = Projection(ChoreOut, ArchivedChore)
+archived_event_rows = Projection(EventOut, ArchivedEvent)
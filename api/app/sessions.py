@@ -0,0 +1,85 @@
+"""Rotating refresh tokens.
+
+Each login opens a ``RefreshSession`` row; its refresh token is a signed JWT
+naming the session and a generation. Refreshing bumps the generation, so only
+the newest token of a session is ever valid. Presenting an older one means the
+token was copied, and the whole session is revoked by deleting its row.
+
+Checking a token is a single primary-key update; no password hashing is involved.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import RefreshSession
+from .runtime import current
+from .utils import ALGORITHM, REFRESH_TOKEN_TYPE
+
+logger = logging.getLogger(__name__)
+
+def _invalid() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def encode_refresh_token(subject: str, session_id: int, generation: int, expires_at: datetime) -> str:
+    claims = {"typ": REFRESH_TOKEN_TYPE, "sub": subject, "sid": session_id, "gen": generation,
+              "exp": expires_at, "iat": datetime.now(timezone.utc)}
+    return jwt.encode(claims, current().settings.secret_key, algorithm=ALGORITHM)
+
+def _decode(token: str) -> dict:
+    try:
+        payload = jwt.decode(token, current().settings.secret_key, algorithms=[ALGORITHM])
+    except JWTError:
+        raise _invalid()
+    if payload.get("typ") != REFRESH_TOKEN_TYPE or not isinstance(payload.get("sid"), int) \
+            or not isinstance(payload.get("gen"), int):
+        raise _invalid()
+    return payload
+
+async def open_session(db: AsyncSession, user) -> str:
+    """Start a session for ``user`` and return its first refresh token. Commits."""
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=current().settings.refresh_token_expire_days)
+    # Keep the table to live sessions: drop this user's expired ones while we are here
+    await db.execute(delete(RefreshSession).where(RefreshSession.user_id == user.id, RefreshSession.expires_at <= now))
+    session_id = (await db.execute(
+        insert(RefreshSession).values(user_id=user.id, expires_at=expires_at).returning(RefreshSession.id)
+    )).scalar_one()
+    await db.commit()
+    return encode_refresh_token(user.username, session_id, 0, expires_at)
+
+async def rotate(db: AsyncSession, token: str) -> tuple[int, str]:
+    """Exchange a refresh token for the next one. Returns the user id and the new token. Commits."""
+    payload = _decode(token)
+    result = await db.execute(
+        update(RefreshSession)
+        .where(RefreshSession.id == payload["sid"], RefreshSession.generation == payload["gen"])
+        .values(generation=RefreshSession.generation + 1)
+        .returning(RefreshSession.user_id, RefreshSession.generation, RefreshSession.expires_at)
+    )
+    row = result.first()
+    if row is None:
+        # Either revoked already, or an older token of a live session is being replayed
+        reused = await db.execute(
+            delete(RefreshSession)
+            .where(RefreshSession.id == payload["sid"], RefreshSession.generation > payload["gen"])
+            .returning(RefreshSession.user_id)
+        )
+        user_id = reused.scalar()
+        await db.commit()
+        if user_id is not None:
+            logger.warning("Refresh token reuse for user %s; session %s revoked", user_id, payload["sid"])
+        raise _invalid()
+    await db.commit()
+    return row.user_id, encode_refresh_token(payload["sub"], payload["sid"], row.generation, row.expires_at)
+
+async def revoke(db: AsyncSession, token: str) -> None:
+    """End the session of ``token`` (any generation). Commits."""
+    payload = _decode(token)
+    await db.execute(delete(RefreshSession).where(RefreshSession.id == payload["sid"]))
+    await db.commit()
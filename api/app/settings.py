@@ -0,0 +1,91 @@
+import os
+from dataclasses import dataclass, fields
+from typing import Mapping, get_args
+from dotenv import load_dotenv
+
+# The one place .env is read
+load_dotenv()
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+@dataclass(frozen=True)
+class Settings:
+    """Configuration of one app instance and the resources it owns (see ``resources``)."""
+    database_url: str | None = None
+    # Comma-separated read replicas of database_url, used by GET routes
+    database_replica_urls: str | None = None
+    # Seconds a family keeps reading from the primary after a write, i.e. the
+    # replication lag its members are protected from
+    replica_max_staleness: float = 2
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # PgBouncer (transaction pooling) owns the pooling; keep no connections locally
+    # and avoid named prepared statements that would leak across server connections.
+    db_pgbouncer: bool = False
+    # Connections opened at startup; None opens db_pool_size
+    db_warm_connections: int | None = None
+
+    secret_key: str | None = None
+    # Trusting user_id/family_id claims skips the users lookup entirely, but a
+    # membership change is only seen by the worker that made it until the token
+    # expires, so it is opt-in.
+    trust_token_claims: bool = False
+    refresh_token_expire_days: float = 30
+    principal_cache_size: int = 10000
+    principal_cache_ttl: float = 60
+
+    # None uses one worker per CPU
+    password_hash_workers: int | None = None
+    password_hash_queue_size: int = 64
+    password_hash_retry_after: int = 1
+
+    response_cache_backend: str = "memory"
+    response_cache_url: str = "redis://localhost:6379/0"
+    response_cache_size: int = 10000
+    response_cache_ttl: float = 30
+
+    pubsub_backend: str = "memory"
+    pubsub_url: str = "redis://localhost:6379/0"
+    stream_queue_size: int = 100
+
+    # Completed one-off chores and one-off events that ended this long ago move
+    # to the archive tables, archive_batch_size rows per transaction
+    archive_after_days: float = 90
+    archive_batch_size: int = 1000
+    # Seconds between archive runs inside the app; None leaves it to
+    # ``python -m app.archive`` (e.g. from cron)
+    archive_interval: float | None = None
+
+    # Seconds between keep-alive comments on an idle /stream/ connection
+    stream_heartbeat_seconds: float = 25
+    # Longest free/busy window, and how far ahead a recurring event is checked for conflicts
+    free_busy_max_days: int = 366
+
+    # Log requests slower than this, with their SQL; 0 disables
+    slow_request_ms: float = 0
+    # A route exceeding its query_budget fails instead of only being logged, as in the tests
+    query_budget_enforce: bool = False
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None, **overrides) -> "Settings":
+        """Settings from environment variables named like the fields, upper-cased."""
+        environ = os.environ if environ is None else environ
+        values = {}
+        for field in fields(cls):
+            raw = environ.get(field.name.upper())
+            if raw is None or field.name in overrides:
+                continue
+            kind = (get_args(field.type) or (field.type,))[0]
+            if kind is bool:
+                values[field.name] = _flag(raw)
+            elif kind is int:
+                values[field.name] = int(raw) or (None if field.default is None else 0)
+            elif kind is float:
+                values[field.name] = float(raw)
+            else:
+                values[field.name] = raw
+        return cls(**values, **overrides)
@@ -0,0 +1,175 @@
+"""Per-member chore statistics, kept up to date by the chore writes.
+
+    python -m app.stats rebuild [--family-id 3] [--batch-size 1000]
+
+``chore_stats`` holds one row per (family, member, week): how many chores
+assigned to the member fall in that week, and how many of them are done. A
+one-off chore falls in the week it is due, or the week it was created if it
+has no due date. An occurrence of a recurring chore only counts once its
+status is set, since the others have no rows of their own; it falls in the
+week it is due and stays with the member it was assigned to then. Every
+chore write adds its difference to these rows in its own transaction, so
+``GET /stats/`` never reads ``chores``. Archived chores stay counted.
+
+``rebuild`` recomputes the rows from the chores (hot and archived) and the
+occurrences, one family per transaction. Use it to backfill after the
+migration, or to repair drift after writes that bypassed the routes.
+"""
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Mapping
+from sqlalchemy import delete, func, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import ArchivedChore, Chore, ChoreOccurrence, ChoreStat, Family
+from .recurrence import naive_utc
+
+STAT_COLUMNS = ("family_id", "assigned_to_id", "status", "due_at", "created_at", "rrule")
+# What ``occurrence_stat`` needs of an occurrence override
+OCCURRENCE_STAT_COLUMNS = ("assigned_to_id", "status", "due_at", "recurrence_id", "cancelled")
+
+def week_of(moment: datetime) -> date:
+    day = naive_utc(moment).date()
+    return day - timedelta(days=day.weekday())
+
+def occurrence_stat(family_id: int, override) -> dict | None:
+    """An occurrence override as a row for ``StatDeltas``, or None while it does not count.
+
+    ``override`` has the ``OCCURRENCE_STAT_COLUMNS``; the routes pin the
+    assignee of an occurrence whose status is set.
+    """
+    if override is None or override.status is None or override.cancelled:
+        return None
+    return {
+        "family_id": family_id, "assigned_to_id": override.assigned_to_id, "status": override.status,
+        "due_at": override.due_at or override.recurrence_id, "created_at": None, "rrule": None,
+    }
+
+class StatDeltas:
+    """Changes to ``chore_stats`` collected over a write, applied with one statement."""
+
+    def __init__(self):
+        self.deltas: dict[tuple[int, int, date], list[int]] = {}
+
+    def add(self, chore: Mapping | None, sign: int = 1) -> None:
+        """Count ``chore`` (a row with the ``STAT_COLUMNS``); ``sign=-1`` takes it back out."""
+        if chore is None or chore["rrule"] or chore["assigned_to_id"] is None:
+            return
+        key = (chore["family_id"], chore["assigned_to_id"], week_of(chore["due_at"] or chore["created_at"]))
+        delta = self.deltas.setdefault(key, [0, 0])
+        delta[0] += sign
+        delta[1] += sign if chore["status"] else 0
+
+    def remove(self, chore: Mapping | None) -> None:
+        self.add(chore, -1)
+
+    async def apply(self, session: AsyncSession) -> None:
+        rows = [
+            {"family_id": family_id, "user_id": user_id, "week": week, "total": total, "completed": completed}
+            for (family_id, user_id, week), (total, completed) in self.deltas.items() if total or completed
+        ]
+        if rows:
+            await session.execute(_upsert(session.bind.dialect.name), rows)
+        self.deltas.clear()
+
+def _upsert(dialect: str):
+    table = ChoreStat.__table__
+    statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.family_id, table.c.user_id, table.c.week],
+        set_={
+            "total": table.c.total + statement.excluded.total,
+            "completed": table.c.completed + statement.excluded.completed,
+        },
+    )
+
+def streaks(weeks: set[date], this_week: date) -> tuple[int, int]:
+    """(current, longest) runs of consecutive weeks in ``weeks``.
+
+    The current run may end last week, since this week is still in progress.
+    """
+    week = this_week
+    if week not in weeks:
+        week -= timedelta(weeks=1)
+    current = 0
+    while week in weeks:
+        current += 1
+        week -= timedelta(weeks=1)
+    longest = run = 0
+    previous = None
+    for week in sorted(weeks):
+        run = run + 1 if previous is not None and week - previous == timedelta(weeks=1) else 1
+        longest = max(longest, run)
+        previous = week
+    return current, longest
+
+async def rebuild_family(session: AsyncSession, family_id: int, batch_size: int = 1000) -> int:
+    """Recompute the family's ``chore_stats`` from its chores and occurrences.
+
+    Returns the chores and occurrences counted; does not commit.
+    """
+    # The family row lock holds off the family's chore writes, which all bump its version
+    await session.execute(select(Family.id).filter(Family.id == family_id).with_for_update())
+    await session.execute(delete(ChoreStat).where(ChoreStat.family_id == family_id))
+    query = union_all(*(
+        select(*(entity.__table__.c[name] for name in STAT_COLUMNS))
+        .filter(entity.family_id == family_id, entity.rrule.is_(None))
+        for entity in (Chore, ArchivedChore)
+    ))
+    deltas = StatDeltas()
+    counted = 0
+    result = await session.stream(query.execution_options(yield_per=batch_size))
+    async for rows in result.mappings().partitions():
+        for row in rows:
+            deltas.add(row)
+        counted += len(rows)
+    query = (
+        select(*(ChoreOccurrence.__table__.c[name] for name in OCCURRENCE_STAT_COLUMNS if name != "assigned_to_id"),
+               func.coalesce(ChoreOccurrence.assigned_to_id, Chore.assigned_to_id).label("assigned_to_id"))
+        .join(Chore, Chore.id == ChoreOccurrence.chore_id)
+        .filter(Chore.family_id == family_id, ChoreOccurrence.status.is_not(None), ChoreOccurrence.cancelled.is_(False))
+    )
+    result = await session.stream(query.execution_options(yield_per=batch_size))
+    async for rows in result.partitions():
+        for row in rows:
+            deltas.add(occurrence_stat(family_id, row))
+        counted += len(rows)
+    await deltas.apply(session)
+    return counted
+
+async def _run(args) -> None:
+    from .database import Database
+    from .response_cache import ResponseCache, backend_from_settings
+    from .settings import Settings
+
+    settings = Settings.from_env()
+    database = Database(settings)
+    cache = ResponseCache(backend_from_settings(settings), ttl=settings.response_cache_ttl)
+    try:
+        async with database.async_session() as session:
+            if args.family_id is not None:
+                family_ids = [args.family_id]
+            else:
+                family_ids = (await session.execute(select(Family.id).order_by(Family.id))).scalars().all()
+        for family_id in family_ids:
+            async with database.async_session() as session:
+                counted = await rebuild_family(session, family_id, args.batch_size)
+                await session.commit()
+            await cache.invalidate(family_id, "stats")
+            print(f"Family {family_id}: {counted} chores and occurrences", flush=True)
+    finally:
+        if cache.backend is not None:
+            await cache.backend.close()
+        await database.dispose()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser("rebuild", help="recompute chore_stats from the chores and occurrences")
+    rebuild.add_argument("--family-id", type=int, help="only this family (default: all)")
+    rebuild.add_argument("--batch-size", type=int, default=1000, help="rows read per round trip")
+    asyncio.run(_run(parser.parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,26 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-import os
-from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .database import get_db
-from .models import User
+from .queries import user_by_username
+from .principals import Principal
+from .runtime import current
 
-load_dotenv()
-SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# "typ" claim of refresh tokens (see ``sessions``), which must never pass as access tokens
+REFRESH_TOKEN_TYPE = "refresh"
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+async def hash_password(password: str) -> str:
+    return await current().password_hasher.hash(password)
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await current().password_hasher.verify(plain_password, hashed_password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def principal_claims(user) -> dict:
+    return {"sub": user.username, "user_id": user.id, "family_id": user.family_id}
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -29,26 +28,59 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+    encoded_jwt = jwt.encode(to_encode, current().settings.secret_key, algorithm=ALGORITHM)
     return encoded_jwt
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    return await resolve_principal(token, db)
+
+async def get_read_db(db: AsyncSession = Depends(get_db),
+                      current_user: Principal = Depends(get_current_user)) -> AsyncSession:
+    """The request's session with its reads sent to a replica, for GET routes.
+
+    The principal lookup above has already run on the primary; writes and
+    families written within REPLICA_MAX_STALENESS stay on the primary too.
+    """
+    db.info["replica"] = current().database.replica_for(current_user.family_id)
+    return db
+
+async def get_streaming_user(request: Request, token: str | None = Depends(optional_oauth2_scheme),
+                             db: AsyncSession = Depends(get_db)):
+    # Browsers' EventSource cannot send headers, so also accept ?access_token=
+    return await resolve_principal(token or request.query_params.get("access_token"), db)
+
+async def resolve_principal(token: str | None, db: AsyncSession) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
+    resources = current()
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, resources.settings.secret_key, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("typ") == REFRESH_TOKEN_TYPE:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+
+    principal = resources.principal_cache.get(username)
+    if principal is not None:
+        return principal
+    if resources.settings.trust_token_claims and "user_id" in payload and "family_id" in payload \
+            and not resources.principal_cache.claims_stale(username, payload.get("iat")):
+        principal = Principal(id=payload["user_id"], username=username, family_id=payload["family_id"])
+    else:
+        result = await db.execute(user_by_username(username))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+        principal = Principal(id=user.id, username=user.username, family_id=user.family_id, email=user.email)
+    resources.principal_cache.put(username, principal)
+    return principal
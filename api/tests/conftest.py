@@ -0,0 +1,75 @@
+import os
+
+# app.main builds its module-level app from the environment on import
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import httpx
+import pytest
+from sqlalchemy import select
+from app.database import Base
+from app.main import create_app
+from app.models import User
+from app.pagination import NEXT_CURSOR_HEADER
+from app.runtime import activate
+from app.seed import seed
+from app.settings import Settings
+from app.utils import create_access_token, principal_claims
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def settings(tmp_path) -> Settings:
+    # A route issuing more statements than its ``query_budget`` fails the test
+    return Settings(
+        database_url=f"sqlite:///{tmp_path / 'test.sqlite'}", secret_key="test", password_hash_workers=1,
+        query_budget_enforce=True,
+    )
+
+@pytest.fixture
+async def app(settings):
+    app = create_app(settings)
+    Base.metadata.create_all(bind=app.state.resources.database.engine)
+    async with app.router.lifespan_context(app):
+        with activate(app.state.resources):
+            yield app
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+def seeded(app) -> dict:
+    """Two families of three members, each with 30 chores and 30 events."""
+    with app.state.resources.database.session() as session:
+        return seed(session, families=2, members=3, chores=30, events=30)
+
+@pytest.fixture
+def login(app, client):
+    """Authorization headers for a user, with the principal lookup already cached."""
+    async def login(user_id: int) -> dict:
+        with app.state.resources.database.session() as session:
+            user = session.execute(select(User).filter(User.id == user_id)).scalar_one()
+            headers = {"Authorization": f"Bearer {create_access_token(principal_claims(user))}"}
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+        return headers
+    return login
+
+@pytest.fixture
+def walk(client):
+    """Every item of every page of a list route, following ``X-Next-Cursor``."""
+    async def walk(path: str, headers: dict, limit: int = 100) -> list:
+        separator = "&" if "?" in path else "?"
+        url, items = f"{path}{separator}limit={limit}", []
+        for _ in range(100):
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200, response.text
+            items += response.json()
+            if NEXT_CURSOR_HEADER not in response.headers:
+                return items
+            url = f"{path}{separator}limit={limit}&cursor={response.headers[NEXT_CURSOR_HEADER]}"
+        pytest.fail(f"The pages of {path} never ended")
+    return walk
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import func, select, update
+from app.archive import archive
+from app.models import ArchivedChore, ArchivedEvent, Chore
+from app.seed import SEED_EPOCH
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+LISTS = ["/chores/", "/chores/?from=2025-01-01T00:00:00Z&to=2027-01-01T00:00:00Z", "/events/",
+         "/events/?from=2025-03-01T00:00:00Z&to=2025-09-01T00:00:00Z"]
+
+@pytest.fixture
+async def history(app, seeded):
+    """Family data where every completed chore was last changed at SEED_EPOCH, some with a due date."""
+    async with app.state.resources.database.async_session() as session:
+        await session.execute(update(Chore).where(Chore.id % 2 == 0).values(due_at=SEED_EPOCH + timedelta(days=1)))
+        await session.execute(update(Chore).where(Chore.status.is_(True)).values(updated_at=SEED_EPOCH))
+        await session.commit()
+    return app.state.resources
+
+async def test_archived_rows_only_come_back_when_asked(client, history, login, walk):
+    headers = await login(1)
+    before = {path: await walk(path, headers, limit=7) for path in LISTS}
+    messages = []
+    history.broker.listeners.append(messages.append)
+
+    counts = await archive(history, timedelta(days=0), batch_size=4, now=NOW)
+    assert counts["chores"] and counts["events"]
+    async with history.database.async_session() as session:
+        assert await session.scalar(select(func.count()).select_from(ArchivedChore)) == counts["chores"]
+        assert await session.scalar(select(func.count()).select_from(ArchivedEvent)) == counts["events"]
+    # One committed batch at a time, each announced per family
+    archived = [message for message in messages if message["type"].endswith(".archived")]
+    assert all(len(message["ids"]) <= 4 for message in archived)
+    assert sum(len(message["ids"]) for message in archived) == counts["chores"] + counts["events"]
+
+    for path in LISTS:
+        ids = {item["id"] for item in before[path]}
+        hot = await walk(path, headers, limit=7)
+        assert {item["id"] for item in hot} < ids, path
+        # Same rows, same ids, in the same order across the merged pages
+        separator = "&" if "?" in path else "?"
+        assert await walk(f"{path}{separator}include_archived=true", headers, limit=7) == before[path], path
+
+async def test_open_and_recent_rows_stay(client, history, login, walk):
+    headers = await login(1)
+    await archive(history, timedelta(days=0), now=NOW)
+    chores = await walk("/chores/", headers)
+    assert chores and not any(chore["status"] for chore in chores)
+    events = await walk("/events/", headers)
+    assert events and all(datetime.fromisoformat(event["end_time"]) >= NOW.replace(tzinfo=None) for event in events)
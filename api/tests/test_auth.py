@@ -0,0 +1,74 @@
+from dataclasses import replace
+import pytest
+from sqlalchemy import delete, insert
+from app.models import User
+from app.seed import SEED_PASSWORD
+from app.utils import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def settings(settings):
+    return replace(settings, trust_token_claims=True)
+
+async def test_me_of_a_deleted_user(app, client):
+    with app.state.resources.database.session() as session:
+        user_id = session.execute(
+            insert(User).values(username="gone", email="gone@example.com").returning(User.id)
+        ).scalar_one()
+        session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'gone', 'user_id': user_id, 'family_id': None})}"}
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "gone@example.com"
+    response = await client.get("/dashboard/", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "gone@example.com"
+
+    with app.state.resources.database.session() as session:
+        session.execute(delete(User).where(User.id == user_id))
+        session.commit()
+    app.state.resources.principal_cache.clear()
+    # The token's claims are still trusted, but there is nobody left to describe
+    for path in ("/auth/me", "/dashboard/"):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 401, path
+
+async def log_in(client, username: str = "seed1_0") -> dict:
+    response = await client.post("/auth/login", json={"username": username, "password": SEED_PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def refresh(client, token: str):
+    return await client.post("/auth/refresh", json={"refresh_token": token})
+
+async def test_refresh_rotates_the_token(client, seeded):
+    tokens = await log_in(client)
+    for _ in range(3):
+        response = await refresh(client, tokens["refresh_token"])
+        assert response.status_code == 200, response.text
+        assert response.json()["refresh_token"] != tokens["refresh_token"]
+        tokens = response.json()
+        me = await client.get("/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+        assert me.status_code == 200 and me.json()["username"] == "seed1_0"
+
+async def test_reusing_a_refresh_token_revokes_the_session(client, seeded):
+    first = await log_in(client)
+    other = await log_in(client)
+    second = (await refresh(client, first["refresh_token"])).json()
+    # The replayed token fails, and so does the legitimate one issued after it
+    assert (await refresh(client, first["refresh_token"])).status_code == 401
+    assert (await refresh(client, second["refresh_token"])).status_code == 401
+    # Other logins of the same user keep working
+    assert (await refresh(client, other["refresh_token"])).status_code == 200
+
+async def test_logout_ends_the_session(client, seeded):
+    tokens = await log_in(client)
+    assert (await client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]})).status_code == 200
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+
+async def test_tokens_only_work_for_their_purpose(client, seeded):
+    tokens = await log_in(client)
+    assert (await refresh(client, tokens["access_token"])).status_code == 401
+    me = await client.get("/auth/me", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert me.status_code == 401
@@ -0,0 +1,84 @@
+import pytest
+from app.query_budget import count_queries
+from app.schemas import MAX_BATCH_SIZE
+
+pytestmark = pytest.mark.anyio
+
+def chore(n: int, **fields) -> dict:
+    return {"title": f"Batch chore {n}", "family_id": 1, "assigned_to_id": 2, **fields}
+
+def event(n: int, **fields) -> dict:
+    start = f"2031-01-{n % 28 + 1:02d}T{n % 24:02d}:00:00Z"
+    return {"title": f"Batch event {n}", "family_id": 1, "assignee_ids": [2], "start_time": start,
+            "end_time": start.replace(":00:00Z", ":30:00Z"), **fields}
+
+def outcome(response) -> list:
+    return [(result["op"], result["index"], result["status_code"]) for result in response.json()["results"]]
+
+async def test_chore_batches_report_each_item(client, seeded, login, walk):
+    headers = await login(1)
+    response = await client.post("/chores/batch", headers=headers, json={
+        "create": [chore(0), chore(1, assigned_to_id=4), chore(2, family_id=2)],
+        "update": [{**chore(3, status=True), "id": 1}, {**chore(4), "id": 31}, {**chore(5), "id": 1}],
+        "delete": [2, 3, 3],
+    })
+    assert response.status_code == 200, response.text
+    assert outcome(response) == [
+        ("create", 0, 201), ("create", 1, 403), ("create", 2, 403),
+        ("update", 0, 200), ("update", 1, 404), ("update", 2, 409),
+        ("delete", 0, 200), ("delete", 1, 200), ("delete", 2, 409),
+    ]
+    created_id = response.json()["results"][0]["id"]
+    assert [(item["id"], item["title"]) for item in response.json()["chores"]] == [(1, "Batch chore 3"), (created_id, "Batch chore 0")]
+
+    chores = {item["id"]: item for item in await walk("/chores/", headers)}
+    assert chores[1]["status"] is True and chores[created_id]["assigned_to_id"] == 2
+    assert 2 not in chores and 3 not in chores and len(chores) == 29
+
+async def test_batches_take_as_many_statements_whatever_their_size(client, seeded, login):
+    headers = await login(1)
+    counts = []
+    for size, first in ((2, 1), (20, 11)):
+        body = {
+            "create": [chore(n) for n in range(size)],
+            "update": [{**chore(n), "id": first + n} for n in range(size // 2)],
+            "delete": [first + n for n in range(size // 2, size)],
+        }
+        with count_queries() as counter:
+            response = await client.post("/chores/batch", headers=headers, json=body)
+        assert response.status_code == 200, response.text
+        assert {result["status_code"] for result in response.json()["results"]} == {200, 201}
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
+
+async def test_event_batches_check_conflicts(client, seeded, login):
+    headers = await login(1)
+    response = await client.post("/events/batch", headers=headers, json={"create": [event(0), event(1), event(4)]})
+    assert outcome(response) == [("create", 0, 201), ("create", 1, 201), ("create", 2, 201)]
+    first, second, third = (result["id"] for result in response.json()["results"])
+
+    response = await client.post("/events/batch", headers=headers, json={
+        "create": [event(4, title="Clash"), event(2, assignee_ids=[2, 5])],
+        "update": [{**event(3, assignee_ids=[1, 3]), "id": first}],
+        "delete": [second],
+    })
+    assert outcome(response) == [("create", 0, 409), ("create", 1, 400), ("update", 0, 200), ("delete", 0, 200)]
+    assert response.json()["results"][0]["detail"].endswith(f"user 2 in event(s) {third}")
+    # Updates replace the assignees
+    assert [[assignee["id"] for assignee in item["assignees"]] for item in response.json()["events"]] == [[1, 3]]
+
+    # Events the batch updates or deletes are not in the way
+    response = await client.post("/events/batch", headers=headers, json={
+        "create": [event(3, title="Instead", assignee_ids=[1])], "update": [{**event(5), "id": first}],
+    })
+    assert outcome(response) == [("create", 0, 201), ("update", 0, 200)]
+    response = await client.post("/events/batch?allow_conflicts=true", headers=headers,
+                                 json={"create": [event(4, title="Overlap")]})
+    assert outcome(response) == [("create", 0, 201)]
+
+async def test_batches_are_bounded(client, seeded, login):
+    headers = await login(1)
+    response = await client.post("/chores/batch", headers=headers, json={"delete": list(range(MAX_BATCH_SIZE + 1))})
+    assert response.status_code == 422
+    response = await client.post("/events/batch", headers=headers, json={"delete": [10 ** 6]})
+    assert outcome(response) == [("delete", 0, 404)]
@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+import pytest
+from app.occurrences import EXPANSION_HORIZON
+from app.recurrence import naive_utc
+
+pytestmark = pytest.mark.anyio
+
+async def test_pages_from_a_start_without_an_end_end(client, seeded, login, walk):
+    headers = await login(1)
+    chore = {"title": "Feed the cat", "family_id": 1, "assigned_to_id": 2, "rrule": "FREQ=DAILY",
+             "due_at": "2025-01-10T08:00:00Z"}
+    assert (await client.post("/chores/", headers=headers, json=chore)).status_code == 201
+    due = [chore["due_at"] for chore in await walk("/chores/?from=2025-01-01T00:00:00Z", headers)]
+    assert due[0].startswith("2025-01-10")
+    assert naive_utc(datetime.fromisoformat(due[-1])) <= naive_utc(datetime.now(timezone.utc) + EXPANSION_HORIZON)
@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import async_url, get_db, is_async_url, sync_url
+
+pytestmark = pytest.mark.anyio
+
+@pytest.mark.parametrize("url, async_driver, sync_driver", [
+    ("postgresql://u:p@db/famlink", "postgresql+asyncpg", "postgresql"),
+    ("postgresql+asyncpg://u:p@db/famlink", "postgresql+asyncpg", "postgresql+psycopg2"),
+    ("sqlite:///famlink.db", "sqlite+aiosqlite", "sqlite"),
+    ("sqlite+aiosqlite:///famlink.db", "sqlite+aiosqlite", "sqlite+pysqlite"),
+])
+def test_either_driver_selects_both_engines(url, async_driver, sync_driver):
+    assert async_url(url).drivername == async_driver
+    assert sync_url(url).drivername == sync_driver
+    assert is_async_url(async_url(url)) and not is_async_url(sync_url(url))
+    # Only the driver changes
+    assert async_url(url).database == sync_url(url).database
+
+async def test_routes_run_on_the_event_loop(app):
+    # A sync handler would hold a threadpool slot for its whole round trip
+    endpoints = [route.endpoint for route in app.routes if isinstance(route, APIRoute)]
+    assert endpoints and all(asyncio.iscoroutinefunction(endpoint) for endpoint in endpoints)
+
+async def test_requests_get_an_async_session(app):
+    sessions = get_db()
+    db = await anext(sessions)
+    try:
+        assert isinstance(db, AsyncSession)
+        assert db.bind.dialect.driver == "aiosqlite"
+        assert await db.scalar(text("select 1")) == 1
+    finally:
+        await sessions.aclose()
+
+async def test_concurrent_requests_each_get_a_session(client, seeded, login):
+    headers = await login(1)
+    responses = await asyncio.gather(*(client.get("/chores/?limit=5", headers=headers) for _ in range(10)))
+    assert {response.status_code for response in responses} == {200}
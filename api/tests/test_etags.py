@@ -0,0 +1,54 @@
+import pytest
+from app.query_budget import count_queries
+
+pytestmark = pytest.mark.anyio
+
+WINDOW = "from=2025-01-01T00:00:00Z&to=2025-02-01T00:00:00Z"
+ROUTES = [
+    "/chores/",
+    f"/chores/?{WINDOW}",
+    "/events/",
+    f"/events/?{WINDOW}",
+    f"/events/free-busy?{WINDOW}",
+    "/families/my-family",
+    "/families/1/members",
+    "/stats/",
+]
+
+async def etags(client, headers) -> dict:
+    tags = {}
+    for path in ROUTES:
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200, (path, response.text)
+        assert response.headers["ETag"].startswith('W/"1-'), path
+        tags[path] = response.headers["ETag"]
+    return tags
+
+async def test_matching_tags_answer_304_without_loading_rows(client, seeded, login):
+    headers = await login(1)
+    tags = await etags(client, headers)
+    assert len(set(tags.values())) == len(ROUTES)
+    for path, tag in tags.items():
+        for if_none_match in (tag, tag.removeprefix("W/"), f'"other", {tag}', "*"):
+            with count_queries() as counter:
+                response = await client.get(path, headers={**headers, "If-None-Match": if_none_match})
+            assert response.status_code == 304, (path, if_none_match)
+            assert response.headers["ETag"] == tag and not response.content
+            # Only the family version; the principal is cached
+            assert counter.count == 1, path
+
+async def test_writes_change_the_tags(client, seeded, login):
+    headers, other = await login(1), await login(4)
+    before = await etags(client, headers)
+    others = (await client.get("/chores/", headers=other)).headers["ETag"]
+
+    chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 2}
+    assert (await client.post("/chores/", headers=headers, json=chore)).status_code == 201
+    after = await etags(client, headers)
+    for path in ROUTES:
+        assert after[path] != before[path], path
+        response = await client.get(path, headers={**headers, "If-None-Match": before[path]})
+        assert response.status_code == 200, path
+    # Another family's tags stay valid
+    response = await client.get("/chores/", headers={**other, "If-None-Match": others})
+    assert response.status_code == 304
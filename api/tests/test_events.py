@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+import pytest
+from app.freebusy import window
+from app.occurrences import EXPANSION_HORIZON
+from app.recurrence import naive_utc
+
+pytestmark = pytest.mark.anyio
+
+# UNTIL falls before the first start, so the rule has no occurrences
+EMPTY_SERIES = {
+    "title": "Never", "family_id": 1, "assignee_ids": [1], "rrule": "FREQ=DAILY;UNTIL=20250101T000000Z",
+    "start_time": "2025-01-10T09:00:00Z", "end_time": "2025-01-10T10:00:00Z",
+}
+
+def test_window_of_nothing():
+    assert window([]) is None
+
+@pytest.mark.parametrize("rrule", ["FREQ=DAILY;UNTIL=20250101T000000Z", "FREQ=DAILY;COUNT=0"])
+async def test_series_without_occurrences_is_rejected(client, seeded, login, rrule):
+    headers = await login(1)
+    response = await client.post("/events/", headers=headers, json={**EMPTY_SERIES, "rrule": rrule})
+    assert response.status_code == 422, response.text
+    response = await client.post("/events/batch", headers=headers, json={"create": [{**EMPTY_SERIES, "rrule": rrule}]})
+    assert response.status_code == 422, response.text
+    chore = {"title": "Never", "family_id": 1, "assigned_to_id": 1, "rrule": rrule, "due_at": EMPTY_SERIES["start_time"]}
+    response = await client.post("/chores/", headers=headers, json=chore)
+    assert response.status_code == 422, response.text
+
+async def test_pages_of_an_open_ended_series_end(client, seeded, login, walk):
+    headers = await login(1)
+    series = {**EMPTY_SERIES, "rrule": "FREQ=DAILY"}
+    assert (await client.post("/events/?allow_conflicts=true", headers=headers, json=series)).status_code == 201
+    starts = [event["start_time"] for event in await walk("/events/", headers) if event["recurrence_id"]]
+    assert starts[0].startswith("2025-01-10")
+    assert naive_utc(datetime.fromisoformat(starts[-1])) <= naive_utc(datetime.now(timezone.utc) + EXPANSION_HORIZON)
+
+async def test_moved_occurrences_are_checked_for_conflicts(client, seeded, login):
+    headers = await login(1)
+    dentist = {"title": "Dentist", "family_id": 1, "assignee_ids": [1],
+               "start_time": "2030-01-02T09:00:00Z", "end_time": "2030-01-02T10:00:00Z"}
+    response = await client.post("/events/", headers=headers, json=dentist)
+    assert response.status_code == 201, response.text
+    dentist_id = response.json()["id"]
+    series = {**dentist, "title": "Run", "assignee_ids": [1, 2], "rrule": "FREQ=DAILY",
+              "start_time": "2030-01-01T07:00:00Z", "end_time": "2030-01-01T08:00:00Z"}
+    series_id = (await client.post("/events/", headers=headers, json=series)).json()["id"]
+
+    path = f"/events/{series_id}/occurrences/2030-01-02T07:00:00Z"
+    moved = {"start_time": "2030-01-02T09:30:00Z", "end_time": "2030-01-02T10:30:00Z"}
+    response = await client.put(path, headers=headers, json=moved)
+    assert response.status_code == 409
+    assert response.json()["detail"] == f"Assignees are already booked: user 1 in event(s) {dentist_id}"
+    assert (await client.put(f"{path}?allow_conflicts=true", headers=headers, json=moved)).status_code == 200
+    moved = {"start_time": "2030-01-02T11:00:00Z", "end_time": "2030-01-02T12:00:00Z"}
+    assert (await client.put(path, headers=headers, json=moved)).status_code == 200
@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import select
+from app.explain import explain, main, route_queries
+from app.models import Chore
+
+pytestmark = pytest.mark.anyio
+
+async def test_route_queries_use_indexes(app, seeded):
+    with app.state.resources.database.engine.connect() as conn:
+        queries = route_queries(conn)
+        assert len(queries) > 10
+        for label, statement in queries:
+            lines, scans = explain(conn, statement)
+            assert lines and scans == [], (label, lines)
+
+async def test_full_scans_are_flagged(app, seeded):
+    with app.state.resources.database.engine.connect() as conn:
+        _, scans = explain(conn, select(Chore).filter(Chore.description == "Before dinner"))
+    assert scans == ["chores"]
+
+async def test_the_tool_reports_every_route(app, seeded, settings, monkeypatch, capsys):
+    monkeypatch.setenv("DATABASE_URL", settings.database_url)
+    assert main([]) == 0
+    report = capsys.readouterr().out
+    assert "GET /events/?from=&to=: ok" in report and "SEQ SCAN" not in report
+
+async def test_the_tool_needs_data(app, settings, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", settings.database_url)
+    with pytest.raises(SystemExit, match="seed the database first"):
+        main([])
@@ -0,0 +1,115 @@
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import insert, update
+from app.archive import archive
+from app.export import export_family, import_family
+from app.models import Chore, Family, User
+from app.seed import SEED_EPOCH
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def history(app, client, seeded, login) -> dict:
+    """Family 1 with series, changed occurrences and archived rows on top of the seeded chores and events."""
+    headers = await login(1)
+    start = SEED_EPOCH + timedelta(hours=7)
+    response = await client.post("/chores/", headers=headers, json={
+        "title": "Bins", "family_id": 1, "assigned_to_id": 2, "rrule": "FREQ=WEEKLY", "due_at": start.isoformat(),
+    })
+    chore_id = response.json()["id"]
+    response = await client.put(f"/chores/{chore_id}/occurrences/{(start + timedelta(weeks=1)).isoformat()}",
+                                headers=headers, json={"status": True, "assigned_to_id": 3})
+    assert response.status_code == 200
+    response = await client.post("/events/?allow_conflicts=true", headers=headers, json={
+        "title": "Swimming", "family_id": 1, "assignee_ids": [1, 3], "rrule": "FREQ=DAILY;INTERVAL=3",
+        "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=45)).isoformat(),
+    })
+    event_id = response.json()["id"]
+    response = await client.put(f"/events/{event_id}/occurrences/{(start + timedelta(days=3)).isoformat()}",
+                                headers=headers, json={"title": "Swimming gala"})
+    assert response.status_code == 200
+    resources = app.state.resources
+    async with resources.database.async_session() as session:
+        await session.execute(update(Chore).where(Chore.status.is_(True)).values(updated_at=SEED_EPOCH))
+        await session.commit()
+    counts = await archive(resources, timedelta(days=0), now=datetime(2025, 6, 1, tzinfo=timezone.utc))
+    assert counts["chores"] and counts["events"]
+    return headers
+
+def records(body: bytes) -> dict[str, list[dict]]:
+    tables: dict[str, list[dict]] = {}
+    for line in body.decode().splitlines():
+        record = json.loads(line)
+        tables.setdefault(record.pop("type"), []).append(record)
+    return tables
+
+def portable(tables: dict[str, list[dict]]) -> dict[str, list]:
+    """The export with chores and events named by title instead of id, which an import changes."""
+    chores = {chore["id"]: chore["title"] for chore in tables["chore"]}
+    events = {event["id"]: event["title"] for event in tables["event"]}
+    usernames = {user["id"]: user["username"] for user in tables["user"]}
+    strip = lambda record, *names: {k: v for k, v in record.items() if k not in names}
+    return {
+        "user": sorted(user["username"] for user in tables["user"]),
+        "chore": sorted((strip(chore, "id", "family_id") for chore in tables["chore"]), key=lambda r: r["title"]),
+        "event": sorted((strip(event, "id", "family_id") for event in tables["event"]), key=lambda r: r["title"]),
+        "chore_occurrence": sorted(
+            ({**strip(row, "chore_id"), "chore": chores[row["chore_id"]]} for row in tables["chore_occurrence"]),
+            key=lambda r: (r["chore"], r["recurrence_id"]),
+        ),
+        "event_occurrence": sorted(
+            ({**strip(row, "event_id"), "event": events[row["event_id"]]} for row in tables["event_occurrence"]),
+            key=lambda r: (r["event"], r["recurrence_id"]),
+        ),
+        "event_assignee": sorted((events[row["event_id"]], usernames[row["user_id"]]) for row in tables["event_assignee"]),
+    }
+
+async def test_an_import_restores_the_export(app, client, history, login):
+    response = await client.get("/export/", headers=history)
+    assert response.status_code == 200
+    exported = records(response.content)
+    assert {"chore", "chore_occurrence", "event", "event_occurrence", "event_assignee"} <= exported.keys()
+
+    # The same people in a new family, which gets everything back under new ids
+    database = app.state.resources.database
+    async with database.async_session() as session:
+        family_id = await session.scalar(insert(Family).values(name="Moved", admin_id=1).returning(Family.id))
+        await session.execute(update(User).where(User.family_id == 1).values(family_id=family_id))
+        counts = await import_family(session, family_id, response.content.decode().splitlines())
+        await session.commit()
+    assert counts == {table: len(exported[table]) for table in counts}
+
+    app.state.resources.principal_cache.clear()
+    response = await client.get("/export/", headers=await login(1))
+    imported = records(response.content)
+    assert not {chore["id"] for chore in imported["chore"]} & {chore["id"] for chore in exported["chore"]}
+    assert portable(imported) == portable(exported)
+
+async def test_csv_holds_one_table(app, client, history):
+    response = await client.get("/export/?format=csv&table=chore", headers=history)
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/csv")
+    header, *rows = response.text.splitlines()
+    assert header.startswith("id,title,description,family_id,")
+    assert len(rows) == 31
+    assert (await client.get("/export/?format=csv", headers=history)).status_code == 400
+    assert (await client.get("/export/?table=family_secrets", headers=history)).status_code == 400
+    async with app.state.resources.database.async_session() as session:
+        with pytest.raises(ValueError, match="exactly one table"):
+            async for _ in export_family(session, 1, ["chore", "event"], "csv"):
+                pass
+
+async def test_imports_only_reference_members(app, client, history):
+    response = await client.get("/export/", headers=history)
+    async with app.state.resources.database.async_session() as session:
+        with pytest.raises(ValueError, match="is not a member of family 2"):
+            await import_family(session, 2, response.content.decode().splitlines())
+
+@pytest.mark.parametrize("lines, message", [
+    (['{"type": "secret"}'], "unknown record type"),
+    (['{"type": "event_assignee", "event_id": 1, "user_id": 1}'], "not in the export"),
+])
+async def test_malformed_imports_fail(app, seeded, lines, message):
+    async with app.state.resources.database.async_session() as session:
+        with pytest.raises(ValueError, match=message):
+            await import_family(session, 1, lines)
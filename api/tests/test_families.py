@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import select
+from app.models import User
+
+pytestmark = pytest.mark.anyio
+
+async def test_membership_changes_reach_every_workers_principals(app, client, seeded, login):
+    resources = app.state.resources
+    messages = []
+    resources.broker.listeners.append(messages.append)
+    headers = await login(1)
+    with resources.database.session() as session:
+        username = session.execute(select(User.username).filter(User.id == 2)).scalar_one()
+
+    response = await client.delete("/families/1/members/2", headers=headers)
+    assert response.status_code == 200
+    assert messages[-1]["username"] == username
+
+    # Another worker adds them back: this worker's cached principal (no family) must go
+    await login(2)
+    assert resources.principal_cache.get(username).family_id is None
+    resources.broker.deliver({"family_id": 1, "type": "member.added", "user_id": 2, "username": username})
+    assert resources.principal_cache.get(username) is None
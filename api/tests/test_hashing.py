@@ -0,0 +1,47 @@
+import asyncio
+from dataclasses import replace
+import pytest
+from fastapi import HTTPException
+from app.hashing import PasswordHasher
+from app.seed import SEED_PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def settings(settings):
+    # One hash at a time and nobody waiting: a second login is shed
+    return replace(settings, password_hash_workers=1, password_hash_queue_size=0, password_hash_retry_after=3)
+
+@pytest.fixture
+async def hasher():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    await hasher.warm_up()
+    yield hasher
+    hasher.shutdown()
+
+async def test_hashes_verify_in_the_pool(hasher):
+    hashed = await hasher.hash("correct horse")
+    assert hashed.startswith("$2b$")
+    assert await hasher.verify("correct horse", hashed)
+    assert not await hasher.verify("battery staple", hashed)
+    stats = hasher.stats()
+    assert stats["completed"] == 3 and stats["rejected"] == 0 and stats["in_flight"] == 0
+    assert stats["max_latency_seconds"] >= stats["avg_latency_seconds"] > 0
+
+async def test_excess_work_is_shed(hasher):
+    # One running, one queued, the third turned away at once
+    results = await asyncio.gather(*(hasher.hash("x") for _ in range(3)), return_exceptions=True)
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503 and rejected[0].headers == {"Retry-After": "1"}
+    assert hasher.stats()["rejected"] == 1 and hasher.stats()["completed"] == 2
+
+async def test_login_bursts_get_a_retry_hint(app, client, seeded):
+    logins = [client.post("/auth/login", json={"username": f"seed1_{n}", "password": SEED_PASSWORD}) for n in range(3)]
+    responses = await asyncio.gather(*logins)
+    shed = [response for response in responses if response.status_code == 503]
+    assert shed and len(shed) < len(responses)
+    assert all(response.status_code == 200 for response in responses if response not in shed)
+    assert all(response.headers["Retry-After"] == "3" for response in shed)
+    # Shed logins show in the metrics
+    assert app.state.resources.password_hasher.stats()["rejected"] == len(shed)
@@ -0,0 +1,73 @@
+import logging
+import re
+import pytest
+from app.metrics import CONTENT_TYPE, Counter, Histogram
+
+pytestmark = pytest.mark.anyio
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+def parse(text: str) -> dict[str, float]:
+    """Samples by name and labels, checking each line is valid exposition text under a TYPE."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+        elif line and not line.startswith("# HELP "):
+            match = SAMPLE.match(line)
+            assert match, line
+            name = match.group(1)
+            assert name in types or re.sub(r"_(bucket|sum|count)$", "", name) in types, line
+            samples[name + (match.group(2) or "")] = float(match.group(3))
+    return samples
+
+async def scrape(client) -> dict[str, float]:
+    response = await client.get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"] == CONTENT_TYPE
+    return parse(response.text)
+
+async def test_requests_are_counted_by_route_template(client, seeded, login):
+    headers = await login(1)
+    for path in ("/chores/", "/chores/", "/chores/9999", "/chores/9998", "/nowhere"):
+        await client.get(path, headers=headers)
+    samples = await scrape(client)
+    assert samples['famlink_http_requests_total{method="GET",route="/chores/",status="200"}'] == 2
+    # GET /chores/{id} is not a route, so both 405s share a series
+    assert sum(value for key, value in samples.items()
+               if key.startswith("famlink_http_requests_total") and 'route="/chores/{chore_id}"' in key) == 2
+    assert samples['famlink_http_requests_total{method="GET",route="<unmatched>",status="404"}'] == 1
+
+    latency = 'famlink_http_request_duration_seconds_{}{{method="GET",route="/chores/"{}}}'
+    assert samples[latency.format("count", "")] == samples[latency.format("bucket", ',le="+Inf"')] == 2
+    assert samples[latency.format("bucket", ',le="0.005"')] <= samples[latency.format("bucket", ',le="10.0"')]
+    assert samples['famlink_http_request_sql_statements_sum{method="GET",route="/chores/"}'] >= 2
+
+async def test_components_report_as_gauges(client, seeded, login):
+    await login(1)
+    samples = await scrape(client)
+    assert samples["famlink_db_pool_checkouts"] > 0
+    assert samples["famlink_password_hashing_workers"] == 1
+    assert "famlink_response_cache_hits" in samples and "famlink_change_stream_subscriptions" in samples
+    # Only numbers: the pool class name and the like are left out
+    assert not any(key.startswith("famlink_db_pool_pool") for key in samples)
+
+async def test_slow_requests_are_logged_with_their_sql(app, client, seeded, login, caplog):
+    headers = await login(1)
+    app.state.resources.metrics.slow_request_ms = 0.001
+    with caplog.at_level(logging.WARNING, logger="app.metrics"):
+        await client.get("/chores/", headers=headers)
+    assert "Slow request: GET /chores/ -> 200" in caplog.text and "SELECT" in caplog.text
+    samples = await scrape(client)
+    assert samples['famlink_http_slow_requests_total{method="GET",route="/chores/"}'] == 1
+
+def test_metrics_render_their_series():
+    counter = Counter("famlink_test_total", "A test.")
+    counter.inc(route='/a"b')
+    histogram = Histogram("famlink_test_seconds", "A test.", (0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+    samples = parse("\n".join(counter.render() + histogram.render()))
+    assert samples['famlink_test_total{route="/a\\"b"}'] == 1
+    assert [samples[f'famlink_test_seconds_bucket{{le="{bound}"}}'] for bound in ("0.1", "1", "+Inf")] == [1, 2, 3]
+    assert samples["famlink_test_seconds_sum"] == 5.55
@@ -0,0 +1,92 @@
+"""Round trips per mutation: each one is a single transaction of this many statements.
+
+Counts include the principal lookup only when it is not cached, so every
+caller logs in (warming the cache) first.
+"""
+import pytest
+from sqlalchemy import insert
+from app.models import User
+from app.query_budget import count_queries
+
+pytestmark = pytest.mark.anyio
+
+async def statements(client, method: str, url: str, **kwargs) -> tuple:
+    with count_queries() as counter:
+        response = await client.request(method, url, **kwargs)
+    return response, counter.count
+
+async def test_chore_mutations(client, seeded, login):
+    headers = await login(1)
+    chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 2, "due_at": "2025-02-01T18:00:00Z"}
+    response, count = await statements(client, "POST", "/chores/", headers=headers, json=chore)
+    assert response.status_code == 201
+    # assignee check, INSERT ... RETURNING, stats upsert, version bump
+    assert count == 4
+    chore_id = response.json()["id"]
+
+    response, count = await statements(client, "PUT", f"/chores/{chore_id}", headers=headers, json={**chore, "status": True})
+    assert response.status_code == 200
+    # current state with the assignee check, UPDATE ... RETURNING, stats upsert, version bump
+    assert count == 4
+
+    response, count = await statements(client, "PUT", f"/chores/{chore_id}", headers=headers,
+                                       json={**chore, "rrule": "FREQ=WEEKLY"})
+    assert response.status_code == 200
+    # plus the occurrence reset, as the series changed
+    assert count == 5
+
+    response, count = await statements(client, "DELETE", f"/chores/{chore_id}", headers=headers)
+    assert response.status_code == 200
+    # occurrences, DELETE ... RETURNING (a series: no stats), version bump
+    assert count == 3
+
+    response, count = await statements(client, "DELETE", f"/chores/{chore_id}", headers=headers)
+    assert response.status_code == 404
+    assert count == 2
+
+async def test_event_mutations(client, seeded, login):
+    headers = await login(1)
+    event = {"title": "Dentist", "family_id": 1, "assignee_ids": [1, 2, 2],
+             "start_time": "2030-01-01T09:00:00Z", "end_time": "2030-01-01T10:00:00Z"}
+    response, count = await statements(client, "POST", "/events/", headers=headers, json=event)
+    assert response.status_code == 201, response.text
+    assert [assignee["id"] for assignee in response.json()["assignees"]] == [1, 2]
+    # assignees, busy time (one-off and series), INSERT ... RETURNING, assignee rows, version bump
+    assert count == 6
+    event_id = response.json()["id"]
+
+    response, count = await statements(client, "DELETE", f"/events/{event_id}", headers=headers)
+    assert response.status_code == 200
+    # occurrences, assignees, DELETE ... RETURNING, version bump
+    assert count == 4
+
+async def test_family_mutations(app, client, seeded, login):
+    with app.state.resources.database.session() as session:
+        founder, joiner = session.execute(insert(User).returning(User.id), [
+            {"username": "founder", "email": "founder@example.com"},
+            {"username": "joiner", "email": "joiner@example.com"},
+        ]).scalars().all()
+        session.commit()
+    headers = await login(founder)
+    response, count = await statements(client, "POST", "/families/", headers=headers, json={"name": "New"})
+    assert response.status_code == 201
+    # INSERT ... RETURNING, UPDATE of the founder
+    assert count == 2
+    family_id = response.json()["id"]
+
+    await client.get("/auth/me", headers=headers)
+    response, count = await statements(client, "POST", f"/families/{family_id}/members", headers=headers,
+                                       json={"username": "joiner", "email": "joiner@example.com", "temporary_password": "x"})
+    assert response.status_code == 200, response.text
+    # admin check, existing user, guarded UPDATE ... RETURNING, version bump
+    assert count == 4
+
+    response, count = await statements(client, "POST", f"/families/{family_id}/members", headers=headers,
+                                       json={"username": "fresh", "email": "fresh@example.com", "temporary_password": "x"})
+    assert response.status_code == 200, response.text
+    assert count == 4
+
+    response, count = await statements(client, "DELETE", f"/families/{family_id}/members/{joiner}", headers=headers)
+    assert response.status_code == 200
+    # admin check, guarded UPDATE ... RETURNING, version bump
+    assert count == 3
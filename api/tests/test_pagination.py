@@ -0,0 +1,63 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.recurrence import naive_utc
+
+pytestmark = pytest.mark.anyio
+
+WINDOW_START, WINDOW_END = datetime(2025, 3, 1), datetime(2025, 6, 1)
+WINDOW = "from=2025-03-01T00:00:00Z&to=2025-06-01T00:00:00Z"
+
+def moment(value: str) -> datetime:
+    return naive_utc(datetime.fromisoformat(value))
+
+def test_cursors_round_trip():
+    start = datetime(2025, 3, 1, 9, 30)
+    assert decode_cursor(encode_cursor(start, 7), 2) == [start, 7]
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(7), encode_cursor({"dt": "yesterday"}, 7)])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, 2)
+    assert raised.value.status_code == 400
+
+async def test_chore_pages_follow_the_ids(client, seeded, login, walk):
+    headers = await login(1)
+    everything = (await client.get("/chores/", headers=headers)).json()
+    assert len(everything) == 30
+    pages = await walk("/chores/", headers, limit=7)
+    assert pages == everything
+    assert [chore["id"] for chore in pages] == sorted(chore["id"] for chore in everything)
+
+@pytest.mark.parametrize("query, keep", [
+    ("status=true", lambda chore: chore["status"]),
+    ("status=false", lambda chore: not chore["status"]),
+    ("assigned_to_id=2", lambda chore: chore["assigned_to_id"] == 2),
+    ("status=true&assigned_to_id=3", lambda chore: chore["status"] and chore["assigned_to_id"] == 3),
+])
+async def test_chore_filters(client, seeded, login, walk, query, keep):
+    headers = await login(1)
+    everything = await walk("/chores/", headers)
+    expected = [chore for chore in everything if keep(chore)]
+    assert expected and len(expected) < len(everything)
+    assert await walk(f"/chores/?{query}", headers, limit=4) == expected
+
+async def test_event_windows_hold_what_overlaps_them(client, seeded, login, walk):
+    headers = await login(1)
+    everything = await walk("/events/", headers)
+    expected = [event for event in everything
+                if moment(event["end_time"]) > WINDOW_START and moment(event["start_time"]) < WINDOW_END]
+    assert expected and len(expected) < len(everything)
+    events = await walk(f"/events/?{WINDOW}", headers, limit=3)
+    assert sorted(event["id"] for event in events) == sorted(event["id"] for event in expected)
+    keys = [(moment(event["start_time"]), event["id"]) for event in events]
+    assert keys == sorted(keys)
+
+async def test_pages_are_bounded(client, seeded, login):
+    headers = await login(1)
+    response = await client.get("/events/?limit=5", headers=headers)
+    assert len(response.json()) == 5 and NEXT_CURSOR_HEADER in response.headers
+    assert (await client.get("/events/?limit=501", headers=headers)).status_code == 422
+    assert (await client.get("/events/?limit=0", headers=headers)).status_code == 422
+    assert (await client.get("/events/?cursor=nonsense", headers=headers)).status_code == 400
@@ -0,0 +1,59 @@
+import asyncio
+from dataclasses import replace
+import pytest
+from sqlalchemy.exc import TimeoutError
+from app.database import Database
+from app.pool_metrics import TimedAsyncAdaptedQueuePool, TimedNullPool
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def database(settings):
+    database = Database(replace(settings, db_pool_size=1, db_max_overflow=1, db_pool_timeout=2, db_pool_recycle=60))
+    yield database
+    await database.dispose()
+
+async def test_settings_configure_the_pool(settings, database):
+    pool = database.async_engine.pool
+    assert isinstance(pool, TimedAsyncAdaptedQueuePool)
+    assert (pool.size(), pool._max_overflow, pool._timeout, pool._recycle, pool._pre_ping) == (1, 1, 2, 60, True)
+    bouncer = Database(replace(settings, db_pgbouncer=True))
+    assert isinstance(bouncer.async_engine.pool, TimedNullPool)
+    assert bouncer.pool_metrics.stats()["size"] is None
+    await bouncer.dispose()
+
+async def test_warm_up_fills_the_pool(database):
+    assert await database.warm_up() == 1
+    stats = database.pool_metrics.stats()
+    assert (stats["connects"], stats["checkouts"], stats["checked_out"]) == (1, 1, 0)
+
+async def test_metrics_follow_checkouts_overflow_and_waits(database):
+    metrics = database.pool_metrics
+    first = await database.async_engine.connect()
+    second = await database.async_engine.connect()
+    stats = metrics.stats()
+    assert (stats["checked_out"], stats["overflow"], stats["overflow_connects"]) == (2, 1, 1)
+
+    # The pool is exhausted, so the next checkout waits for a checkin
+    third = asyncio.ensure_future(database.async_engine.connect())
+    await asyncio.sleep(0.2)
+    assert not third.done()
+    await first.close()
+    third = await asyncio.wait_for(third, 5)
+    stats = metrics.stats()
+    assert stats["checkouts"] == 3 and stats["checked_out"] == 2
+    assert stats["max_checkout_wait_seconds"] >= 0.15
+    assert stats["avg_checkout_wait_seconds"] < stats["max_checkout_wait_seconds"]
+
+    await second.close()
+    await third.close()
+    assert metrics.stats()["checked_out"] == 0
+
+async def test_checkouts_time_out(settings):
+    database = Database(replace(settings, db_pool_size=1, db_max_overflow=0, db_pool_timeout=0.1))
+    try:
+        async with database.async_engine.connect():
+            with pytest.raises(TimeoutError):
+                await database.async_engine.connect()
+    finally:
+        await database.dispose()
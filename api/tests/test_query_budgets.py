@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import text, update
+from app.archive import archive
+from app.database import get_db
+from app.models import Chore
+from app.pagination import NEXT_CURSOR_HEADER
+from app.query_budget import QueryBudgetExceeded, query_budget
+from app.seed import SEED_EPOCH
+from app.stats import rebuild_family
+
+pytestmark = pytest.mark.anyio
+
+WINDOW = "from=2025-03-01T00:00:00Z&to=2025-04-15T00:00:00Z"
+
+LIST_ROUTES = [
+    "/chores/",
+    "/chores/?status=true&assigned_to_id=2",
+    f"/chores/?{WINDOW}",
+    "/chores/?include_archived=true",
+    f"/chores/?{WINDOW}&include_archived=true",
+    "/events/",
+    f"/events/?{WINDOW}",
+    "/events/?include_archived=true",
+    f"/events/?{WINDOW}&include_archived=true",
+    f"/events/free-busy?{WINDOW}",
+    "/families/my-family",
+    "/families/1/members",
+    "/dashboard/",
+    "/search/?q=chore",
+    "/stats/",
+    "/export/",
+]
+
+@pytest.fixture
+async def family(app, client, seeded, login) -> dict:
+    """Family 1 of ``seeded`` with recurring series, overrides, due chores and archived history."""
+    headers = await login(1)
+    response = await client.post("/chores/batch", headers=headers, json={"create": [
+        {"title": f"Due chore {n}", "family_id": 1, "assigned_to_id": 1 + n % 3, "status": n % 2 == 0,
+         "due_at": (SEED_EPOCH + timedelta(days=60 + 3 * n)).isoformat()}
+        for n in range(20)
+    ] + [
+        {"title": f"Series chore {n}", "family_id": 1, "assigned_to_id": 1 + n % 3, "rrule": "FREQ=DAILY",
+         "due_at": (SEED_EPOCH + timedelta(days=n)).isoformat()}
+        for n in range(3)
+    ]})
+    assert response.status_code == 200
+    series_id = response.json()["chores"][-1]["id"]
+    for day in range(61, 64):
+        response = await client.put(f"/chores/{series_id}/occurrences/{(SEED_EPOCH + timedelta(days=day)).isoformat()}",
+                                    headers=headers, json={"status": True})
+        assert response.status_code == 200
+    for n in range(3):
+        start = SEED_EPOCH + timedelta(days=n, hours=7)
+        response = await client.post("/events/?allow_conflicts=true", headers=headers, json={
+            "title": f"Series event {n}", "family_id": 1, "assignee_ids": [1, 2, 3], "rrule": "FREQ=DAILY",
+            "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=30)).isoformat(),
+        })
+        assert response.status_code == 201
+    resources = app.state.resources
+    # Some chores and every event before 2025-03 go to the archive
+    async with resources.database.async_session() as session:
+        await session.execute(update(Chore).where(Chore.id % 3 == 0).values(status=True, updated_at=SEED_EPOCH))
+        await session.commit()
+    counts = await archive(resources, timedelta(days=0), now=datetime(2025, 3, 1, tzinfo=timezone.utc))
+    assert counts["chores"] and counts["events"]
+    async with resources.database.async_session() as session:
+        await rebuild_family(session, 1)
+        await session.commit()
+    return {"headers": headers}
+
+async def test_list_routes_stay_within_budget(client, family):
+    for path in LIST_ROUTES:
+        response = await client.get(path, headers=family["headers"])
+        assert response.status_code == 200, (path, response.text)
+
+async def test_later_pages_stay_within_budget(client, family):
+    for path in ("/chores/", f"/chores/?{WINDOW}", "/events/", f"/events/?{WINDOW}&include_archived=true"):
+        url = path + ("&" if "?" in path else "?") + "limit=5"
+        for _ in range(3):
+            response = await client.get(url, headers=family["headers"])
+            assert response.status_code == 200, (url, response.text)
+            assert len(response.json()) == 5, url
+            url = path + ("&" if "?" in path else "?") + f"limit=5&cursor={response.headers[NEXT_CURSOR_HEADER]}"
+
+async def test_exceeding_a_budget_fails(app):
+    over = FastAPI()
+
+    @over.get("/", dependencies=[Depends(query_budget(1))])
+    async def two_statements(db=Depends(get_db)):
+        await db.execute(text("select 1"))
+        await db.execute(text("select 2"))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=over), base_url="http://test") as client:
+        with pytest.raises(QueryBudgetExceeded):
+            await client.get("/")
@@ -0,0 +1,54 @@
+"""Read routing with two local databases: a primary and a snapshot of it standing in as a replica.
+
+Nothing replicates between them, so the replica shows what a lagging one would.
+"""
+from dataclasses import replace
+import sqlite3
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def settings(settings, tmp_path):
+    return replace(settings, database_replica_urls=f"sqlite:///{tmp_path / 'replica.sqlite'}", replica_max_staleness=60)
+
+@pytest.fixture
+def replicated(app, seeded, settings, tmp_path):
+    source = sqlite3.connect(tmp_path / "test.sqlite")
+    target = sqlite3.connect(tmp_path / "replica.sqlite")
+    with target:
+        source.backup(target)
+    source.close()
+    target.close()
+    return app.state.resources.database
+
+async def titles(client, headers) -> set:
+    response = await client.get("/chores/?limit=100", headers=headers)
+    assert response.status_code == 200
+    return {chore["title"] for chore in response.json()}
+
+async def test_writers_read_their_writes_from_the_primary(app, client, replicated, login):
+    headers, other = await login(1), await login(4)
+    assert "Dishes" not in await titles(client, headers)
+    assert replicated.replica_reads and replicated.replica_pool_metrics[0].checkouts
+
+    # The broker message may not have come back yet (as with redis): the commit alone must do
+    app.state.resources.broker.listeners.clear()
+    chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 2}
+    assert (await client.post("/chores/", headers=headers, json=chore)).status_code == 201
+    replica_reads = replicated.replica_reads
+    assert "Dishes" in await titles(client, headers)
+    assert replicated.replica_reads == replica_reads
+
+    # Other families still read from the replica
+    await titles(client, other)
+    assert replicated.replica_reads == replica_reads + 1
+
+    # Past the staleness window the family is back on the lagging replica
+    replicated.recent_writes.clear()
+    assert "Dishes" not in await titles(client, headers)
+
+async def test_replica_pools_are_in_the_metrics(client, replicated, login):
+    await titles(client, await login(1))
+    response = await client.get("/metrics")
+    assert "famlink_db_replica_0_pool_checkouts" in response.text
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from sqlalchemy import update
+from app.models import Family
+from app.response_cache import CacheBackend, MemoryBackend, RedisBackend
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request, app) -> CacheBackend:
+    """The app's cache on each backend; redis is a local stand-in that keeps the real protocol."""
+    if request.param == "memory":
+        backend = MemoryBackend()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = RedisBackend(fakeredis.FakeAsyncRedis())
+    app.state.resources.response_cache.backend = backend
+    return backend
+
+async def test_hits_until_a_write_invalidates(app, client, seeded, login, backend):
+    cache = app.state.resources.response_cache
+    headers, other = await login(1), await login(4)
+    first = await client.get("/chores/", headers=headers)
+    assert (cache.hits, cache.misses) == (0, 1)
+    second = await client.get("/chores/", headers=headers)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.content == first.content and second.headers["ETag"] == first.headers["ETag"]
+    # Query params are part of the key
+    await client.get("/chores/?limit=5", headers=headers)
+    await client.get("/chores/", headers=other)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 2}
+    assert (await client.post("/chores/", headers=headers, json=chore)).status_code == 201
+    third = await client.get("/chores/?limit=100", headers=headers)
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert "Dishes" in {item["title"] for item in third.json()}
+    # Only the written family's entries went
+    await client.get("/chores/", headers=other)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+async def test_entries_of_an_older_version_are_not_served(app, client, seeded, login, backend):
+    cache = app.state.resources.response_cache
+    headers = await login(1)
+    await client.get("/events/", headers=headers)
+    # A write on another worker that could not reach this backend
+    async with app.state.resources.database.async_session() as session:
+        await session.execute(update(Family).where(Family.id == 1).values(version=Family.version + 1))
+        await session.commit()
+    await client.get("/events/", headers=headers)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+async def test_backend_invalidation_by_family_and_route(backend):
+    await backend.set("chores:1:/chores/?", b"a", 1, 30)
+    await backend.set("events:1:/events/?", b"b", 1, 30)
+    await backend.set("chores:2:/chores/?", b"c", 2, 30)
+    assert await backend.invalidate(1, "chores") == 1
+    assert await backend.get("chores:1:/chores/?") is None
+    assert await backend.get("events:1:/events/?") == b"b"
+    assert await backend.invalidate(1) == 1
+    assert await backend.get("chores:2:/chores/?") == b"c"
+
+async def test_entries_expire(backend):
+    await backend.set("chores:1:/chores/?", b"a", 1, 0.05)
+    await asyncio.sleep(0.1)
+    assert await backend.get("chores:1:/chores/?") is None
+
+async def test_memory_backend_evicts_the_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    await backend.set("chores:1:a", b"a", 1, 30)
+    await backend.set("chores:1:b", b"b", 1, 30)
+    await backend.get("chores:1:a")
+    await backend.set("chores:2:c", b"c", 2, 30)
+    assert await backend.get("chores:1:b") is None
+    assert await backend.get("chores:1:a") == b"a"
+    assert await backend.invalidate(1) == 1
@@ -0,0 +1,52 @@
+"""Search through its SQLite fallback, which shares the routes and pagination with PostgreSQL."""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def attic(client, seeded, login) -> dict:
+    """A chore and an event about the attic in family 1, and one in family 2."""
+    headers, other = await login(1), await login(4)
+    for owner, path, body in [
+        (headers, "/chores/", {"title": "Vacuum the attic", "family_id": 1, "assigned_to_id": 2}),
+        (headers, "/events/?allow_conflicts=true", {
+            "title": "Spring cleaning", "description": "Start in the attic, then the garage", "family_id": 1,
+            "assignee_ids": [1], "start_time": "2025-04-01T09:00:00Z", "end_time": "2025-04-01T12:00:00Z",
+        }),
+        (other, "/chores/", {"title": "Attic insulation", "family_id": 2, "assigned_to_id": 5}),
+    ]:
+        assert (await client.post(path, headers=owner, json=body)).status_code == 201
+    return headers
+
+async def search(client, headers, q: str) -> list:
+    response = await client.get("/search/", params={"q": q}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+async def test_title_matches_rank_first_within_the_family(client, attic):
+    results = await search(client, attic, "Attic")
+    assert [(result["kind"], result["title"]) for result in results] == [
+        ("chore", "Vacuum the attic"), ("event", "Spring cleaning"),
+    ]
+    assert results[0]["rank"] > results[1]["rank"]
+
+async def test_every_word_must_match(client, attic):
+    assert [result["title"] for result in await search(client, attic, "attic VACUUM")] == ["Vacuum the attic"]
+    assert await search(client, attic, "attic piano") == []
+    assert await search(client, attic, "%_") == []
+
+async def test_edits_are_searchable(client, attic):
+    chore_id = (await search(client, attic, "vacuum"))[0]["id"]
+    chore = {"title": "Sweep the attic", "family_id": 1, "assigned_to_id": 2}
+    assert (await client.put(f"/chores/{chore_id}", headers=attic, json=chore)).status_code == 200
+    assert await search(client, attic, "vacuum") == []
+    assert [result["id"] for result in await search(client, attic, "sweep")] == [chore_id]
+
+async def test_pages_cover_every_match_once(client, seeded, login, walk):
+    headers = await login(1)
+    results = await walk("/search/?q=chore", headers, limit=7)
+    # Every seeded chore of the family, and nothing else
+    assert len(results) == 30 and len({result["id"] for result in results}) == 30
+    assert all(result["kind"] == "chore" for result in results)
+    keys = [(-result["rank"], result["kind"], result["id"]) for result in results]
+    assert keys == sorted(keys)
@@ -0,0 +1,104 @@
+"""List bodies from column projections must be byte-for-byte what the response models produced."""
+from datetime import timedelta
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app import serialization
+from app.models import Chore, Event
+from app.pagination import NEXT_CURSOR_HEADER
+from app.schemas import ChoreOut, DashboardOut, EventOut
+from app.seed import SEED_EPOCH
+
+pytestmark = pytest.mark.anyio
+
+WINDOW = "from=2025-01-01T00:00:00Z&to=2025-02-15T00:00:00Z"
+
+@pytest.fixture(params=["orjson", "pydantic_core"])
+def encoder(request, monkeypatch):
+    if request.param == "pydantic_core":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+@pytest.fixture
+async def series(client, seeded, login) -> dict:
+    """Recurring chores and events in family 1, one occurrence of each moved."""
+    headers = await login(1)
+    start = SEED_EPOCH + timedelta(hours=7)
+    response = await client.post("/chores/", headers=headers, json={
+        "title": "Bins", "description": "Blue bin on odd weeks", "family_id": 1, "assigned_to_id": 2,
+        "rrule": "FREQ=WEEKLY;COUNT=6", "due_at": start.isoformat(),
+    })
+    chore_id = response.json()["id"]
+    response = await client.put(f"/chores/{chore_id}/occurrences/{(start + timedelta(weeks=1)).isoformat()}",
+                                headers=headers, json={"status": True, "due_at": (start + timedelta(days=8)).isoformat()})
+    assert response.status_code == 200
+    response = await client.post("/events/?allow_conflicts=true", headers=headers, json={
+        "title": "Swimming", "family_id": 1, "assignee_ids": [1, 3], "rrule": "FREQ=DAILY;INTERVAL=3",
+        "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=45)).isoformat(),
+    })
+    event_id = response.json()["id"]
+    response = await client.put(f"/events/{event_id}/occurrences/{(start + timedelta(days=3)).isoformat()}",
+                                headers=headers, json={"title": "Swimming gala"})
+    assert response.status_code == 200
+    return headers
+
+def dumped(model, content) -> bytes:
+    """``content`` validated and serialized by the response model, as FastAPI did before projections."""
+    adapter = TypeAdapter(model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+def reencoded(model, body: bytes) -> bytes:
+    """``body`` passed through the response model, as FastAPI would have serialized it."""
+    adapter = TypeAdapter(model)
+    return adapter.dump_json(adapter.validate_json(body))
+
+async def pages(client, path: str, headers: dict, limit: int = 7, count: int = 3) -> list:
+    separator = "&" if "?" in path else "?"
+    url, responses = f"{path}{separator}limit={limit}", []
+    while True:
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200, response.text
+        responses.append(response)
+        if len(responses) == count:
+            return responses
+        url = f"{path}{separator}limit={limit}&cursor={response.headers[NEXT_CURSOR_HEADER]}"
+
+async def test_chores_match_model_dump(app, client, seeded, login, encoder):
+    headers = await login(4)
+    responses = await pages(client, "/chores/", headers)
+    with app.state.resources.database.session() as session:
+        chores = session.execute(select(Chore).filter(Chore.family_id == 2).order_by(Chore.id).limit(21)).scalars().all()
+    for page, response in enumerate(responses):
+        assert response.content == dumped(list[ChoreOut], chores[7 * page:7 * page + 7])
+
+async def test_events_match_model_dump(app, client, seeded, login, encoder):
+    headers = await login(4)
+    responses = await pages(client, "/events/", headers)
+    with app.state.resources.database.session() as session:
+        events = session.execute(
+            select(Event).filter(Event.family_id == 2).order_by(Event.start_time, Event.id).limit(21)
+            .options(selectinload(Event.assignees))
+        ).scalars().all()
+    for page, response in enumerate(responses):
+        for event in events[7 * page:7 * page + 7]:
+            event.assignees.sort(key=lambda user: user.id)
+        assert response.content == dumped(list[EventOut], events[7 * page:7 * page + 7])
+
+@pytest.mark.parametrize("path, model", [
+    (f"/chores/?{WINDOW}", list[ChoreOut]),
+    (f"/events/?{WINDOW}", list[EventOut]),
+])
+async def test_recurring_pages_match_model_dump(client, series, encoder, path, model):
+    responses = await pages(client, path, series, limit=3, count=2)
+    assert any(item["recurrence_id"] for response in responses for item in response.json())
+    for response in responses:
+        assert response.content == reencoded(model, response.content)
+
+async def test_dashboard_matches_model_dump(client, series, encoder):
+    response = await client.get(f"/dashboard/?{WINDOW}&limit=10", headers=series)
+    assert response.status_code == 200
+    assert response.json()["events_next_cursor"]
+    assert response.content == reencoded(DashboardOut, response.content)
@@ -0,0 +1,70 @@
+from dataclasses import replace
+import httpx
+import pytest
+from sqlalchemy import func, select
+from app.database import Base
+from app.main import create_app
+from app.models import Chore, User
+from app.runtime import activate, current
+from app.seed import seed
+from app.settings import Settings
+from app.utils import create_access_token, principal_claims
+
+pytestmark = pytest.mark.anyio
+
+WINDOW = "from=2025-03-01T00:00:00Z&to=2025-03-31T00:00:00Z"
+
+def test_settings_come_from_the_environment():
+    settings = Settings.from_env({
+        "DATABASE_URL": "sqlite:///famlink.db", "SECRET_KEY": "ignored", "TRUST_TOKEN_CLAIMS": "yes",
+        "DB_POOL_SIZE": "7", "DB_WARM_CONNECTIONS": "0", "REPLICA_MAX_STALENESS": "0.5", "UNRELATED": "x",
+    }, secret_key="explicit")
+    assert settings.database_url == "sqlite:///famlink.db" and settings.secret_key == "explicit"
+    assert settings.trust_token_claims is True
+    assert (settings.db_pool_size, settings.db_warm_connections, settings.replica_max_staleness) == (7, None, 0.5)
+    assert settings.free_busy_max_days == Settings.free_busy_max_days
+
+@pytest.fixture
+async def other(app, settings, tmp_path):
+    """A second app in the same process, with its own database, key and limits."""
+    other = create_app(replace(settings, database_url=f"sqlite:///{tmp_path / 'other.sqlite'}", secret_key="other",
+                               free_busy_max_days=10))
+    resources = other.state.resources
+    Base.metadata.create_all(bind=resources.database.engine)
+    with resources.database.session() as session:
+        seed(session, families=1, members=2, chores=3, events=3)
+        user = session.execute(select(User).filter(User.id == 1)).scalar_one()
+        with activate(resources):
+            token = create_access_token(principal_claims(user))
+    async with other.router.lifespan_context(other):
+        # The lifespan made its resources current; the test itself runs as the first app
+        with activate(app.state.resources):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=other), base_url="http://test") as client:
+                client.headers["Authorization"] = f"Bearer {token}"
+                yield other, client
+
+async def test_apps_keep_to_their_own_resources(app, client, seeded, login, other):
+    other_app, other_client = other
+    assert other_app.state.resources is not app.state.resources
+    headers = await login(1)
+    assert len((await client.get("/chores/", headers=headers)).json()) == 30
+    assert len((await other_client.get("/chores/")).json()) == 3
+
+    chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 2}
+    assert (await other_client.post("/chores/", json=chore)).status_code == 201
+    with app.state.resources.database.session() as session:
+        assert session.scalar(select(func.count()).select_from(Chore)) == 60
+    with other_app.state.resources.database.session() as session:
+        assert session.scalar(select(func.count()).select_from(Chore)) == 4
+    # The first app's family version and cached pages are its own too
+    assert len((await client.get("/chores/", headers=headers)).json()) == 30
+
+    # Each app signs and checks tokens with its own key
+    assert (await other_client.get("/auth/me", headers=headers)).status_code == 401
+    assert current() is app.state.resources
+
+async def test_limits_are_per_app(client, seeded, login, other):
+    _, other_client = other
+    assert (await client.get(f"/events/free-busy?{WINDOW}", headers=await login(1))).status_code == 200
+    response = await other_client.get(f"/events/free-busy?{WINDOW}")
+    assert response.status_code == 400 and response.json()["detail"] == "The window can span at most 10 days"
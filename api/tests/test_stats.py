@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+import pytest
+from app.routes.stats import current_week
+from app.stats import rebuild_family
+
+pytestmark = pytest.mark.anyio
+
+async def test_stats_follow_the_current_week(app, client, seeded, login):
+    headers = await login(1)
+    for due_at in ("2025-01-21T18:00:00Z", "2025-02-04T18:00:00Z"):
+        chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 1, "due_at": due_at}
+        assert (await client.post("/chores/", headers=headers, json=chore)).status_code == 201
+
+    app.dependency_overrides[current_week] = lambda: date(2025, 1, 27)
+    before = await client.get("/stats/?weeks=2", headers=headers)
+    assert before.status_code == 200
+    weeks = {week["week"] for member in before.json()["members"] for week in member["weeks"]}
+    # Nothing after this week, even though a chore is already due then
+    assert weeks == {"2025-01-20"}
+    assert (await client.get("/stats/?weeks=2", headers={**headers, "If-None-Match": before.headers["ETag"]})).status_code == 304
+
+    # The family is unchanged, but a new week is a new response: no 304, no cached body
+    app.dependency_overrides[current_week] = lambda: date(2025, 1, 27) + timedelta(weeks=1)
+    after = await client.get("/stats/?weeks=2", headers={**headers, "If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    weeks = {week["week"] for member in after.json()["members"] for week in member["weeks"]}
+    assert weeks == {"2025-02-03"}
+
+async def rebuild(app) -> None:
+    async with app.state.resources.database.async_session() as session:
+        await rebuild_family(session, 1)
+        await session.commit()
+    await app.state.resources.response_cache.invalidate(1, "stats")
+
+async def stats_of(client, headers) -> dict:
+    response = await client.get("/stats/?weeks=104", headers=headers)
+    assert response.status_code == 200
+    return {member["user_id"]: (member["total"], member["completed"], {week["week"] for week in member["weeks"]})
+            for member in response.json()["members"]}
+
+async def test_occurrences_count_once_their_status_is_set(app, client, seeded, login):
+    app.dependency_overrides[current_week] = lambda: date(2025, 3, 3)
+    headers = await login(1)
+    series = {"title": "Bins", "family_id": 1, "assigned_to_id": 2, "rrule": "FREQ=WEEKLY", "due_at": "2025-01-06T07:00:00Z"}
+    response = await client.post("/chores/", headers=headers, json=series)
+    chore_id = response.json()["id"]
+    # The seed writes no stats
+    await rebuild(app)
+    before = await stats_of(client, headers)
+
+    for due_at, changes in [
+        ("2025-01-13T07:00:00Z", {"status": True}),
+        ("2025-01-20T07:00:00Z", {"status": True}),
+        ("2025-01-27T07:00:00Z", {"status": False, "assigned_to_id": 3}),
+        ("2025-02-03T07:00:00Z", {"title": "Big bins"}),
+    ]:
+        response = await client.put(f"/chores/{chore_id}/occurrences/{due_at}", headers=headers, json=changes)
+        assert response.status_code == 200, response.text
+    after = await stats_of(client, headers)
+    assert after[2][:2] == (before[2][0] + 2, before[2][1] + 2)
+    assert {date(2025, 1, 13), date(2025, 1, 20)} <= {date.fromisoformat(week) for week in after[2][2]}
+    assert after[3][:2] == (before[3][0] + 1, before[3][1])
+
+    # Cancelling takes an occurrence out; handing the series on leaves the rest where they were
+    assert (await client.delete(f"/chores/{chore_id}/occurrences/2025-01-20T07:00:00Z", headers=headers)).status_code == 200
+    assert (await client.put(f"/chores/{chore_id}", headers=headers, json={**series, "assigned_to_id": 1})).status_code == 200
+    after = await stats_of(client, headers)
+    assert after[2][:2] == (before[2][0] + 1, before[2][1] + 1)
+    assert after[1][:2] == before[1][:2]
+
+    # The aggregates match a rebuild from the chores and occurrences
+    await rebuild(app)
+    assert await stats_of(client, headers) == after
+
+    assert (await client.delete(f"/chores/{chore_id}", headers=headers)).status_code == 200
+    assert await stats_of(client, headers) == before
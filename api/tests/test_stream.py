@@ -0,0 +1,92 @@
+import asyncio
+import json
+from dataclasses import replace
+import pytest
+from app.pubsub import Broker, RedisPubSubBackend
+from app.routes import stream
+from app.utils import create_access_token
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def heartbeat(app, monkeypatch) -> float:
+    resources = app.state.resources
+    monkeypatch.setattr(resources, "settings", replace(resources.settings, stream_heartbeat_seconds=0.05))
+    return 0.05
+
+async def subscribed(broker: Broker, count: int = 1) -> None:
+    while broker.stats()["subscriptions"] < count:
+        await asyncio.sleep(0.01)
+
+async def test_members_follow_their_familys_changes(app, client, seeded, login):
+    admin = await login(1)
+    token = create_access_token({"sub": "seed1_1"})
+    # EventSource cannot send headers, so the token may come in the query string
+    follower = asyncio.create_task(client.get(f"/stream/?access_token={token}"))
+    await asyncio.wait_for(subscribed(app.state.resources.broker), 5)
+
+    chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 2}
+    created = await client.post("/chores/", headers=admin, json=chore)
+    assert created.status_code == 201
+    assert (await client.delete("/families/1/members/2", headers=admin)).status_code == 200
+    # Removing the member ends their stream
+    response = await asyncio.wait_for(follower, 5)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = response.text.split("\n\n")
+    assert frames[0] == "retry: 5000"
+    event, version, data = frames[1].split("\n")
+    assert event == "event: chore.created" and version.startswith("id: ")
+    assert json.loads(data.removeprefix("data: ")) == {
+        "family_id": 1, "type": "chore.created", "id": created.json()["id"], "version": int(version.removeprefix("id: ")),
+    }
+    assert frames[2].startswith("event: member.removed\n")
+    assert app.state.resources.broker.stats()["subscriptions"] == 0
+
+async def test_other_families_hear_nothing(app, client, seeded, login, heartbeat):
+    admin, other = await login(1), await login(4)
+    events = stream._family_events(2, 4)
+    try:
+        assert await anext(events) == "retry: 5000\n\n"
+        chore = {"title": "Dishes", "family_id": 1, "assigned_to_id": 2}
+        assert (await client.post("/chores/", headers=admin, json=chore)).status_code == 201
+        # Only heartbeats until family 2 writes
+        assert await anext(events) == ": ping\n\n"
+        chore = {"title": "Dishes", "family_id": 2, "assigned_to_id": 5}
+        assert (await client.post("/chores/", headers=other, json=chore)).status_code == 201
+        assert (await anext(events)).startswith("event: chore.created\n")
+    finally:
+        await events.aclose()
+
+async def test_slow_followers_are_told_to_resync(app, heartbeat):
+    broker = app.state.resources.broker
+    broker.queue_size = 2
+    events = stream._family_events(1, 1)
+    try:
+        await anext(events)
+        for n in range(3):
+            await broker.publish(1, "chore.updated", id=n, version=n)
+        assert '"type":"resync"' in await anext(events)
+        assert await anext(events) == ": ping\n\n"
+    finally:
+        await events.aclose()
+
+async def test_streams_need_a_family_member(client, seeded, login):
+    assert (await client.get("/stream/")).status_code == 401
+    token = create_access_token({"sub": "nobody"})
+    assert (await client.get(f"/stream/?access_token={token}")).status_code == 401
+
+async def test_redis_backend_reaches_other_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    workers = [Broker(RedisPubSubBackend(fakeredis.FakeAsyncRedis(server=server))) for _ in range(2)]
+    for broker in workers:
+        await broker.start()
+    try:
+        async with workers[1].subscribe(1, 1) as subscription, workers[0].subscribe(2, 4) as elsewhere:
+            await workers[0].publish(1, "chore.created", id=7, version=3)
+            message = await asyncio.wait_for(subscription.queue.get(), 5)
+            assert message == {"family_id": 1, "type": "chore.created", "id": 7, "version": 3}
+            assert elsewhere.queue.empty()
+    finally:
+        for broker in workers:
+            await broker.close()